@@ -0,0 +1,224 @@
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+import wire_format
+from wire_format import LinkTraffic
+
+
+class LinkSettings:
+    """
+    data object to hold the simulated properties of a directed communication link
+    """
+    def __init__(self, latency=0.0, jitter=0.0, bandwidth=None):
+        """
+        :param latency: fixed delivery delay in seconds
+        :param jitter: delays vary uniformly by up to this many seconds around the latency
+        :param bandwidth: link capacity in bytes per second, or None for unlimited
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.bandwidth = bandwidth
+
+
+class Link:
+    """
+    one directed link built on an asyncio queue carrying encoded channel filter messages. Messages are serialized at
+    the link bandwidth and then delivered after the latency and jitter have passed, so they can arrive out of order and
+    are matched to steps on receipt
+    """
+    def __init__(self, sender: str, receiver: str, settings: LinkSettings, traffic: LinkTraffic,
+                 rng: np.random.Generator):
+        self.sender = sender
+        self.receiver = receiver
+        self.settings = settings
+        self.traffic = traffic
+        self.rng = rng
+        self.queue = asyncio.Queue()
+
+        self._free_time = 0.0
+        self._early_messages = {}
+
+    def send(self, step: int, message):
+        """
+        schedules delivery of a message without blocking the sender
+        :param step: time step of the message
+        :param message: encoded message from wire_format.encode
+        :return: none
+        """
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+
+        start = max(now, self._free_time)
+        transmission = 0.0 if self.settings.bandwidth is None else len(message) / self.settings.bandwidth
+        self._free_time = start + transmission
+
+        jitter = self.rng.uniform(-self.settings.jitter, self.settings.jitter) if self.settings.jitter else 0.0
+        delay = self._free_time - now + max(self.settings.latency + jitter, 0.0)
+        loop.call_later(delay, self.queue.put_nowait, (step, message))
+
+        self.traffic.record_sent(self.sender, self.receiver, step, len(message))
+
+    async def receive(self, step: int):
+        """
+        waits for the message of a given step, holding on to messages of other steps that arrive first
+        :param step: time step of the desired message
+        :return: decoded NovelInformation object
+        """
+        while step not in self._early_messages:
+            message_step, message = await self.queue.get()
+            self._early_messages[message_step] = message
+
+        message = self._early_messages.pop(step)
+        self.traffic.record_received(self.sender, self.receiver, len(message))
+        return wire_format.decode(message)
+
+
+class RuntimeStats:
+    """
+    data object to hold the throughput and latency measured by an AsyncRuntime
+    """
+    def __init__(self):
+        self.wall_time = 0.0
+        self.messages = 0
+        self.bytes = 0
+        self.fusion_latencies = list()
+        self.traffic = LinkTraffic()
+
+    def get_messages_per_second(self):
+        return self.messages / self.wall_time if self.wall_time else 0.0
+
+    def get_mean_fusion_latency(self):
+        return float(np.mean(self.fusion_latencies)) if self.fusion_latencies else 0.0
+
+    def get_max_fusion_latency(self):
+        return float(np.max(self.fusion_latencies)) if self.fusion_latencies else 0.0
+
+    def print_summary(self):
+        print("messages: {}   bytes: {}   wall time: {:.3f} s".format(self.messages, self.bytes, self.wall_time))
+        print("throughput: {:.1f} messages/s".format(self.get_messages_per_second()))
+        print("fusion latency: mean {:.2f} ms   max {:.2f} ms".format(
+            1000 * self.get_mean_fusion_latency(), 1000 * self.get_max_fusion_latency()))
+
+
+class AsyncRuntime:
+    """
+    runs every seeker as its own asyncio task. Channel filter novel information travels over per link queues
+    instead of being read from the peer's channel filter
+    """
+    def __init__(self, seeker_list: list, target, link_settings=None, rng=None, dtype=np.float64):
+        """
+        :param seeker_list: list of Seeker objects with channel filters already created
+        :param target: robot being estimated, must have a truth model. Seekers run at their own pace, so a
+            StreamingTruthModel window has to cover every step of the run
+        :param link_settings: LinkSettings for every link, or a dictionary of them keyed by (sender, receiver) names
+        :param rng: numpy random Generator for the jitter
+        :param dtype: numpy.float64 or numpy.float32 message payload, float32 halves the bytes but is lossy
+        """
+        self.seeker_list = seeker_list
+        self.target = target
+        self.link_settings = LinkSettings() if link_settings is None else link_settings
+        self.rng = np.random.default_rng() if rng is None else rng
+        self.dtype = dtype
+        self.seeker_ids = {seeker.name: i for i, seeker in enumerate(seeker_list)}
+
+        self.links = {}
+        self.stats = RuntimeStats()
+
+    def get_link_settings(self, sender: str, receiver: str):
+        if isinstance(self.link_settings, LinkSettings):
+            return self.link_settings
+        return self.link_settings.get((sender, receiver), LinkSettings())
+
+    def run(self, steps: int):
+        """
+        runs the seekers concurrently for a number of steps
+        :param steps: number of filter steps
+        :return: RuntimeStats object
+        """
+        asyncio.run(self._run(steps))
+        return self.stats
+
+    async def _run(self, steps: int):
+        self.links = {}
+        for seeker in self.seeker_list:
+            for name in seeker.channel_filter_dict:
+                settings = self.get_link_settings(seeker.name, name)
+                self.links[(seeker.name, name)] = Link(seeker.name, name, settings, self.stats.traffic, self.rng)
+
+        start = time.perf_counter()
+        await asyncio.gather(*[self._run_seeker(seeker, steps) for seeker in self.seeker_list])
+        self.stats.wall_time = time.perf_counter() - start
+
+        self.stats.messages = self.stats.traffic.get_messages_sent()
+        self.stats.bytes = self.stats.traffic.get_bytes_sent()
+
+    async def _run_seeker(self, seeker, steps: int):
+        loop = asyncio.get_running_loop()
+
+        for _ in range(0, steps):
+            start = loop.time()
+
+            # Run Local Updates ====================================================
+            seeker.run_filter(self.target)
+            step = seeker.information_history[-1].step
+            sender = self.seeker_ids[seeker.name]
+            for name, cf in seeker.channel_filter_dict.items():
+                if cf.update_and_send():
+                    message = wire_format.encode(step, sender, cf.yi_novel, cf.Yi_novel, self.dtype)
+                else:
+                    message = wire_format.encode_skip(step, sender)
+                self.links[(seeker.name, name)].send(step, message)
+
+            # Fuse Data ============================================================
+            for name, cf in seeker.channel_filter_dict.items():
+                message = await self.links[(name, seeker.name)].receive(step)
+                if message.is_skip():
+                    cf.receive_nothing()
+                else:
+                    cf.receive_novel(message.yi_novel, message.return_information_matrix())
+            seeker.fuse_data()
+
+            self.stats.fusion_latencies.append(loop.time() - start)
+
+            # lets the other seekers run between steps when the links have no delay
+            await asyncio.sleep(0)
+
+
+def main():
+    import static_linear_program as SLP
+
+    parser = argparse.ArgumentParser(description="run the static linear example with concurrent seekers")
+    parser.add_argument('--latency', type=float, default=0.005, help="link latency in seconds")
+    parser.add_argument('--jitter', type=float, default=0.002, help="link jitter in seconds")
+    parser.add_argument('--bandwidth', type=float, default=None, help="link bandwidth in bytes per second")
+    parser.add_argument('--float32', action='store_true', help="send single precision messages")
+    parser.add_argument('--tf', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    dt = 1
+    rng = np.random.default_rng(args.seed)
+    workspace, state_space = SLP.setup(dt, rng)
+    seeker_list = workspace.robots[0:5]
+    hider = workspace.robots[6]
+
+    SLP.create_channel_filters(SLP.get_comm_lines(seeker_list), hider)
+    # a seeker without links never waits for the others, so the truth window has to cover the whole run
+    hider.truth_model = SLP.build_truth_model(state_space, hider.return_ground_truth(), args.tf + 1, args.tf + 2)
+
+    dtype = np.float32 if args.float32 else np.float64
+    runtime = AsyncRuntime(seeker_list, hider, LinkSettings(args.latency, args.jitter, args.bandwidth), rng, dtype)
+    runtime.run(args.tf + 1)
+    runtime.stats.print_summary()
+    runtime.stats.traffic.print_summary()
+
+    for seeker in seeker_list:
+        print("State Estimate from {}: ".format(seeker.name))
+        print(np.around(seeker.information_history.get_state_estimate().return_data_array(), 2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,209 @@
+import numpy as np
+
+from data_objects import InformationEstimate
+from estimation_tools import DiscreteLinearStateSpace
+import square_root_information_filter as SRIF
+
+
+class BatchInformationFilter:
+    """
+    runs the information filter for a whole fleet of seekers at once. The information vectors and matrices of all
+    seekers are held as stacked (N, n, 1) and (N, n, n) arrays and every step is a single set of broadcasted operations
+    """
+    def __init__(self, state_space: DiscreteLinearStateSpace, R_stack: np.ndarray, y_stack=None, Y_stack=None,
+                 step=0, square_root=False):
+        """
+        :param state_space: target state space shared by all seekers
+        :param R_stack: (N, m, m) array of sensor noise covariances, one per seeker
+        :param y_stack: (N, n, 1) array of initial information vectors, defaults to zeros
+        :param Y_stack: (N, n, n) array of initial information matrices, defaults to zeros
+        :param step: time step associated with the initial information
+        :param square_root: propagate square root factors with QR updates instead of information matrices
+        """
+        self.state_space = state_space
+        self.step = step
+        self.square_root = square_root
+
+        n, _ = state_space.get_dimensions()
+        count = np.size(R_stack, 0)
+
+        self.y = np.zeros((count, n, 1)) if y_stack is None else np.array(y_stack, dtype=float)
+        self.Y = np.zeros((count, n, n)) if Y_stack is None else np.array(Y_stack, dtype=float)
+
+        # sensor terms never change, so they are formed once for the whole fleet
+        H = state_space.H
+        self.R_inv = np.linalg.inv(R_stack)
+        self.HtR_inv = H.T @ self.R_inv
+        self.HtR_invH = self.HtR_inv @ H
+
+        # square root factors, carried between steps and only factored again for seekers whose information changed
+        self.R_inv_sqrt = SRIF.get_inverse_square_root(R_stack) if square_root else None
+        self.S = None
+        self.z = None
+
+    @staticmethod
+    def create_from_seekers(seeker_list: list, state_space: DiscreteLinearStateSpace, square_root=False):
+        """
+        fast way to create a BatchInformationFilter from the current estimates and sensors of a list of seekers
+        :param seeker_list: list of Seeker objects, their order sets the order of the stacked arrays
+        :param state_space: target state space shared by all seekers
+        :param square_root: propagate square root factors with QR updates instead of information matrices
+        :return: BatchInformationFilter object
+        """
+        R_stack = np.stack([seeker.R for seeker in seeker_list])
+        batch_filter = BatchInformationFilter(state_space, R_stack, square_root=square_root)
+        batch_filter.load_seekers(seeker_list)
+        return batch_filter
+
+    def load_seekers(self, seeker_list: list):
+        """
+        copies the latest information estimate of every seeker into the stacked arrays. The square root factors are
+        carried over, only the seekers whose information was changed since the last step, like by fusion, are factored
+        again
+        :param seeker_list: list of Seeker objects in the same order used to create the filter
+        :return: none
+        """
+        changed = np.zeros(len(seeker_list), dtype=bool)
+        for i, seeker in enumerate(seeker_list):
+            self.step, record = seeker.information_history.get_record(-1)
+            if np.array_equal(self.y[i, :, 0], record['vector']) and np.array_equal(self.Y[i], record['matrix']):
+                continue
+            changed[i] = True
+            self.y[i, :, 0] = record['vector']
+            self.Y[i] = record['matrix']
+
+        if self.S is not None and np.any(changed):
+            self.S[changed], self.z[changed] = SRIF.factor_information(self.y[changed], self.Y[changed])
+
+    def run(self, z_stack: np.ndarray, visible=None):
+        """
+        time and measurement update for every seeker
+        :param z_stack: (N, m, 1) array of measurements, one per seeker
+        :param visible: (N,) boolean array, or one matching any leading dimensions, seekers marked False only run the
+            time update, None updates every seeker
+        :return: none
+        """
+        if visible is not None:
+            visible = np.asarray(visible, dtype=bool)[..., np.newaxis, np.newaxis]
+            z_stack = np.where(visible, z_stack, 0)
+
+        if self.square_root:
+            self.run_square_root(z_stack, visible)
+            return
+
+        y_m, Y_m = time_update(self.state_space, self.y, self.Y)
+        if visible is None:
+            self.y = y_m + self.HtR_inv @ z_stack
+            self.Y = Y_m + self.HtR_invH
+        else:
+            self.y = y_m + np.where(visible, self.HtR_inv @ z_stack, 0)
+            self.Y = Y_m + np.where(visible, self.HtR_invH, 0)
+        self.step += 1
+
+    def run_square_root(self, z_stack: np.ndarray, visible=None):
+        """
+        time and measurement update for every seeker through QR factorizations of the square root factors
+        :param z_stack: (N, m, 1) array of measurements, one per seeker
+        :param visible: (..., 1, 1) boolean array, seekers marked False only run the time update
+        :return: none
+        """
+        if self.S is None:
+            self.S, self.z = SRIF.factor_information(self.y, self.Y)
+
+        S_m, z_m = SRIF.time_update(self.state_space, self.S, self.z)
+        self.S, self.z = SRIF.measurement_update(self.state_space, S_m, z_m, z_stack, self.R_inv_sqrt)
+        if visible is not None:
+            self.S = np.where(visible, self.S, S_m)
+            self.z = np.where(visible, self.z, z_m)
+        self.y, self.Y = SRIF.return_information(self.S, self.z)
+        self.step += 1
+
+    def run_filters(self, seeker_list: list, target, visible=None):
+        """
+        batched replacement for calling Seeker.run_filter on every seeker in the list
+        :param seeker_list: list of Seeker objects in the same order used to create the filter
+        :param target: robot being estimated, must have a truth model
+        :param visible: (N,) boolean array from Workspace.get_line_of_sight, None if every seeker sees the target
+        :return: none
+        """
+        self.load_seekers(seeker_list)
+        true_measurement = target.truth_model.get_true_measurement(self.step + 1)
+        if visible is None:
+            measurements = [seeker.get_measurement(true_measurement) for seeker in seeker_list]
+        else:
+            measurements = [seeker.get_measurement(true_measurement, v) for seeker, v in zip(seeker_list, visible)]
+        z_stack = np.stack([measurement.return_data_array() for measurement in measurements])
+
+        self.run(z_stack, visible)
+        for i, seeker in enumerate(seeker_list):
+            seeker.information_history.append_record(self.step, vector=self.y[i], matrix=self.Y[i])
+
+    def return_information_estimates(self):
+        """
+        splits the stacked arrays back into one InformationEstimate per seeker
+        :return: list of InformationEstimate objects holding copies, loading seekers later does not change them
+        """
+        return [InformationEstimate.create_from_array(self.step, y.copy(), Y.copy()) for y, Y in zip(self.y, self.Y)]
+
+
+def time_update(state_space: DiscreteLinearStateSpace, y_k0_p: np.ndarray, Y_k0_p: np.ndarray):
+    """
+    information filter time update broadcast over any number of leading dimensions
+    :param state_space: target state space
+    :param y_k0_p: (..., n, 1) array of information vectors
+    :param Y_k0_p: (..., n, n) array of information matrices
+    :return: predicted information vectors and matrices with the same shapes as the inputs
+    """
+    F_inv_k = state_space.get_F_inv()
+    F_inv_T_k = state_space.get_F_inv_T()
+    Q_inv_k = state_space.get_Q_inv()
+
+    n, _ = state_space.get_dimensions()
+
+    M_k = F_inv_T_k @ Y_k0_p @ F_inv_k
+    # M_k @ inv(M_k + Q^-1) through a batched Cholesky solve, the sum is symmetric positive definite
+    C_k = np.linalg.cholesky(M_k + Q_inv_k)
+    L_k = np.eye(n) - np.swapaxes(cho_solve(C_k, M_k), -1, -2)
+    y_k1_m = L_k @ F_inv_T_k @ y_k0_p
+    Y_k1_m = L_k @ M_k
+
+    return y_k1_m, Y_k1_m
+
+
+def cho_solve(C: np.ndarray, B: np.ndarray):
+    """
+    batched counterpart of scipy.linalg.cho_solve. The forward and back substitutions loop over the n rows and are
+    vectorized over every leading dimension, which beats a loop over the matrices for the small states used here
+    :param C: (..., n, n) array of lower triangular Cholesky factors
+    :param B: (..., n, k) array of right hand sides
+    :return: (..., n, k) array X with C C^T X = B
+    """
+    n = np.size(C, -1)
+    Z = np.empty(np.broadcast_shapes(np.shape(C)[:-2], np.shape(B)[:-2]) + np.shape(B)[-2:])
+    for i in range(0, n):
+        Z[..., i, :] = (B[..., i, :] - np.einsum('...j,...jk->...k', C[..., i, :i], Z[..., :i, :])) / C[..., i, i, None]
+
+    X = np.empty_like(Z)
+    for i in reversed(range(0, n)):
+        X[..., i, :] = (Z[..., i, :] - np.einsum('...j,...jk->...k', C[..., i + 1:, i], X[..., i + 1:, :])) / \
+            C[..., i, i, None]
+    return X
+
+
+def measurement_update(state_space: DiscreteLinearStateSpace, y_k1_m, Y_k1_m, z_k1, R):
+    """
+    information filter measurement update broadcast over any number of leading dimensions
+    :param state_space: target state space
+    :param y_k1_m: (..., n, 1) array of predicted information vectors
+    :param Y_k1_m: (..., n, n) array of predicted information matrices
+    :param z_k1: (..., m, 1) array of measurements
+    :param R: (m, m) or (..., m, m) array of sensor noise covariances
+    :return: updated information vectors and matrices
+    """
+    H_k = state_space.H
+    R_inv = np.linalg.inv(R)
+
+    y_k1_p = y_k1_m + H_k.T @ R_inv @ z_k1
+    Y_k1_p = Y_k1_m + H_k.T @ R_inv @ H_k
+
+    return y_k1_p, Y_k1_p
@@ -0,0 +1,382 @@
+import argparse
+import datetime
+import json
+import platform
+import sys
+import time
+import timeit
+
+import numpy as np
+import scipy
+
+from batch_information_filter import BatchInformationFilter
+from channel_filter import ChannelFilterBank
+from data_objects import InformationEstimate, Measurement
+from estimation_tools import DiscreteLinearStateSpace
+import information_filter as IF
+import static_linear_program as SLP
+import topology
+from workspace import Hider, Seeker
+
+# parameter lists of a full run and of a quick smoke run
+SWEEPS = {
+    'full': {
+        'state_dimension': [2, 4, 8, 16, 32, 64],
+        'degree': [1, 2, 4, 8, 16, 32],
+        'seekers': [5, 10, 20, 40, 80, 160],
+        'horizon': [10, 20, 40, 80, 160, 320],
+    },
+    'quick': {
+        'state_dimension': [2, 8, 32],
+        'degree': [1, 4, 16],
+        'seekers': [5, 20, 80],
+        'horizon': [10, 40, 160],
+    },
+}
+
+
+class BenchmarkResult:
+    """
+    data object for the timing of one benchmark at one parameter value, times are seconds per call
+    """
+    def __init__(self, name: str, parameter: str, value: int, best: float, median: float, number: int, repeat: int):
+        self.name = name
+        self.parameter = parameter
+        self.value = value
+        self.best = best
+        self.median = median
+        self.number = number
+        self.repeat = repeat
+
+    def return_dict(self):
+        return dict(self.__dict__)
+
+
+def time_function(function, repeat=5, number=None):
+    """
+    times a function the way timeit does, the best of several repeats is the least disturbed estimate
+    :param function: callable without arguments
+    :param repeat: number of timed repeats
+    :param number: calls per repeat, chosen so a repeat takes at least 0.2 s if None
+    :return: tuple of the best and median seconds per call and the number of calls per repeat
+    """
+    timer = timeit.Timer(function)
+    if number is None:
+        number, _ = timer.autorange()
+    times = np.array(timer.repeat(repeat=repeat, number=number)) / number
+    return float(times.min()), float(np.median(times)), number
+
+
+def time_runs(setup_function, run_function, repeat=5):
+    """
+    times a run that changes its inputs, like a simulation, with a fresh untimed setup before every repeat
+    :param setup_function: callable that returns the argument of run_function
+    :param run_function: callable taking the result of setup_function
+    :param repeat: number of timed repeats
+    :return: tuple of the best and median seconds per run
+    """
+    times = list()
+    for _ in range(0, repeat):
+        argument = setup_function()
+        start = time.perf_counter()
+        run_function(argument)
+        times.append(time.perf_counter() - start)
+    return float(np.min(times)), float(np.median(times))
+
+
+def create_state_space(n: int, dt=1):
+    """
+    static target of any dimension with the same noise levels as the static linear example
+    :param n: state dimension
+    :param dt: time step
+    :return: DiscreteLinearStateSpace object
+    """
+    return DiscreteLinearStateSpace(np.eye(n), np.zeros((n, n)), np.eye(n), np.zeros((n, n)), np.eye(n) * .000001,
+                                    None, dt)
+
+
+def create_information_estimate(n: int, rng: np.random.Generator):
+    A = rng.standard_normal((n, n))
+    return InformationEstimate.create_from_array(0, rng.standard_normal((n, 1)), A @ A.T + n * np.eye(n))
+
+
+def create_network(graph, steps: int, rng: np.random.Generator):
+    """
+    seekers and a hider of the static linear example linked by an arbitrary communication graph
+    :param graph: CommunicationGraph object
+    :param steps: number of steps the truth model has to cover
+    :param rng: numpy random Generator for the sensors
+    :return: list of Seeker objects and the Hider object
+    """
+    state_space = create_state_space(2)
+    R = np.eye(2) * 500
+
+    seeker_list = list()
+    for i in range(0, graph.node_count):
+        state = {'x1': -40.0, 'x2': float(i)}
+        seeker_list.append(Seeker('seeker_{}'.format(i + 1), state, 'k', R, rng))
+
+    hider = Hider('hider', {'x1': 30.0, 'x2': 0.0}, 'r', state_space)
+    hider.truth_model = SLP.build_truth_model(state_space, hider.return_ground_truth(), steps + 1)
+
+    SLP.create_channel_filters([(seeker_list[i], seeker_list[j]) for i, j in graph.return_pairs()], hider)
+    return seeker_list, hider
+
+
+def run_simulation(network: tuple, steps: int):
+    """
+    the main loop of static_linear_program for any network
+    :param network: tuple of the seeker list and hider from create_network
+    :param steps: number of steps
+    :return: none
+    """
+    seeker_list, hider = network
+    batch_filter = BatchInformationFilter.create_from_seekers(seeker_list, hider.state_space)
+    for _ in range(0, steps):
+        batch_filter.run_filters(seeker_list, hider)
+        for robot in seeker_list:
+            robot.send_update()
+        for robot in seeker_list:
+            robot.receive_update()
+            robot.fuse_data()
+
+
+def benchmark_information_filter(n_values: list, repeat: int, rng: np.random.Generator):
+    results = list()
+    for n in n_values:
+        state_space = create_state_space(n)
+        estimate = create_information_estimate(n, rng)
+        y = estimate.return_data_array()
+        Y = estimate.return_information_matrix()
+        measurement = Measurement.create_from_array(1, rng.standard_normal((n, 1)))
+        R = np.eye(n) * 500
+
+        best, median, number = time_function(lambda: IF.run(state_space, estimate, measurement, R), repeat)
+        results.append(BenchmarkResult('information_filter.run', 'state_dimension', n, best, median, number, repeat))
+
+        best, median, number = time_function(lambda: IF.time_update(state_space, y, Y), repeat)
+        results.append(BenchmarkResult('information_filter.time_update', 'state_dimension', n, best, median, number,
+                                       repeat))
+    return results
+
+
+def benchmark_channel_filter(degrees: list, repeat: int, rng: np.random.Generator):
+    """
+    per seeker cost of the channel filters and fusion at the hub of a star, so the degree is the number of channel
+    filters a single seeker runs
+    """
+    results = list()
+    for degree in degrees:
+        seeker_list, hider = create_network(topology.create_star(degree + 1), 1, rng)
+        run_simulation((seeker_list, hider), 1)
+        hub = seeker_list[0]
+
+        best, median, number = time_function(hub.send_update, repeat)
+        results.append(BenchmarkResult('channel_filter.update_and_send', 'degree', degree, best, median, number,
+                                       repeat))
+
+        best, median, number = time_function(hub.receive_update, repeat)
+        results.append(BenchmarkResult('channel_filter.receive_and_update', 'degree', degree, best, median, number,
+                                       repeat))
+
+        best, median, number = time_function(hub.fuse_data, repeat)
+        results.append(BenchmarkResult('seeker.fuse_data', 'degree', degree, best, median, number, repeat))
+    return results
+
+
+def benchmark_simulation_step(seeker_counts: list, repeat: int, rng: np.random.Generator, steps=10):
+    """
+    one step of the whole object based pipeline and of the stacked channel filter bank on a chain of seekers
+    """
+    results = list()
+    for count in seeker_counts:
+        graph = topology.create_chain(count)
+
+        best, median = time_runs(lambda: create_network(graph, steps, rng),
+                                 lambda network: run_simulation(network, steps), repeat)
+        results.append(BenchmarkResult('simulation.step', 'seekers', count, best / steps, median / steps, steps,
+                                       repeat))
+
+        state_space = create_state_space(2)
+        bank = ChannelFilterBank(graph, state_space)
+        y = rng.standard_normal((count, 2, 1))
+        Y = np.broadcast_to(np.eye(2), (count, 2, 2)).copy()
+
+        def bank_step():
+            bank.update_and_send(y, Y)
+            bank.receive_and_update()
+            bank.fuse(y, Y)
+
+        best, median, number = time_function(bank_step, repeat)
+        results.append(BenchmarkResult('channel_filter_bank.step', 'seekers', count, best, median, number, repeat))
+    return results
+
+
+def benchmark_horizon(horizons: list, repeat: int, rng: np.random.Generator, seeker_count=5):
+    """
+    a whole simulation of the example sized network, growing histories make this sensitive to per step allocation
+    """
+    results = list()
+    graph = topology.create_chain(seeker_count)
+    for steps in horizons:
+        best, median = time_runs(lambda: create_network(graph, steps, rng),
+                                 lambda network: run_simulation(network, steps), repeat)
+        results.append(BenchmarkResult('simulation.run', 'horizon', steps, best, median, 1, repeat))
+    return results
+
+
+def run_benchmarks(sweep: dict, repeat=5, seed=0):
+    """
+    :param sweep: dictionary of parameter lists, like the entries of SWEEPS
+    :param repeat: timed repeats of every benchmark
+    :param seed: seed for the random inputs
+    :return: list of BenchmarkResult objects
+    """
+    rng = np.random.default_rng(seed)
+    results = list()
+    results += benchmark_information_filter(sweep['state_dimension'], repeat, rng)
+    results += benchmark_channel_filter(sweep['degree'], repeat, rng)
+    results += benchmark_simulation_step(sweep['seekers'], repeat, rng)
+    results += benchmark_horizon(sweep['horizon'], repeat, rng)
+    return results
+
+
+def get_scaling_exponents(results: list):
+    """
+    slope of a straight line fit to log time against log parameter, 1 is linear scaling, 3 is cubic
+    :param results: list of BenchmarkResult objects
+    :return: dictionary of benchmark names to exponents
+    """
+    exponents = {}
+    for name in sorted({result.name for result in results}):
+        values = np.array([result.value for result in results if result.name == name], dtype=float)
+        times = np.array([result.best for result in results if result.name == name])
+        if np.size(values) > 1:
+            exponents[name] = float(np.polyfit(np.log(values), np.log(times), 1)[0])
+    return exponents
+
+
+def get_metadata(repeat: int, seed: int, sweep_name: str):
+    return {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'scipy': scipy.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'repeat': repeat,
+        'seed': seed,
+        'sweep': sweep_name,
+    }
+
+
+def save_results(results: list, metadata: dict, filename: str):
+    report = {
+        'metadata': metadata,
+        'results': [result.return_dict() for result in results],
+        'scaling_exponents': get_scaling_exponents(results),
+    }
+    with open(filename, 'w', encoding='utf8') as fout:
+        json.dump(report, fout, indent=2)
+
+
+def load_results(filename: str):
+    with open(filename, 'r', encoding='utf8') as fin:
+        report = json.load(fin)
+    return [BenchmarkResult(**result) for result in report['results']]
+
+
+def compare_results(results: list, baseline: list, tolerance=0.25):
+    """
+    prints the change of every benchmark against an earlier run
+    :param results: list of BenchmarkResult objects
+    :param baseline: list of BenchmarkResult objects of the earlier run
+    :param tolerance: relative slow down that counts as a regression
+    :return: list of (name, value, ratio) tuples of the regressions
+    """
+    old_times = {(result.name, result.value): result.best for result in baseline}
+    regressions = list()
+
+    print("{:>36} {:>8} {:>12} {:>12} {:>8}".format("benchmark", "value", "baseline", "current", "ratio"))
+    for result in results:
+        old_time = old_times.get((result.name, result.value))
+        if old_time is None:
+            continue
+        ratio = result.best / old_time
+        flag = ""
+        if ratio > 1 + tolerance:
+            flag = "  REGRESSION"
+            regressions.append((result.name, result.value, ratio))
+        print("{:>36} {:>8} {:>10.2f}us {:>10.2f}us {:>8.2f}{}".format(
+            result.name, result.value, 1e6 * old_time, 1e6 * result.best, ratio, flag))
+
+    return regressions
+
+
+def print_results(results: list):
+    print("{:>36} {:>16} {:>8} {:>14} {:>14}".format("benchmark", "parameter", "value", "best", "median"))
+    for result in results:
+        print("{:>36} {:>16} {:>8} {:>12.2f}us {:>12.2f}us".format(
+            result.name, result.parameter, result.value, 1e6 * result.best, 1e6 * result.median))
+    print()
+    for name, exponent in get_scaling_exponents(results).items():
+        print("{:>36} scales as parameter^{:.2f}".format(name, exponent))
+
+
+def plot_scaling_curves(results: list, filename: str):
+    """
+    log-log scaling curves with one panel per swept parameter
+    :param results: list of BenchmarkResult objects
+    :param filename: image file to write
+    :return: none
+    """
+    import render
+    render.use_headless_backend()
+    from matplotlib import pyplot as plt
+
+    parameters = list(dict.fromkeys(result.parameter for result in results))
+    fig, axes = plt.subplots(1, len(parameters), figsize=(4.5 * len(parameters), 4), squeeze=False)
+
+    for ax, parameter in zip(axes[0], parameters):
+        names = list(dict.fromkeys(result.name for result in results if result.parameter == parameter))
+        for name in names:
+            selected = [result for result in results if result.name == name]
+            ax.loglog([result.value for result in selected], [result.best for result in selected], 'o-', label=name)
+        ax.set_xlabel(parameter.replace('_', ' '))
+        ax.set_ylabel("seconds per call")
+        ax.grid(True, which='both', alpha=0.3)
+        ax.legend(fontsize='small')
+
+    fig.tight_layout()
+    fig.savefig(filename)
+    plt.close(fig)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="time the DDF pipeline and its scaling")
+    parser.add_argument('--quick', action='store_true', help="fewer parameter values for a fast check")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='benchmarks.json', help="JSON file for the results")
+    parser.add_argument('--plot', metavar='PATH', help="write the scaling curves to this image file")
+    parser.add_argument('--compare', metavar='JSON', help="earlier results to check for regressions")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="relative slow down counted as a regression")
+    args = parser.parse_args()
+
+    sweep_name = 'quick' if args.quick else 'full'
+    results = run_benchmarks(SWEEPS[sweep_name], args.repeat, args.seed)
+    print_results(results)
+    save_results(results, get_metadata(args.repeat, args.seed, sweep_name), args.output)
+
+    if args.plot:
+        plot_scaling_curves(results, args.plot)
+
+    if args.compare:
+        print()
+        regressions = compare_results(results, load_results(args.compare), args.tolerance)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,49 @@
 import numpy as np
 
+import batch_information_filter as BIF
 from data_objects import InformationEstimate
 import information_filter as IF
+import wire_format
+
+
+NOVELTY_METRICS = ('trace', 'logdet')
+
+
+def get_novelty(Yi_k1_p: np.ndarray, Y_ij_m: np.ndarray, metric='trace'):
+    """
+    how much new information a channel filter would send, relative to the predicted common information. Anything is
+    novel while the common information is still singular
+    :param Yi_k1_p: (..., n, n) array of local information matrices
+    :param Y_ij_m: (..., n, n) array of predicted common information matrices
+    :param metric: 'trace' for the trace ratio of the novel to the common information, 'logdet' for the log
+    determinant ratio of the local to the common information
+    :return: (...) array of novelty values
+    """
+    if metric == 'trace':
+        novel = np.trace(Yi_k1_p - Y_ij_m, axis1=-2, axis2=-1)
+        common = np.trace(Y_ij_m, axis1=-2, axis2=-1)
+        return np.divide(novel, common, out=np.full(np.shape(common), np.inf), where=common > 0)
+
+    if metric == 'logdet':
+        sign_local, logdet_local = np.linalg.slogdet(Yi_k1_p)
+        sign_common, logdet_common = np.linalg.slogdet(Y_ij_m)
+        return np.where((sign_common > 0) & (sign_local > 0), logdet_local - logdet_common, np.inf)
+
+    raise ValueError("novelty metric must be one of {}".format(NOVELTY_METRICS))
 
 
 class ChannelFilter:
-    def __init__(self, robot_i, robot_j, target):
+    def __init__(self, robot_i, robot_j, target, threshold=None, metric='trace'):
+        """
+        :param threshold: only send novel information when its novelty passes this value, or always send if None
+        :param metric: novelty metric of get_novelty used with the threshold
+        """
         # TODO: don't send robots to chanel filter, send the data
         self.robot_i = robot_i
         self.robot_j = robot_j
         self.target = target
+        self.threshold = threshold
+        self.metric = metric
         # TODO: update to use target state space to make these
 
         n, _ = target.state_space.get_dimensions()
@@ -32,10 +66,16 @@ class ChannelFilter:
         self.yj_novel = np.zeros((n, 1))
         self.Yj_novel = np.zeros((n, n))
 
+        # event trigger
+        self.sent = True
+        self.messages_sent = 0
+        self.messages_skipped = 0
+
     def update_and_send(self):
         # receive local information
-        self.yi_k1_p = self.robot_i.information_list[-1].return_data_array()
-        self.Yi_k1_p = self.robot_i.information_list[-1].return_information_matrix()
+        local_estimate = self.robot_i.information_history[-1]
+        self.yi_k1_p = local_estimate.return_data_array()
+        self.Yi_k1_p = local_estimate.return_information_matrix()
 
         # predict common information
         self.y_ij_m, self.Y_ij_m = IF.time_update(self.target.state_space, self.y_ij, self.Y_ij)
@@ -44,12 +84,320 @@ class ChannelFilter:
         self.yi_novel = self.yi_k1_p - self.y_ij_m
         self.Yi_novel = self.Yi_k1_p - self.Y_ij_m
 
+        # skipped novel information is not lost, it stays in the difference to the common information until sent
+        self.sent = self.threshold is None or get_novelty(self.Yi_k1_p, self.Y_ij_m, self.metric) > self.threshold
+        if self.sent:
+            self.messages_sent += 1
+        else:
+            self.messages_skipped += 1
+
+        return self.sent
+
     def receive_and_update(self):
         # get novel information from robot j
         cf_j = self.robot_j.channel_filter_dict[self.robot_i.name]
-        self.yj_novel = cf_j.yi_novel
-        self.Yj_novel = cf_j.Yi_novel
+        if cf_j.sent:
+            self.receive_novel(cf_j.yi_novel, cf_j.Yi_novel)
+        else:
+            self.receive_nothing()
+
+    def receive_novel(self, yj_novel: np.ndarray, Yj_novel: np.ndarray):
+        """
+        updates the common information with novel information from robot j that arrived as a message
+        :param yj_novel: novel information vector from robot j
+        :param Yj_novel: novel information matrix from robot j
+        :return: none
+        """
+        self.yj_novel = yj_novel
+        self.Yj_novel = Yj_novel
+        self._update_common_information()
+
+    def receive_nothing(self):
+        """
+        updates the common information when robot j skipped its send this step
+        :return: none
+        """
+        self.yj_novel = np.zeros_like(self.yi_novel)
+        self.Yj_novel = np.zeros_like(self.Yi_novel)
+        self._update_common_information()
+
+    def _update_common_information(self):
+        # both ends only add the novel information that actually crossed the link
+        yi_k1 = self.yi_k1_p if self.sent else self.y_ij_m
+        Yi_k1 = self.Yi_k1_p if self.sent else self.Y_ij_m
 
         # CF update
-        self.y_ij = self.yi_k1_p + self.yj_novel
-        self.Y_ij = self.Yi_k1_p + self.Yj_novel
+        self.y_ij = yi_k1 + self.yj_novel
+        self.Y_ij = Yi_k1 + self.Yj_novel
+
+    def get_transmission_rate(self):
+        """
+        :return: fraction of the possible messages that were sent so far
+        """
+        total = self.messages_sent + self.messages_skipped
+        return self.messages_sent / total if total else 1.0
+
+
+class MultiTargetChannelFilter:
+    """
+    channel filter of one link for many independent targets. The information about every target is a diagonal block
+    of a block diagonal joint information matrix, so the blocks are held as stacked (T, n, 1) and (T, n, n) arrays and
+    a single message per link carries the novel information of every target that passed the event trigger
+    """
+    def __init__(self, robot_i, robot_j, targets: list, threshold=None, metric='trace'):
+        """
+        :param robot_i: seeker that owns the filter, tracking the targets with a target history
+        :param robot_j: seeker at the other end of the link
+        :param targets: list of targets in the order of the target history blocks, sharing one state space
+        :param threshold: only send the novel information of a target when its novelty passes this value, or always
+            send if None
+        :param metric: novelty metric of get_novelty used with the threshold
+        """
+        self.robot_i = robot_i
+        self.robot_j = robot_j
+        self.targets = targets
+        self.state_space = targets[0].state_space
+        self.threshold = threshold
+        self.metric = metric
+
+        n, _ = self.state_space.get_dimensions()
+        T = len(targets)
+
+        # new local information
+        self.yi_k1_p = np.zeros((T, n, 1))
+        self.Yi_k1_p = np.zeros((T, n, n))
+
+        # common information
+        self.y_ij_m = np.zeros((T, n, 1))
+        self.Y_ij_m = np.zeros((T, n, n))
+
+        self.y_ij = np.zeros((T, n, 1))
+        self.Y_ij = np.zeros((T, n, n))
+
+        # novel information
+        self.yi_novel = np.zeros((T, n, 1))
+        self.Yi_novel = np.zeros((T, n, n))
+
+        self.yj_novel = np.zeros((T, n, 1))
+        self.Yj_novel = np.zeros((T, n, n))
+
+        # event trigger, sent[t] is True when the novel information of target t goes out this step
+        self.sent = np.ones(T, dtype=bool)
+        self.messages_sent = 0
+        self.messages_skipped = 0
+
+    def update_and_send(self):
+        # receive local information, copies since fusion overwrites the history rows in place
+        _, y_local, Y_local = self.robot_i.target_history.get_blocks(-1)
+        self.yi_k1_p = y_local.copy()
+        self.Yi_k1_p = Y_local.copy()
+
+        # predict common information
+        self.y_ij_m, self.Y_ij_m = BIF.time_update(self.state_space, self.y_ij, self.Y_ij)
+
+        # prepare novel information for robot j
+        self.yi_novel = self.yi_k1_p - self.y_ij_m
+        self.Yi_novel = self.Yi_k1_p - self.Y_ij_m
+
+        if self.threshold is None:
+            self.sent = np.ones(len(self.targets), dtype=bool)
+        else:
+            self.sent = get_novelty(self.Yi_k1_p, self.Y_ij_m, self.metric) > self.threshold
+
+        sent_count = int(np.count_nonzero(self.sent))
+        self.messages_sent += sent_count
+        self.messages_skipped += self.sent.size - sent_count
+
+        return self.sent
+
+    def receive_and_update(self):
+        # get novel information from robot j
+        cf_j = self.robot_j.channel_filter_dict[self.robot_i.name]
+        self.receive_novel(cf_j.yi_novel, cf_j.Yi_novel, cf_j.sent)
+
+    def receive_novel(self, yj_novel: np.ndarray, Yj_novel: np.ndarray, received=None):
+        """
+        updates the common information of every target with novel information from robot j
+        :param yj_novel: (T, n, 1) array of novel information vectors from robot j
+        :param Yj_novel: (T, n, n) array of novel information matrices from robot j
+        :param received: (T,) boolean array of the targets robot j sent, None if it sent all of them
+        :return: none
+        """
+        if received is None:
+            self.yj_novel = yj_novel
+            self.Yj_novel = Yj_novel
+        else:
+            self.yj_novel = np.where(received[:, np.newaxis, np.newaxis], yj_novel, 0.0)
+            self.Yj_novel = np.where(received[:, np.newaxis, np.newaxis], Yj_novel, 0.0)
+
+        # both ends only add the novel information that actually crossed the link
+        sent = self.sent[:, np.newaxis, np.newaxis]
+
+        # CF update
+        self.y_ij = np.where(sent, self.yi_k1_p, self.y_ij_m) + self.yj_novel
+        self.Y_ij = np.where(sent, self.Yi_k1_p, self.Y_ij_m) + self.Yj_novel
+
+    def get_message(self, step: int, sender: int, dtype=np.float64):
+        """
+        :param step: time step of the information
+        :param sender: integer id of this seeker
+        :param dtype: floating point type of the payload
+        :return: bytearray with the novel information of the targets that passed the event trigger
+        """
+        return wire_format.encode_targets(step, sender, np.flatnonzero(self.sent), self.yi_novel[self.sent],
+                                          self.Yi_novel[self.sent], dtype)
+
+    def receive_message(self, buffer):
+        """
+        updates the common information from an encoded message of robot j
+        :param buffer: bytes or any buffer holding a message from get_message
+        :return: none
+        """
+        message = wire_format.decode_targets(buffer)
+        yj_novel = np.zeros_like(self.yi_novel)
+        Yj_novel = np.zeros_like(self.Yi_novel)
+        yj_novel[message.target_ids] = message.yi_novel
+        Yj_novel[message.target_ids] = message.return_information_matrices()
+
+        received = np.zeros(len(self.targets), dtype=bool)
+        received[message.target_ids] = True
+        self.receive_novel(yj_novel, Yj_novel, received)
+
+    def get_transmission_rate(self):
+        """
+        :return: fraction of the possible target blocks that were sent so far
+        """
+        total = self.messages_sent + self.messages_skipped
+        return self.messages_sent / total if total else 1.0
+
+
+class ChannelFilterBank:
+    """
+    the channel filters of every directed edge in a communication graph, held as stacked (..., E, n, 1) and
+    (..., E, n, n) arrays instead of one ChannelFilter object per edge. Leading dimensions, like Monte Carlo trials,
+    are carried through every operation
+    """
+    def __init__(self, graph, state_space, leading_shape=(), threshold=None, metric='trace'):
+        """
+        :param graph: CommunicationGraph object
+        :param state_space: target state space
+        :param leading_shape: shape of any leading dimensions of the local information arrays
+        :param threshold: only send novel information when its novelty passes this value, or always send if None
+        :param metric: novelty metric of get_novelty used with the threshold
+        """
+        self.graph = graph
+        self.state_space = state_space
+        self.threshold = threshold
+        self.metric = metric
+
+        n, _ = state_space.get_dimensions()
+        E = graph.get_edge_count()
+        vector_shape = tuple(leading_shape) + (E, n, 1)
+        matrix_shape = tuple(leading_shape) + (E, n, n)
+
+        # new local information
+        self.yi_k1_p = np.zeros(vector_shape)
+        self.Yi_k1_p = np.zeros(matrix_shape)
+
+        # common information
+        self.y_ij_m = np.zeros(vector_shape)
+        self.Y_ij_m = np.zeros(matrix_shape)
+
+        self.y_ij = np.zeros(vector_shape)
+        self.Y_ij = np.zeros(matrix_shape)
+
+        # novel information
+        self.yi_novel = np.zeros(vector_shape)
+        self.Yi_novel = np.zeros(matrix_shape)
+
+        self.yj_novel = np.zeros(vector_shape)
+        self.Yj_novel = np.zeros(matrix_shape)
+
+        # event trigger, sent[..., e] is True when edge e sent its novel information this step
+        self.sent = np.ones(tuple(leading_shape) + (E,), dtype=bool)
+        self.messages_sent = 0
+        self.messages_skipped = 0
+
+    def update_and_send(self, y_local: np.ndarray, Y_local: np.ndarray):
+        """
+        prepares the novel information of every edge
+        :param y_local: (..., N, n, 1) array of the local information vector of every node
+        :param Y_local: (..., N, n, n) array of the local information matrix of every node
+        :return: none
+        """
+        sources = self.graph.sources
+
+        # receive local information
+        self.yi_k1_p = y_local[..., sources, :, :]
+        self.Yi_k1_p = Y_local[..., sources, :, :]
+
+        # predict common information
+        self.y_ij_m, self.Y_ij_m = BIF.time_update(self.state_space, self.y_ij, self.Y_ij)
+
+        # prepare novel information for the other end of every edge
+        self.yi_novel = self.yi_k1_p - self.y_ij_m
+        self.Yi_novel = self.Yi_k1_p - self.Y_ij_m
+
+        if self.threshold is None:
+            self.sent = np.ones(np.shape(self.yi_novel)[:-2], dtype=bool)
+        else:
+            self.sent = get_novelty(self.Yi_k1_p, self.Y_ij_m, self.metric) > self.threshold
+
+        sent_count = int(np.count_nonzero(self.sent))
+        self.messages_sent += sent_count
+        self.messages_skipped += self.sent.size - sent_count
+
+    def receive_and_update(self):
+        """
+        exchanges the novel information along every link and updates the common information
+        :return: none
+        """
+        reverse = self.graph.reverse
+        self.yj_novel = self.yi_novel[..., reverse, :, :]
+        self.Yj_novel = self.Yi_novel[..., reverse, :, :]
+
+        if self.threshold is None:
+            # CF update
+            self.y_ij = self.yi_k1_p + self.yj_novel
+            self.Y_ij = self.Yi_k1_p + self.Yj_novel
+            return
+
+        # both ends only add the novel information that actually crossed the link
+        sent = self.sent[..., np.newaxis, np.newaxis]
+        received = self.sent[..., reverse, np.newaxis, np.newaxis]
+        self.yj_novel = np.where(received, self.yj_novel, 0.0)
+        self.Yj_novel = np.where(received, self.Yj_novel, 0.0)
+
+        # CF update
+        self.y_ij = np.where(sent, self.yi_k1_p, self.y_ij_m) + self.yj_novel
+        self.Y_ij = np.where(sent, self.Yi_k1_p, self.Y_ij_m) + self.Yj_novel
+
+    def get_transmission_rate(self):
+        """
+        :return: fraction of the possible messages that were sent so far
+        """
+        total = self.messages_sent + self.messages_skipped
+        return self.messages_sent / total if total else 1.0
+
+    def fuse(self, y_local: np.ndarray, Y_local: np.ndarray):
+        """
+        adds the received novel information to the local information of every node
+        :param y_local: (..., N, n, 1) array of the local information vectors
+        :param Y_local: (..., N, n, n) array of the local information matrices
+        :return: fused information vectors and matrices with the same shapes
+        """
+        return y_local + self._sum_by_node(self.yj_novel), Y_local + self._sum_by_node(self.Yj_novel)
+
+    def _sum_by_node(self, edge_values: np.ndarray):
+        # edges are in CSR order, so the edges of each node are one contiguous segment
+        node_count = self.graph.node_count
+        indptr = self.graph.indptr
+        shape = list(np.shape(edge_values))
+        shape[-3] = node_count
+        sums = np.zeros(shape)
+
+        connected = np.diff(indptr) > 0
+        if np.any(connected):
+            sums[..., connected, :, :] = np.add.reduceat(edge_values, indptr[:-1][connected], axis=-3)
+
+        return sums
@@ -0,0 +1,116 @@
+import numpy as np
+
+OMEGA_METHODS = ('fast', 'optimal')
+
+# golden ratio step of the section search
+GOLDEN_RATIO = (np.sqrt(5) - 1) / 2
+
+
+def get_log_determinant(Y: np.ndarray):
+    """
+    :param Y: (..., n, n) array of information matrices
+    :return: (...) array of log determinants, -inf where a matrix is not positive definite
+    """
+    sign, logdet = np.linalg.slogdet(Y)
+    return np.where(sign > 0, logdet, -np.inf)
+
+
+def get_fast_omega(Y_a: np.ndarray, Y_b: np.ndarray):
+    """
+    closed form weight of the fast covariance intersection, omega = det(Y_a) / (det(Y_a) + det(Y_b)). Computed from
+    log determinants so large information matrices do not overflow
+    :param Y_a: (..., n, n) array of information matrices
+    :param Y_b: (..., n, n) array of information matrices
+    :return: (...) array of weights on Y_a
+    """
+    logdet_a = get_log_determinant(Y_a)
+    logdet_b = get_log_determinant(Y_b)
+
+    # two singular matrices carry no ordering, split them evenly
+    both_singular = np.isneginf(logdet_a) & np.isneginf(logdet_b)
+    difference = np.where(both_singular, 0.0, logdet_b - logdet_a)
+    with np.errstate(over='ignore'):
+        return 1 / (1 + np.exp(difference))
+
+
+def get_optimal_omega(Y_a: np.ndarray, Y_b: np.ndarray, tolerance=1e-4):
+    """
+    weight that maximizes the determinant of the fused information matrix, found by a golden section search on the
+    interval [0, 1] that runs for every link at once. log det is concave in omega, so the search is exact up to the
+    tolerance
+    :param Y_a: (..., n, n) array of information matrices
+    :param Y_b: (..., n, n) array of information matrices
+    :param tolerance: width of the final bracket
+    :return: (...) array of weights on Y_a
+    """
+    Y_a = Y_a[..., np.newaxis, :, :]
+    Y_b = Y_b[..., np.newaxis, :, :]
+    shape = np.broadcast_shapes(np.shape(Y_a), np.shape(Y_b))[:-3]
+
+    lower = np.zeros(shape)
+    upper = np.ones(shape)
+    iterations = int(np.ceil(np.log(tolerance) / np.log(GOLDEN_RATIO)))
+
+    for _ in range(0, iterations):
+        width = GOLDEN_RATIO * (upper - lower)
+        # both interior points are scored with one batched log determinant
+        omega = np.stack([upper - width, lower + width], axis=-1)
+        w = omega[..., np.newaxis, np.newaxis]
+        score = get_log_determinant(w * Y_a + (1 - w) * Y_b)
+
+        keep_lower = score[..., 0] >= score[..., 1]
+        upper = np.where(keep_lower, omega[..., 1], upper)
+        lower = np.where(keep_lower, lower, omega[..., 0])
+
+    return (lower + upper) / 2
+
+
+def get_omega(Y_a: np.ndarray, Y_b: np.ndarray, method='fast'):
+    if method == 'fast':
+        return get_fast_omega(Y_a, Y_b)
+    if method == 'optimal':
+        return get_optimal_omega(Y_a, Y_b)
+    raise ValueError("omega method must be one of {}".format(OMEGA_METHODS))
+
+
+def fuse(y_a: np.ndarray, Y_a: np.ndarray, y_b: np.ndarray, Y_b: np.ndarray, method='fast'):
+    """
+    covariance intersection of two information estimates with unknown correlation, broadcast over any leading
+    dimensions
+    :param y_a: (..., n, 1) array of information vectors
+    :param Y_a: (..., n, n) array of information matrices
+    :param y_b: (..., n, 1) array of information vectors
+    :param Y_b: (..., n, n) array of information matrices
+    :param method: 'fast' for the closed form weight, 'optimal' for the determinant maximizing weight
+    :return: fused information vectors and matrices
+    """
+    omega = get_omega(Y_a, Y_b, method)[..., np.newaxis, np.newaxis]
+    y = omega * y_a + (1 - omega) * y_b
+    Y = omega * Y_a + (1 - omega) * Y_b
+    return y, Y
+
+
+def fuse_graph(graph, y_local: np.ndarray, Y_local: np.ndarray, method='fast'):
+    """
+    every node fuses its local estimate with the local estimates of all its neighbors by sequential covariance
+    intersection. Unlike the channel filter this stays consistent on graphs with cycles. Round s fuses the s-th
+    neighbor of every node with at least s + 1 neighbors, so the work is vectorized over the links
+    :param graph: CommunicationGraph object
+    :param y_local: (..., N, n, 1) array of local information vectors
+    :param Y_local: (..., N, n, n) array of local information matrices
+    :param method: omega method passed to fuse
+    :return: fused information vectors and matrices with the same shapes
+    """
+    y = np.array(y_local, dtype=float)
+    Y = np.array(Y_local, dtype=float)
+
+    degrees = graph.get_degrees()
+    for slot in range(0, int(degrees.max(initial=0))):
+        nodes = np.flatnonzero(degrees > slot)
+        neighbors = graph.indices[graph.indptr[nodes] + slot]
+
+        y[..., nodes, :, :], Y[..., nodes, :, :] = fuse(y[..., nodes, :, :], Y[..., nodes, :, :],
+                                                        y_local[..., neighbors, :, :], Y_local[..., neighbors, :, :],
+                                                        method)
+
+    return y, Y
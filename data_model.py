@@ -1,4 +1,447 @@
 import matplotlib.pyplot as plt
+import numpy as np
+
+from data_objects import GroundTruth, InformationEstimate, Measurement, StateEstimate
+
+
+class ArrayHistory:
+    """
+    columnar store of per step records. Every field is a preallocated (capacity, ...) array that grows by doubling, or
+    that overwrites its oldest rows when used as a fixed capacity ring buffer
+    """
+    def __init__(self, field_shapes: dict, capacity=64, ring_buffer=False):
+        """
+        :param field_shapes: dictionary of field names to the shape of a single record of that field
+        :param capacity: number of records to preallocate, or the fixed size of the ring buffer
+        :param ring_buffer: keep only the latest 'capacity' records instead of growing
+        """
+        self.capacity = capacity
+        self.ring_buffer = ring_buffer
+
+        self.steps = np.zeros(capacity, dtype=int)
+        self.fields = {name: np.zeros((capacity,) + tuple(shape)) for name, shape in field_shapes.items()}
+
+        self._start = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append_record(self, step: int, **values):
+        """
+        adds a record to the end of the history
+        :param step: time step associated with the record
+        :param values: one array per field, reshaped to the record shape of that field
+        :return: none
+        """
+        if self._count == self.capacity:
+            if self.ring_buffer:
+                self._start = (self._start + 1) % self.capacity
+                self._count -= 1
+            else:
+                self._grow()
+
+        index = (self._start + self._count) % self.capacity
+        self.steps[index] = step
+        for name, value in values.items():
+            field = self.fields[name]
+            field[index] = np.reshape(value, field.shape[1:])
+        self._count += 1
+
+    def update_record(self, i: int, **values):
+        """
+        overwrites fields of an existing record in place
+        :param i: position of the record, negative values count from the end
+        :param values: one array per field to overwrite
+        :return: none
+        """
+        index = self._get_index(i)
+        for name, value in values.items():
+            field = self.fields[name]
+            field[index] = np.reshape(value, field.shape[1:])
+
+    def get_record(self, i: int):
+        """
+        zero copy access to a single record
+        :param i: position of the record, negative values count from the end
+        :return: the step and a dictionary of views of every field
+        """
+        index = self._get_index(i)
+        return int(self.steps[index]), {name: field[index] for name, field in self.fields.items()}
+
+    def get_steps(self):
+        return self._get_ordered(self.steps)
+
+    def get_field(self, name: str):
+        """
+        access to a whole field in step order. This is a zero copy view unless a ring buffer has wrapped around
+        :param name: name of the field
+        :return: (len, ...) numpy array
+        """
+        return self._get_ordered(self.fields[name])
+
+    def _get_index(self, i: int):
+        if i < 0:
+            i += self._count
+        if i < 0 or i >= self._count:
+            raise IndexError("history index out of range")
+        return (self._start + i) % self.capacity
+
+    def _get_ordered(self, array: np.ndarray):
+        stop = self._start + self._count
+        if stop <= self.capacity:
+            return array[self._start:stop]
+        return np.concatenate([array[self._start:], array[:stop - self.capacity]])
+
+    def _grow(self):
+        self.steps = self._resize(self.steps)
+        self.fields = {name: self._resize(field) for name, field in self.fields.items()}
+        self.capacity *= 2
+
+    def _resize(self, array: np.ndarray):
+        resized = np.zeros((2 * self.capacity,) + array.shape[1:], dtype=array.dtype)
+        resized[:self.capacity] = array
+        return resized
+
+
+class InformationHistory(ArrayHistory):
+    """
+    history of information estimates stored as (T, n) information vectors and (T, n, n) information matrices
+    """
+    def __init__(self, n: int, capacity=64, ring_buffer=False):
+        super().__init__({'vector': (n,), 'matrix': (n, n)}, capacity, ring_buffer)
+        self.n = n
+
+        # state estimates already solved for, keyed by step and dropped when their record changes or is overwritten
+        self._state_estimates = dict()
+
+    def __getitem__(self, i: int):
+        """
+        :param i: position of the record, negative values count from the end
+        :return: InformationEstimate object holding a copy of the record, later writes to the history do not change it
+        """
+        step, record = self.get_record(i)
+        return InformationEstimate.create_from_array(step, record['vector'].reshape((self.n, 1)).copy(),
+                                                     record['matrix'].copy())
+
+    def __iter__(self):
+        for i in range(0, len(self)):
+            yield self[i]
+
+    def append(self, estimate: InformationEstimate):
+        self.append_record(estimate.step, vector=estimate.return_data_array(),
+                           matrix=estimate.return_information_matrix())
+
+    def append_record(self, step: int, **values):
+        if self.ring_buffer and len(self) == self.capacity:
+            self._state_estimates.pop(int(self.steps[self._start]), None)
+        self._state_estimates.pop(step, None)
+        super().append_record(step, **values)
+
+    def update_record(self, i: int, **values):
+        self._state_estimates.pop(int(self.steps[self._get_index(i)]), None)
+        super().update_record(i, **values)
+
+    def update_last(self, info_array: np.ndarray, info_matrix: np.ndarray):
+        self.update_record(-1, vector=info_array, matrix=info_matrix)
+
+    def get_state_estimate(self, i=-1):
+        """
+        state form of a single record, the Cholesky solve is only done again after the record changes
+        :param i: position of the record, negative values count from the end
+        :return: StateEstimate object, shared by repeated calls so it should not be written in place
+        """
+        step = int(self.steps[self._get_index(i)])
+        if step not in self._state_estimates:
+            self._state_estimates[step] = self[i].get_state_estimate()
+        return self._state_estimates[step]
+
+    def get_information_vectors(self):
+        return self.get_field('vector')
+
+    def get_information_matrices(self):
+        return self.get_field('matrix')
+
+    def get_state_arrays(self, positions=None):
+        """
+        converts the whole history, or selected records of it, to state form in one batched call
+        :param positions: sequence of record positions to convert, all records if None
+        :return: (T, n) array of state estimates and (T, n, n) array of covariances
+        """
+        vectors = self.get_information_vectors()
+        matrices = self.get_information_matrices()
+        if positions is not None:
+            vectors = vectors[positions]
+            matrices = matrices[positions]
+
+        return convert_to_state_arrays(vectors, matrices)
+
+    def get_state_estimates(self, positions=None):
+        """
+        batched conversion of the history to a list of StateEstimate objects
+        :param positions: sequence of record positions to convert, all records if None
+        :return: list of StateEstimate objects
+        """
+        steps = self.get_steps()
+        if positions is not None:
+            steps = steps[positions]
+
+        states, covariances = self.get_state_arrays(positions)
+        return [StateEstimate(int(step), state.reshape((-1, 1)), covariance)
+                for step, state, covariance in zip(steps, states, covariances)]
+
+
+class BlockInformationHistory(ArrayHistory):
+    """
+    history of the information about several independent targets. The joint information matrix is block diagonal, so
+    only its (B, n, n) diagonal blocks are stored next to the (B, n) information vectors, and the memory and work grow
+    linearly with the number of targets
+    """
+    def __init__(self, block_count: int, n: int, capacity=64, ring_buffer=False):
+        super().__init__({'vector': (block_count, n), 'matrix': (block_count, n, n)}, capacity, ring_buffer)
+        self.block_count = block_count
+        self.n = n
+
+    def append_blocks(self, step: int, info_vectors: np.ndarray, info_matrices: np.ndarray):
+        """
+        :param step: time step associated with the information
+        :param info_vectors: (B, n, 1) array of information vectors, one per target
+        :param info_matrices: (B, n, n) array of information matrices, one per target
+        :return: none
+        """
+        self.append_record(step, vector=info_vectors, matrix=info_matrices)
+
+    def update_last(self, info_vectors: np.ndarray, info_matrices: np.ndarray):
+        self.update_record(-1, vector=info_vectors, matrix=info_matrices)
+
+    def get_blocks(self, i=-1):
+        """
+        zero copy access to the information about every target at one record
+        :param i: position of the record, negative values count from the end
+        :return: the step, a (B, n, 1) view of the information vectors and a (B, n, n) view of the matrices
+        """
+        step, record = self.get_record(i)
+        return step, record['vector'][..., np.newaxis], record['matrix']
+
+    def get_estimate(self, block: int, i=-1):
+        """
+        :param block: index of the target
+        :param i: position of the record, negative values count from the end
+        :return: InformationEstimate object holding a copy of the target's information
+        """
+        step, record = self.get_record(i)
+        return InformationEstimate.create_from_array(step, record['vector'][block].reshape((self.n, 1)).copy(),
+                                                     record['matrix'][block].copy())
+
+    def get_state_arrays(self, positions=None):
+        """
+        converts the whole history, or selected records of it, to state form in one batched call
+        :param positions: sequence of record positions to convert, all records if None
+        :return: (T, B, n) array of state estimates and (T, B, n, n) array of covariances
+        """
+        vectors = self.get_field('vector')
+        matrices = self.get_field('matrix')
+        if positions is not None:
+            vectors = vectors[positions]
+            matrices = matrices[positions]
+
+        return convert_to_state_arrays(vectors, matrices)
+
+
+def convert_to_state_arrays(info_vectors: np.ndarray, info_matrices: np.ndarray):
+    """
+    converts stacked information estimates to state estimates through one batched Cholesky factorization
+    :param info_vectors: (..., n) array of information vectors
+    :param info_matrices: (..., n, n) array of information matrices
+    :return: (..., n) array of state estimates and (..., n, n) array of covariances
+    """
+    n = np.size(info_matrices, -1)
+    L = np.linalg.cholesky(info_matrices)
+    L_inv = np.linalg.solve(L, np.broadcast_to(np.eye(n), np.shape(info_matrices)))
+    covariances = np.swapaxes(L_inv, -1, -2) @ L_inv
+    states = (covariances @ info_vectors[..., np.newaxis])[..., 0]
+    return states, covariances
+
+
+class MeasurementHistory(ArrayHistory):
+    """
+    history of measurements stored as a (T, m) array
+    """
+    def __init__(self, m: int, capacity=64, ring_buffer=False):
+        super().__init__({'output': (m,)}, capacity, ring_buffer)
+        self.m = m
+
+    def __getitem__(self, i: int):
+        """
+        :param i: position of the record, negative values count from the end
+        :return: Measurement object holding a copy of the record
+        """
+        step, record = self.get_record(i)
+        return Measurement.create_from_array(step, record['output'].reshape((self.m, 1)).copy())
+
+    def __iter__(self):
+        for i in range(0, len(self)):
+            yield self[i]
+
+    def append(self, measurement: Measurement):
+        self.append_record(measurement.step, output=measurement.return_data_array())
+
+    def get_measurements(self):
+        return self.get_field('output')
+
+
+class StepSeries:
+    """
+    contiguous (T, m) array of per step data with a step offset, so the row for a step is found in O(1)
+    """
+    def __init__(self, data: np.ndarray, step_offset=0):
+        self.data = data
+        self.step_offset = step_offset
+
+    @staticmethod
+    def create_from_measurements(measurement_list: list):
+        """
+        fast way to create a StepSeries from a list of Measurement objects with consecutive steps
+        :param measurement_list: list of Measurement objects ordered by step
+        :return: StepSeries object
+        """
+        data = np.array([measurement.return_data_list() for measurement in measurement_list], dtype=float)
+        step_offset = measurement_list[0].step if measurement_list else 0
+
+        for i, measurement in enumerate(measurement_list):
+            if measurement.step != step_offset + i:
+                raise ValueError("StepSeries requires consecutive steps, found step {} at index {}".format(
+                    measurement.step, i))
+
+        return StepSeries(data, step_offset)
+
+    def __len__(self):
+        return np.size(self.data, 0)
+
+    def get_first_step(self):
+        return self.step_offset
+
+    def get_last_step(self):
+        return self.step_offset + len(self) - 1
+
+    def get_row(self, step: int):
+        """
+        O(1) access to the data at a single step
+        :param step: time step of the desired row
+        :return: 1-D numpy view of the row
+        """
+        index = step - self.step_offset
+        if index < 0 or index >= len(self):
+            raise IndexError("step {} is outside of the series steps {} to {}".format(
+                step, self.get_first_step(), self.get_last_step()))
+
+        return self.data[index]
+
+    def get_range(self, start_step: int, stop_step: int):
+        """
+        access to a block of consecutive steps
+        :param start_step: first step to include
+        :param stop_step: step to stop before
+        :return: 2-D numpy view of the rows
+        """
+        start = max(start_step - self.step_offset, 0)
+        stop = max(stop_step - self.step_offset, 0)
+        return self.data[start:stop]
+
+    def get_batch(self, steps):
+        """
+        access to an arbitrary collection of steps
+        :param steps: sequence or numpy array of time steps
+        :return: 2-D numpy array with one row per requested step
+        """
+        indices = np.asarray(steps) - self.step_offset
+        if np.any(indices < 0) or np.any(indices >= len(self)):
+            raise IndexError("requested steps are outside of the series steps {} to {}".format(
+                self.get_first_step(), self.get_last_step()))
+
+        return self.data[indices]
+
+
+class StreamingTruthModel:
+    """
+    drop in replacement for TruthModel that pulls the ground truth and true measurements from streams as the
+    simulation asks for them. Only a look-back window of the latest steps is kept, so memory stays constant however
+    long the run is
+    """
+    def __init__(self, ground_truth_stream, true_measurement_stream, window=64):
+        """
+        :param ground_truth_stream: iterator of GroundTruth objects with consecutive steps
+        :param true_measurement_stream: iterator of Measurement objects with the same steps
+        :param window: number of past steps that stay available, must cover how far apart the consumers are
+        """
+        self.ground_truth_stream = iter(ground_truth_stream)
+        self.true_measurement_stream = iter(true_measurement_stream)
+        self.window = window
+
+        # created on the first pull, once the state and measurement dimensions are known
+        self.history = None
+
+    def get_true_measurement(self, step: int):
+        """
+        O(1) lookup of the true measurement at a time step inside the window
+        :param step: time step of the measurement
+        :return: Measurement object holding a copy, the window overwrites its oldest rows
+        """
+        record = self._get_record(step)
+        return Measurement.create_from_array(step, record['output'].reshape((-1, 1)).copy())
+
+    def get_ground_truth(self, step: int):
+        """
+        :param step: time step inside the window
+        :return: GroundTruth object
+        """
+        record = self._get_record(step)
+        return GroundTruth.create_from_array(step, record['state'].reshape((-1, 1)).copy())
+
+    def get_window(self):
+        """
+        zero copy access to the look-back window, unless the ring buffer has wrapped around
+        :return: (T,) array of steps, (T, n) array of true states and (T, m) array of true measurements
+        """
+        if self.history is None:
+            self._pull()
+        return self.history.get_steps(), self.history.get_field('state'), self.history.get_field('output')
+
+    def get_last_step(self):
+        if self.history is None:
+            self._pull()
+        return self.history.get_record(-1)[0]
+
+    def _get_record(self, step: int):
+        while self.history is None or self.get_last_step() < step:
+            self._pull()
+
+        first_step, _ = self.history.get_record(0)
+        if step < first_step:
+            raise IndexError("step {} has left the look-back window of steps {} to {}".format(
+                step, first_step, self.get_last_step()))
+
+        _, record = self.history.get_record(step - first_step)
+        return record
+
+    def _pull(self):
+        try:
+            ground_truth = next(self.ground_truth_stream)
+            measurement = next(self.true_measurement_stream)
+        except StopIteration:
+            raise IndexError("the truth streams ended before the requested step") from None
+
+        if ground_truth.step != measurement.step:
+            raise ValueError("ground truth step {} does not match measurement step {}".format(
+                ground_truth.step, measurement.step))
+
+        if self.history is None:
+            n = ground_truth.get_dimension()
+            m = measurement.get_dimension()
+            self.history = ArrayHistory({'state': (n,), 'output': (m,)}, self.window, ring_buffer=True)
+
+        self.history.append_record(ground_truth.step, state=ground_truth.return_data_array(),
+                                   output=measurement.return_data_array())
 
 
 class TruthModel:
@@ -8,6 +451,22 @@ class TruthModel:
         self.state_estimate = state_estimate
         self.true_measurements = true_measurements
 
+        self.measurement_series = None
+        if true_measurements:
+            self.measurement_series = StepSeries.create_from_measurements(true_measurements)
+
+    def get_true_measurement(self, step: int):
+        """
+        O(1) lookup of the true measurement at a time step
+        :param step: time step of the measurement
+        :return: Measurement object holding a copy of the row
+        """
+        if self.measurement_series is None:
+            raise IndexError("the truth model was created without true measurements")
+
+        row = self.measurement_series.get_row(step)
+        return Measurement.create_from_array(step, row.reshape((-1, 1)).copy())
+
     def plot_state_estimate(self):
         x_coordinates = [x.x_1 for x in self.state_estimate]
         y_coordinates = [y.x_2 for y in self.state_estimate]
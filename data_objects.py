@@ -3,117 +3,145 @@ from math import sqrt
 import matplotlib.pyplot as plt
 from matplotlib.patches import Ellipse
 import numpy as np
+from scipy import linalg
 
 
-class GroundTruth:
+class ArrayRecord:
     """
-    data object to hold all information pertinent to the ground truth at a given time step
+    base for data objects that hold a single n x 1 numpy array of values for a time step. Components can still be read
+    by name, ie. 'x_1' is the first value of a record with the 'x' prefix
     """
-    def __init__(self, step: int, state_1: float, state_2: float, state_names=None):
+    __slots__ = ('step', 'data')
+    prefix = ''
+
+    def __init__(self, step: int, data_array: np.ndarray):
         self.step = step
-        self.x_1 = state_1
-        self.x_2 = state_2
+        self.data = data_array
+
+    def __getattr__(self, name):
+        prefix, _, index = name.rpartition('_')
+        if prefix == self.prefix and index.isdigit() and int(index) > 0:
+            try:
+                return self.data[int(index) - 1, 0]
+            except IndexError:
+                pass
+
+        raise AttributeError("'{}' object has no attribute '{}'".format(type(self).__name__, name))
+
+    def get_dimension(self):
+        return np.size(self.data, 0)
+
+    def return_data_array(self):
+        """
+        provides intuitive and usefully formatted access to the data without copying it.
+        :return: the data as an n x 1 numpy array
+        """
+        return self.data
+
+    def return_data_list(self):
+        """
+        provides intuitive and usefully formatted access to the data.
+        :return: the data as a list
+        """
+        return self.data[:, 0].tolist()
+
+
+def as_column(values):
+    """
+    views an array or list of values as an n x 1 float array, only copying when the input is not already floats
+    :param values: numpy array of any shape with n values, or a list
+    :return: n x 1 numpy array
+    """
+    return np.asarray(values, dtype=float).reshape((-1, 1))
+
+
+class GroundTruth(ArrayRecord):
+    """
+    data object to hold all information pertinent to the ground truth at a given time step
+    """
+    __slots__ = ('state_names',)
+    prefix = 'x'
+
+    def __init__(self, step: int, state_array: np.ndarray, state_names=None):
+        super().__init__(step, state_array)
         self.state_names = state_names
 
     @staticmethod
     def create_from_array(step: int, state_array: np.ndarray):
         """
-        fast way to create a StateEstimate object from a numpy array of the state
+        fast way to create a GroundTruth object from a numpy array of the state
         :param step: time step associated with the data
         :param state_array: numpy array with ordered state values
-        :return: StateEstimate object
+        :return: GroundTruth object
         """
-        if state_array.shape[1]:
-            # reduces 2D state array down to a single dimension
-            state_array = state_array.squeeze()
-
-        return GroundTruth(
-            step,
-            state_array[0],
-            state_array[1],
-        )
+        return GroundTruth(step, as_column(state_array))
 
     @staticmethod
     def create_from_list(step: int, state_list: list):
         """
-        fast way to create a StateEstimate object from a numpy array of the state
+        fast way to create a GroundTruth object from a list of the state
         :param step: time step associated with the data
         :param state_list: list with ordered state values
-        :return: StateEstimate object
+        :return: GroundTruth object
         """
-        return GroundTruth(
-            step,
-            state_list[0],
-            state_list[1],
-        )
-
-    def return_data_array(self):
-        """
-        provides intuitive and usefully formatted access to the state estimate data.
-        :return: the state estimate data as an order 2D numpy array
-        """
-        return np.array([
-            [self.x_1],
-            [self.x_2],
-        ])
+        return GroundTruth(step, as_column(state_list))
 
     def plot(self):
-        plt.plot(self.x_1, self.x_2)
+        plt.plot(self.data[0, 0], self.data[1, 0])
 
 
-class InformationEstimate:
-    def __init__(self, step: int, info_1: float, info_2: float, info_matrix: np.ndarray):
-        self.step = step
-        self.i_1 = info_1
-        self.i_2 = info_2
+class InformationEstimate(ArrayRecord):
+    __slots__ = ('I_matrix',)
+    prefix = 'i'
+
+    def __init__(self, step: int, info_array: np.ndarray, info_matrix: np.ndarray):
+        super().__init__(step, info_array)
         self.I_matrix = info_matrix
 
     @staticmethod
     def create_from_array(step: int, info_array: np.ndarray, info_matrix: np.ndarray):
-        if info_array.shape[1]:
-            # reduces 2D state array down to a single dimension
-            info_array = info_array.squeeze()
-
-        return InformationEstimate(
-            step,
-            info_array[0],
-            info_array[1],
-            info_matrix
-        )
-
-    def return_data_array(self):
-        return np.array([
-            [self.i_1],
-            [self.i_2],
-        ])
+        return InformationEstimate(step, as_column(info_array), info_matrix)
 
     def return_information_matrix(self):
         return self.I_matrix
 
     def get_state_estimate(self):
-        covariance = np.linalg.inv(self.I_matrix)
-        state_array = covariance @ self.return_data_array()
-        return StateEstimate.create_from_array(self.step, state_array, covariance)
+        """
+        converts to state form with a Cholesky solve
+        :return: StateEstimate object
+        """
+        n = self.get_dimension()
+        factor = linalg.cho_factor(self.I_matrix, lower=True)
+        covariance = linalg.cho_solve(factor, np.eye(n))
+        state_array = linalg.cho_solve(factor, self.data)
+        return StateEstimate(self.step, state_array, covariance)
 
     def update(self, info_array: np.ndarray, info_matrix: np.ndarray):
-        self.i_1, self.i_2 = info_array[0][0], info_array[1][0]
+        self.data = as_column(info_array)
         self.I_matrix = info_matrix
 
 
-class StateEstimate:
+class StateEstimate(ArrayRecord):
     """
     data object to hold all information pertinent to the state estimate at a given time step
     """
-    def __init__(self, step: int, state_1: float, state_2: float, covariance,
-                 state_names=None):
-        self.step = step
-        self.x_1 = state_1
-        self.x_2 = state_2
+    __slots__ = ('covariance', 'two_sigma', 'state_names')
+    prefix = 'x'
+
+    def __init__(self, step: int, state_array: np.ndarray, covariance, state_names=None):
+        super().__init__(step, state_array)
         self.state_names = state_names
 
         self.covariance = covariance
-        self.x1_2sigma = 2 * float(covariance[0][0]) ** 0.5
-        self.x2_2sigma = 2 * float(covariance[1][1]) ** 0.5
+        self.two_sigma = 2 * np.sqrt(np.diagonal(covariance))
+
+    @property
+    def x1_2sigma(self):
+        return self.two_sigma[0]
+
+    @property
+    def x2_2sigma(self):
+        return self.two_sigma[1]
 
     @staticmethod
     def create_from_array(step: int, state_array: np.ndarray, covariance: np.ndarray):
@@ -124,50 +152,18 @@ class StateEstimate:
         :param covariance: numpy array with the estimate covariance
         :return: StateEstimate object
         """
-        if state_array.shape[1]:
-            # reduces 2D state array down to a single dimension
-            state_array = state_array.squeeze()
-
-        return StateEstimate(
-            step,
-            state_array[0],
-            state_array[1],
-            covariance
-        )
+        return StateEstimate(step, as_column(state_array), covariance)
 
     @staticmethod
     def create_from_list(step: int, state_list: list, covariance):
         """
-        fast way to create a StateEstimate object from a numpy array of the state
+        fast way to create a StateEstimate object from a list of the state
         :param step: time step associated with the data
         :param state_list: list with ordered state values
-        :param state_list: list with covariance #TODO: decide if this is a np array
+        :param covariance: numpy array with the estimate covariance
         :return: StateEstimate object
         """
-        return StateEstimate(
-            step,
-            state_list[0],
-            state_list[1],
-            covariance
-        )
-
-    def return_data_array(self):
-        """
-        provides intuitive and usefully formatted access to the state estimate data.
-        :return: the state estimate data as an order 2D numpy array
-        """
-        return np.array([
-            [self.x_1],
-            [self.x_2],
-        ])
-
-    def return_data_list(self):
-        """
-        provides intuitive and usefully formatted access to the state estimate data.
-        :return: the state estimate data as a list
-        """
-        return [self.x_1, self.x_2]
-
+        return StateEstimate(step, as_column(state_list), np.asarray(covariance, dtype=float))
 
     def return_covariance_array(self):
         """
@@ -179,49 +175,49 @@ class StateEstimate:
     def get_two_sigma_value(self, state: str):
         """
         provides intuitive access to the two sigma value
-        :param state: name of the state attribute associated with the desired two sigma value
-        :return: a float of the two sigma value, or 'None" if the v
+        :param state: name of the state attribute associated with the desired two sigma value, ie. 'x_1'
+        :return: a float of the two sigma value, or 'None" if the state is not found
         """
-        if state == 'x_1':
-            return self.x1_2sigma
-        elif state == 'x_2':
-            return self.x2_2sigma
-        else:
-            print("ERROR: requested state not found for 'get_two_sigma_value' in data_objects")
-            return None
+        prefix, _, index = state.rpartition('_')
+        if prefix == self.prefix and index.isdigit() and 0 < int(index) <= self.get_dimension():
+            return self.two_sigma[int(index) - 1]
+
+        print("ERROR: requested state not found for 'get_two_sigma_value' in data_objects")
+        return None
 
     def plot_state(self, color):
-        plt.plot(self.x_1, self.x_2, 'd', color=color, markerfacecolor='none')
+        plt.plot(self.data[0, 0], self.data[1, 0], 'd', color=color, markerfacecolor='none')
 
     def get_covariance_ellipse(self, color='b'):
         major_axis = 2*self.x1_2sigma * sqrt(5.991)
         minor_axis = 2 * self.x2_2sigma * sqrt(5.991)
 
-        return Ellipse(xy=(self.x_1, self.x_2), width=major_axis, height=minor_axis, edgecolor=color, fc='None',
-                       ls='--')
+        return Ellipse(xy=(self.data[0, 0], self.data[1, 0]), width=major_axis, height=minor_axis, edgecolor=color,
+                       fc='None', ls='--')
 
 
-class Measurement:
+class Measurement(ArrayRecord):
     """
     data object to hold all information pertinent to the measurement data at a given time step
     """
-    def __init__(self, step, output_1, output_2, output_names=None):
-        self.step = step
-        self.y_1 = output_1
-        self.y_2 = output_2
+    __slots__ = ('output_names',)
+    prefix = 'y'
+
+    def __init__(self, step, output_array: np.ndarray, output_names=None):
+        super().__init__(step, output_array)
         self.output_names = output_names
 
     @staticmethod
     def create_from_dict(lookup):
         """
         Used to construct objects directly from a CSV data file
-        :param lookup: dictionary keys
-        :return: constructed ground truth object
+        :param lookup: dictionary keys, outputs are named 'y_1', 'y_2', ...
+        :return: constructed measurement object
         """
+        m = len([key for key in lookup if key.startswith('y_')])
         return Measurement(
             int(lookup['step']),
-            float(lookup['y_1']),
-            float(lookup['y_2']),
+            as_column([float(lookup['y_{}'.format(i)]) for i in range(1, m + 1)]),
         )
 
     @staticmethod
@@ -232,44 +228,14 @@ class Measurement:
         :param output_array: numpy array with ordered measurement values
         :return: Measurement object
         """
-        if output_array.shape[1]:
-            # reduces 2D measurement array down to a single dimension
-            output_array = output_array.squeeze()
-
-        return Measurement(
-            step,
-            output_array[0],
-            output_array[1],
-        )
+        return Measurement(step, as_column(output_array))
 
     @staticmethod
     def create_from_list(step: int, output_list: list):
         """
-        fast way to create a Measurement object from a numpy array of measurements
+        fast way to create a Measurement object from a list of measurements
         :param step: time step associated with the data
         :param output_list: list with ordered measurement values
         :return: Measurement object
         """
-
-        return Measurement(
-            step,
-            output_list[0],
-            output_list[1],
-        )
-
-    def return_data_list(self):
-        """
-        provides intuitive access to the measurement data
-        :return: the measurement data as a list
-        """
-        return [self.y_1, self.y_2]
-
-    def return_data_array(self):
-        """
-        provides intuitive access to the measurement data
-        :return: the measurement data as a 2D numpy array
-        """
-        return np.array([
-            [self.y_1],
-            [self.y_2],
-        ])
+        return Measurement(step, as_column(output_list))
@@ -0,0 +1,239 @@
+import argparse
+import multiprocessing
+import struct
+
+import numpy as np
+
+import static_linear_program as SLP
+import wire_format
+from wire_format import LinkTraffic
+from workspace import Hider, Seeker
+
+# receiver id and message length in front of every message sent between processes
+ENVELOPE = struct.Struct('<II')
+
+
+class SeekerSpec:
+    """
+    data object with everything a worker process needs to rebuild a seeker on its side of the process boundary
+    """
+    def __init__(self, name: str, state: dict, color: str, R: np.ndarray, seed_sequence: np.random.SeedSequence):
+        self.name = name
+        self.state = state
+        self.color = color
+        self.R = R
+        self.seed_sequence = seed_sequence
+
+    @staticmethod
+    def create_from_seeker(seeker, seed_sequence: np.random.SeedSequence):
+        return SeekerSpec(seeker.name, dict(seeker.state), seeker.color, seeker.R, seed_sequence)
+
+    def create_seeker(self):
+        return Seeker(self.name, self.state, self.color, self.R, np.random.default_rng(self.seed_sequence))
+
+
+class RemotePeer:
+    """
+    stands in for a seeker that lives in another process. A channel filter only needs the peer's name, the novel
+    information itself arrives through the coordinator
+    """
+    def __init__(self, name: str):
+        self.name = name
+
+
+def run_worker(connection, specs: list, comm_lines: list, seeker_ids: dict, state_space, x0: np.ndarray, steps: int,
+               dtype=np.float64, threshold=None, metric='trace'):
+    """
+    entry point of a worker process that owns a group of seekers
+    :param connection: pipe connection to the coordinator
+    :param specs: list of SeekerSpec objects for the seekers in this group
+    :param comm_lines: list of (name_i, name_j) tuples for every two way link in the whole network
+    :param seeker_ids: dictionary of seeker names to the integer ids used on the wire
+    :param state_space: target state space
+    :param x0: n x 1 numpy array with the initial target state
+    :param steps: number of filter steps
+    :param dtype: numpy.float64 or numpy.float32 message payload
+    :param threshold: event trigger threshold of the channel filters, None sends every step
+    :param metric: novelty metric used with the threshold
+    :return: none, the seeker histories are sent back over the connection
+    """
+    seekers = {spec.name: spec.create_seeker() for spec in specs}
+    seeker_names = {i: name for name, i in seeker_ids.items()}
+
+    state = {'x{}'.format(i + 1): float(value) for i, value in enumerate(np.ravel(x0))}
+    hider = Hider('hider', state, 'r', state_space)
+    hider.truth_model = SLP.build_truth_model(state_space, hider.return_ground_truth(), steps)
+
+    for name_i, name_j in comm_lines:
+        for a, b in ((name_i, name_j), (name_j, name_i)):
+            if a in seekers:
+                seekers[a].create_channel_filter(seekers.get(b, RemotePeer(b)), hider, threshold, metric)
+
+    for _ in range(0, steps):
+        # Run Local Updates ====================================================
+        inbox = {}
+        outgoing = list()
+        for seeker in seekers.values():
+            seeker.run_filter(hider)
+            step = seeker.information_history[-1].step
+            for name, cf in seeker.channel_filter_dict.items():
+                sent = cf.update_and_send()
+                if name in seekers:
+                    inbox[(seeker.name, name)] = (cf.yi_novel, cf.Yi_novel) if sent else None
+                elif sent:
+                    message = wire_format.encode(step, seeker_ids[seeker.name], cf.yi_novel, cf.Yi_novel, dtype)
+                    outgoing.append((name, message))
+                else:
+                    outgoing.append((name, wire_format.encode_skip(step, seeker_ids[seeker.name])))
+
+        # exchange with the other processes through the coordinator
+        connection.send_bytes(pack_envelopes(outgoing, seeker_ids))
+        for receiver, message in unpack_envelopes(connection.recv_bytes(), seeker_names):
+            novel = wire_format.decode(message)
+            if novel.is_skip():
+                inbox[(seeker_names[novel.sender], receiver)] = None
+            else:
+                inbox[(seeker_names[novel.sender], receiver)] = (novel.yi_novel, novel.return_information_matrix())
+
+        # Fuse Data ============================================================
+        for seeker in seekers.values():
+            for name, cf in seeker.channel_filter_dict.items():
+                novel = inbox[(name, seeker.name)]
+                if novel is None:
+                    cf.receive_nothing()
+                else:
+                    cf.receive_novel(*novel)
+            seeker.fuse_data()
+
+    results = {}
+    for name, seeker in seekers.items():
+        history = seeker.information_history
+        results[name] = (history.get_steps().copy(), history.get_information_vectors().copy(),
+                         history.get_information_matrices().copy())
+    connection.send(results)
+    connection.close()
+
+
+def pack_envelopes(envelopes: list, seeker_ids: dict):
+    """
+    joins encoded messages into one buffer, each prefixed with the receiver id and the message length
+    :param envelopes: list of (receiver name, encoded message) tuples
+    :param seeker_ids: dictionary of seeker names to integer ids
+    :return: bytes
+    """
+    parts = list()
+    for receiver, message in envelopes:
+        parts.append(ENVELOPE.pack(seeker_ids[receiver], len(message)))
+        parts.append(message)
+    return b''.join(parts)
+
+
+def unpack_envelopes(buffer: bytes, seeker_names: dict):
+    """
+    splits a buffer made by pack_envelopes without copying the messages
+    :param buffer: bytes
+    :param seeker_names: dictionary of integer ids to seeker names
+    :return: list of (receiver name, message memoryview) tuples
+    """
+    view = memoryview(buffer)
+    envelopes = list()
+    offset = 0
+    while offset < len(view):
+        receiver, size = ENVELOPE.unpack_from(view, offset)
+        offset += ENVELOPE.size
+        envelopes.append((seeker_names[receiver], view[offset:offset + size]))
+        offset += size
+    return envelopes
+
+
+def run_distributed(groups: list, comm_lines: list, state_space, x0: np.ndarray, steps: int, dtype=np.float64,
+                    traffic=None, threshold=None, metric='trace'):
+    """
+    runs each group of seekers in its own OS process, with this process acting as the radio network between them
+    :param groups: list of lists of SeekerSpec objects, one list per worker process
+    :param comm_lines: list of (name_i, name_j) tuples for every two way link
+    :param state_space: target state space
+    :param x0: n x 1 numpy array with the initial target state
+    :param steps: number of filter steps
+    :param dtype: numpy.float64 or numpy.float32 message payload
+    :param traffic: optional LinkTraffic object that counts the bytes crossing process boundaries
+    :param threshold: event trigger threshold of the channel filters, None sends every step
+    :param metric: novelty metric used with the threshold
+    :return: dictionary of seeker names to (steps, information vectors, information matrices) history arrays
+    """
+    owner = {spec.name: i for i, group in enumerate(groups) for spec in group}
+    seeker_ids = {spec.name: i for i, spec in enumerate(spec for group in groups for spec in group)}
+    seeker_names = {i: name for name, i in seeker_ids.items()}
+
+    connections = list()
+    processes = list()
+    for group in groups:
+        parent_connection, child_connection = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=run_worker,
+                                          args=(child_connection, group, comm_lines, seeker_ids, state_space, x0,
+                                                steps, dtype, threshold, metric))
+        process.start()
+        child_connection.close()
+        connections.append(parent_connection)
+        processes.append(process)
+
+    for _ in range(0, steps):
+        # route every message to the process that owns its receiver
+        inbound = [list() for _ in groups]
+        for connection in connections:
+            for receiver, message in unpack_envelopes(connection.recv_bytes(), seeker_names):
+                inbound[owner[receiver]].append((receiver, message))
+                if traffic is not None:
+                    step, sender = wire_format.read_header(message)
+                    traffic.record_sent(seeker_names[sender], receiver, step, len(message))
+                    traffic.record_received(seeker_names[sender], receiver, len(message))
+
+        for connection, envelopes in zip(connections, inbound):
+            connection.send_bytes(pack_envelopes(envelopes, seeker_ids))
+
+    results = {}
+    for connection in connections:
+        results.update(connection.recv())
+        connection.close()
+
+    for process in processes:
+        process.join()
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="run the static linear example with seeker groups in separate "
+                                                 "processes")
+    parser.add_argument('--tf', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--float32', action='store_true', help="send single precision messages")
+    args = parser.parse_args()
+
+    dt = 1
+    steps = args.tf + 1
+    workspace, state_space = SLP.setup(dt)
+    seeker_list = workspace.robots[0:5]
+    hider = workspace.robots[6]
+
+    seed_sequences = np.random.SeedSequence(args.seed).spawn(len(seeker_list))
+    specs = [SeekerSpec.create_from_seeker(seeker, seed) for seeker, seed in zip(seeker_list, seed_sequences)]
+    groups = [specs[0:2], specs[2:3], specs[3:5]]
+    comm_lines = [(i.name, j.name) for i, j in SLP.get_comm_lines(seeker_list)]
+
+    dtype = np.float32 if args.float32 else np.float64
+    traffic = LinkTraffic()
+    x0 = hider.return_ground_truth().return_data_array()
+    results = run_distributed(groups, comm_lines, state_space, x0, steps, dtype, traffic)
+    traffic.print_summary()
+    print()
+
+    for seeker in seeker_list:
+        _, vectors, matrices = results[seeker.name]
+        print("State Estimate from {}: ".format(seeker.name))
+        print(np.around(np.linalg.solve(matrices[-1], vectors[-1]).reshape((-1, 1)), 2))
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 import numpy as np
 from scipy import linalg
 from data_objects import Measurement
@@ -7,17 +9,137 @@ from data_objects import Measurement
 
 class DiscreteLinearStateSpace:
     def __init__(self, f, g, h, m, q, r, dt):
-        self.F = f
+        self._F = f
         self.G = g
         self.H = h
         self.M = m
-        self.Q = q
+        self._Q = q
         self.R = r
         self.dt = dt
 
+        self._F_inv = None
+        self._F_inv_T = None
+        self._Q_inv = None
+        self._Q_sqrt = None
+
+    @property
+    def F(self):
+        return self._F
+
+    @F.setter
+    def F(self, f):
+        # assigning a new matrix invalidates the cached factorizations, in place edits are not tracked
+        self._F = f
+        self._F_inv = None
+        self._F_inv_T = None
+
+    @property
+    def Q(self):
+        return self._Q
+
+    @Q.setter
+    def Q(self, q):
+        self._Q = q
+        self._Q_inv = None
+        self._Q_sqrt = None
+
     def get_dimensions(self):
         return [np.size(self.F, 1), np.size(self.H, 1)]
 
+    def get_F_inv(self):
+        """
+        inverse of the dynamics matrix, computed once and cached until F is reassigned
+        :return: n x n numpy array
+        """
+        if self._F_inv is None:
+            self._F_inv = np.linalg.inv(self._F)
+        return self._F_inv
+
+    def get_F_inv_T(self):
+        """
+        transpose of the inverse dynamics matrix, cached as a contiguous array until F is reassigned
+        :return: n x n numpy array
+        """
+        if self._F_inv_T is None:
+            self._F_inv_T = np.ascontiguousarray(self.get_F_inv().T)
+        return self._F_inv_T
+
+    def get_Q_inv(self):
+        """
+        inverse of the process noise covariance from its Cholesky factor, cached until Q is reassigned
+        :return: n x n numpy array
+        """
+        if self._Q_inv is None:
+            n = np.size(self._Q, 0)
+            self._Q_inv = linalg.cho_solve(linalg.cho_factor(self._Q, lower=True), np.eye(n))
+        return self._Q_inv
+
+    def get_Q_sqrt(self):
+        """
+        lower triangular Cholesky factor of the process noise covariance, cached until Q is reassigned
+        :return: n x n numpy array
+        """
+        if self._Q_sqrt is None:
+            self._Q_sqrt = linalg.cholesky(self._Q, lower=True)
+        return self._Q_sqrt
+
+
+class NoiseGenerator:
+    """
+    draws zero mean Gaussian sensor noise. The Cholesky factor of R is computed once and noise is pre-drawn in blocks
+    from a numpy random Generator
+    """
+    def __init__(self, R: np.ndarray, rng=None, block_size=1024):
+        """
+        :param R: sensor noise covariance
+        :param rng: numpy random Generator, a fresh one is created if not provided
+        :param block_size: number of samples drawn each time the buffer runs out
+        """
+        self.R = R
+        self.S_v = linalg.cholesky(R, lower=True)
+        self.rng = np.random.default_rng() if rng is None else rng
+        self.block_size = block_size
+
+        self._buffer = np.zeros((0, np.size(R, 0)))
+        self._index = 0
+
+    def draw(self, count=1):
+        """
+        hands out raw noise samples from the buffer, refilling it when needed
+        :param count: number of samples
+        :return: p x count numpy array of noise samples
+        """
+        if self._index + count > np.size(self._buffer, 0):
+            self._refill(count)
+
+        samples = self._buffer[self._index:self._index + count]
+        self._index += count
+        return samples.T
+
+    def sample_array(self, mu: np.ndarray):
+        """
+        noisy copy of a measurement array
+        :param mu: p x 1 numpy array with the true measurement
+        :return: p x 1 numpy array
+        """
+        return mu + self.draw(1)
+
+    def sample(self, true_measurement: Measurement):
+        """
+        noisy copy of a Measurement object
+        :param true_measurement: Measurement with the true output values
+        :return: Measurement object
+        """
+        sample = self.sample_array(true_measurement.return_data_array())
+        return Measurement.create_from_array(true_measurement.step, sample)
+
+    def _refill(self, count: int):
+        p = np.size(self.R, 0)
+        leftover = self._buffer[self._index:]
+        block = self.S_v @ self.rng.standard_normal((p, max(self.block_size, count)))
+        self._buffer = np.concatenate([leftover, block.T])
+        self._index = 0
+
 
 def get_time_vector(t_0: float, t_f: float, dt: float):
     """
@@ -31,47 +153,69 @@ def get_time_vector(t_0: float, t_f: float, dt: float):
 
 
 def get_true_measurements(state_space, gt_list: list):
+    return list(generate_true_measurements(state_space, gt_list))
 
-    H = state_space.H
-    measurement_list = list()
-
-    for gt in gt_list:
-        step = gt.step
-        measurement = H @ gt.return_data_array()
-        measurement_list.append(Measurement.create_from_array(step, measurement))
 
-    return measurement_list
+def generate_true_measurements(state_space, ground_truth_stream):
+    """
+    streams the noise free measurements of a ground truth stream
+    :param state_space: target state space
+    :param ground_truth_stream: iterable of GroundTruth objects, like system_dynamics.generate_ground_truth
+    :return: generator of Measurement objects
+    """
+    H = state_space.H
+    for gt in ground_truth_stream:
+        yield Measurement.create_from_array(gt.step, H @ gt.return_data_array())
 
 
-def monte_carlo_sample(mu: np.ndarray, r: np.ndarray, t=1):
+def monte_carlo_sample(mu: np.ndarray, r: np.ndarray, t=1, rng=None):
     """
     creates a monte carlo sample from the mean and covariance
     :param mu: distribution mean
     :param r: distribution covariance
     :param t: number of samples to generate
-    :return:
+    :param rng: numpy random Generator, the global numpy random state is used if not provided
+    :return: p x t numpy array of samples
     """
-    p = np.size(r, 0)
+    s_v = get_cholesky_factor(r)
+    p = np.size(s_v, 0)
+    q_k = np.random.randn(p, t) if rng is None else rng.standard_normal((p, t))
+    return mu + s_v @ q_k
 
-    s_v = linalg.cholesky(r, lower=True)
-    q_k = np.random.randn(p, t)
-    simulated_measurements = mu + s_v @ q_k
 
-    return simulated_measurements
+def get_noisy_measurement(R: np.ndarray, true_measurement: Measurement, rng=None):
+    sample = monte_carlo_sample(true_measurement.return_data_array(), R, 1, rng)
+    return Measurement.create_from_array(true_measurement.step, sample)
 
 
-def get_noisy_measurement(R: np.ndarray, true_measurement: Measurement):
-    step = true_measurement.step
-    sample = monte_carlo_sample(true_measurement.return_data_array(), R, 1)
-    noisy_measurement = Measurement.create_from_array(step, sample)
-    return noisy_measurement
+def get_noisy_measurements(R: np.ndarray, true_measurements: list, rng=None):
+    """
+    noisy copies of a list of measurements with the noise drawn in one block, in the same order as drawing one
+    measurement at a time
+    :param R: sensor noise covariance
+    :param true_measurements: list of Measurement objects with the true output values
+    :param rng: numpy random Generator, the global numpy random state is used if not provided
+    :return: list of Measurement objects
+    """
+    s_v = get_cholesky_factor(R)
+    shape = (len(true_measurements), np.size(s_v, 0))
+    noise = (np.random.randn(*shape) if rng is None else rng.standard_normal(shape)) @ s_v.T
+    return [Measurement.create_from_array(measurement.step, measurement.return_data_array() + v.reshape((-1, 1)))
+            for measurement, v in zip(true_measurements, noise)]
 
 
-def get_noisy_measurements(R: np.ndarray, true_measurements: list):
-    noisy_measurements = list()
-    for measurement in true_measurements:
-        noisy_measurement = get_noisy_measurement(R, measurement)
-        noisy_measurements.append(noisy_measurement)
+def get_cholesky_factor(R: np.ndarray):
+    """
+    lower Cholesky factor of a covariance, cached so repeated draws with the same covariance skip the factorization
+    :param R: covariance matrix
+    :return: read only lower triangular numpy array
+    """
+    R = np.asarray(R, dtype=float)
+    return _factor_covariance(np.shape(R), R.tobytes())
 
-    return noisy_measurements
 
+@lru_cache(maxsize=32)
+def _factor_covariance(shape: tuple, r_bytes: bytes):
+    s_v = linalg.cholesky(np.frombuffer(r_bytes).reshape(shape), lower=True)
+    s_v.flags.writeable = False
+    return s_v
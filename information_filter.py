@@ -1,4 +1,5 @@
 import numpy as np
+from scipy import linalg
 from data_objects import InformationEstimate, Measurement
 from estimation_tools import DiscreteLinearStateSpace
 
@@ -11,22 +12,26 @@ def run(target_state_space: DiscreteLinearStateSpace, state: InformationEstimate
     z_k1 = measurement.return_data_array()
 
     y_k1_m, Y_k1_m = time_update(target_state_space, y_k0_p, Y_k0_p)
+    if np.isnan(z_k1).any():
+        # occluded sensor, the prediction is the estimate
+        return InformationEstimate.create_from_array(step + 1, y_k1_m, Y_k1_m)
+
     i_k1_p, I_k1_p = measurement_update(target_state_space, y_k1_m, Y_k1_m, z_k1, R)
 
-    return InformationEstimate.create_from_array(step, i_k1_p, I_k1_p)
+    return InformationEstimate.create_from_array(step + 1, i_k1_p, I_k1_p)
 
 
 def time_update(state_space: DiscreteLinearStateSpace, y_k0_p: np.ndarray, Y_k0_p: np.ndarray):
-    F_k = state_space.F
-    Q_k = state_space.Q
+    F_inv_k = state_space.get_F_inv()
+    F_inv_T_k = state_space.get_F_inv_T()
+    Q_inv_k = state_space.get_Q_inv()
 
     n, _ = state_space.get_dimensions()
 
-    F_inv_k = np.linalg.inv(F_k)
-
-    M_k = F_inv_k.T @ Y_k0_p @ F_inv_k
-    L_k = np.eye(n) - M_k @ np.linalg.inv(M_k + np.linalg.inv(Q_k))
-    y_k1_m = L_k @ F_inv_k.T @ y_k0_p
+    M_k = F_inv_T_k @ Y_k0_p @ F_inv_k
+    # M_k @ inv(M_k + Q^-1) through a Cholesky solve, the sum is symmetric positive definite
+    L_k = np.eye(n) - linalg.cho_solve(linalg.cho_factor(M_k + Q_inv_k, lower=True), M_k).T
+    y_k1_m = L_k @ F_inv_T_k @ y_k0_p
     Y_k1_m = L_k @ M_k
 
     return y_k1_m, Y_k1_m
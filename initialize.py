@@ -1,18 +1,21 @@
 import csv
 import os
+
+import numpy as np
+
 from workspace import Workspace, Seeker, Hider
 
 
 def initialize_environment(environment_filename: str):
     filename = get_map_data_file(environment_filename)
-    bounds, obstacles = load_environment_data(filename)
+    bounds, obstacles = load_environment_arrays(filename)
     return Workspace(environment_filename, bounds, obstacles)
 
 
-def initialize_seeker(name: str, pose_file: str, color: str, workspace: Workspace, R=None):
+def initialize_seeker(name: str, pose_file: str, color: str, workspace: Workspace, R=None, rng=None):
     filename = get_pose_data_file(pose_file)
     initial_state = load_robot_state_data(filename)
-    robot = Seeker(name, initial_state, color, R)
+    robot = Seeker(name, initial_state, color, R, rng)
     workspace.robots.append(robot)
     return robot
 
@@ -51,32 +54,29 @@ def load_environment_data(filename):
     :param filename: path and name to the file with robot state information
     :return: lists of tuples of coordinates for the environment boundaries and obstacles
     """
-    environment_bounds = list()
-    obstacles = list()
-
-    with open(filename, 'r', encoding='utf8') as fin:
-
-        reader = csv.reader(fin, skipinitialspace=True, delimiter=',')
-
-        raw_bounds = next(reader)
-        while raw_bounds:
-            x_coordinate = int(raw_bounds.pop(0))
-            y_coordinate = int(raw_bounds.pop(0))
-            coordinate = (x_coordinate, y_coordinate)
-            environment_bounds.append(coordinate)
+    bounds, obstacles = load_environment_arrays(filename)
+    environment_bounds = [tuple(coordinate) for coordinate in bounds.tolist()]
+    obstacles = [[tuple(coordinate) for coordinate in obstacle.tolist()] for obstacle in obstacles]
+    return environment_bounds, obstacles
 
-        for raw_obstacle in reader:
-            temporary_obstacle = list()
 
-            while raw_obstacle:
-                x_coordinate = float(raw_obstacle.pop(0))
-                y_coordinate = float(raw_obstacle.pop(0))
-                coordinate = (x_coordinate, y_coordinate)
-                temporary_obstacle.append(coordinate)
+def load_environment_arrays(filename):
+    """
+    Loads the environment boundaries and obstacles from a text file in one pass, every number in the file is converted
+    by a single NumPy call and the lines are split off as views
+    :param filename: path and name to the file with robot state information
+    :return: (B, 2) integer array of the environment boundaries and a list of (V, 2) arrays of obstacle vertices
+    """
+    with open(filename, 'r', encoding='utf8') as fin:
+        lines = [line for line in fin.read().splitlines() if line.strip()]
 
-            obstacles.append(temporary_obstacle)
+    counts = np.array([line.count(',') + 1 for line in lines], dtype=np.int64)
+    values = np.array(','.join(lines).split(','), dtype=float)
+    rows = np.split(values, np.cumsum(counts)[:-1])
 
-    return environment_bounds, obstacles
+    bounds = rows[0].astype(int).reshape((-1, 2))
+    obstacles = [row.reshape((-1, 2)) for row in rows[1:]]
+    return bounds, obstacles
 
 
 def load_robot_state_data(filename):
@@ -0,0 +1,257 @@
+import contextlib
+import cProfile
+import csv
+import io
+import json
+import pstats
+import sys
+import time
+import tracemalloc
+
+# shared by every disabled phase, so instrumented code costs one method call when instrumentation is off
+NULL_PHASE = contextlib.nullcontext()
+
+STATS_FIELDS = ['phase', 'seeker', 'link', 'calls', 'total_ms', 'mean_us', 'max_us', 'allocated_blocks']
+
+
+class PhaseRecord:
+    """
+    data object for one timed execution of a phase
+    """
+    __slots__ = ('name', 'seeker', 'link', 'step', 'start_ns', 'duration_ns', 'allocated_blocks')
+
+    def __init__(self, name: str, seeker, link, step: int, start_ns: int, duration_ns: int, allocated_blocks: int):
+        self.name = name
+        self.seeker = seeker
+        self.link = link
+        self.step = step
+        self.start_ns = start_ns
+        self.duration_ns = duration_ns
+        self.allocated_blocks = allocated_blocks
+
+
+class Phase:
+    """
+    context manager that times a block and counts the memory blocks it leaves allocated
+    """
+    __slots__ = ('instrumentation', 'name', 'seeker', 'link', '_start_ns', '_start_blocks')
+
+    def __init__(self, instrumentation, name: str, seeker=None, link=None):
+        self.instrumentation = instrumentation
+        self.name = name
+        self.seeker = seeker
+        self.link = link
+        self._start_ns = 0
+        self._start_blocks = 0
+
+    def __enter__(self):
+        self._start_blocks = sys.getallocatedblocks()
+        self._start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        duration_ns = time.perf_counter_ns() - self._start_ns
+        allocated_blocks = sys.getallocatedblocks() - self._start_blocks
+        instrumentation = self.instrumentation
+        instrumentation.records.append(PhaseRecord(self.name, self.seeker, self.link, instrumentation.step,
+                                                   self._start_ns, duration_ns, allocated_blocks))
+        return False
+
+
+class ProfileSession:
+    """
+    cProfile and/or tracemalloc session limited to a range of steps
+    """
+    def __init__(self, first_step: int, last_step: int, use_cprofile=True, use_tracemalloc=False):
+        """
+        :param first_step: first profiled step
+        :param last_step: last profiled step, inclusive
+        :param use_cprofile: collect function level timing with cProfile
+        :param use_tracemalloc: collect allocation sites with tracemalloc
+        """
+        self.first_step = first_step
+        self.last_step = last_step
+        self.use_cprofile = use_cprofile
+        self.use_tracemalloc = use_tracemalloc
+
+        self.profiler = None
+        self.snapshot = None
+        self.active = False
+
+    def update(self, step: int):
+        """
+        starts or stops the session as the simulation enters a new step
+        :param step: step that is about to run
+        :return: none
+        """
+        if not self.active and self.first_step <= step <= self.last_step:
+            self.start()
+        elif self.active and step > self.last_step:
+            self.stop()
+
+    def start(self):
+        if self.use_tracemalloc:
+            tracemalloc.start()
+        if self.use_cprofile:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        self.active = True
+
+    def stop(self):
+        if not self.active:
+            return
+        if self.use_cprofile:
+            self.profiler.disable()
+        if self.use_tracemalloc:
+            self.snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+        self.active = False
+
+    def print_summary(self, limit=15):
+        print("Profile of steps {} to {}".format(self.first_step, self.last_step))
+        if self.profiler is not None:
+            stream = io.StringIO()
+            pstats.Stats(self.profiler, stream=stream).sort_stats('cumulative').print_stats(limit)
+            print(stream.getvalue())
+        if self.snapshot is not None:
+            print("Top allocation sites:")
+            for statistic in self.snapshot.statistics('lineno')[:limit]:
+                print(statistic)
+            print()
+
+    def save_cprofile(self, filename: str):
+        """
+        writes the cProfile statistics in the format read by pstats and snakeviz
+        """
+        if self.profiler is not None:
+            self.profiler.dump_stats(filename)
+
+
+class Instrumentation:
+    """
+    records the wall time, call count and allocated memory blocks of named phases of the simulation loop, optionally
+    per seeker and per link. A disabled instance hands out a shared null context
+    """
+    def __init__(self, enabled=True, profile_sessions=None):
+        """
+        :param enabled: record phases, otherwise every phase is a no-op
+        :param profile_sessions: list of ProfileSession objects driven by begin_step
+        """
+        self.enabled = enabled
+        self.profile_sessions = list() if profile_sessions is None else profile_sessions
+        self.records = list()
+        self.step = 0
+
+    def phase(self, name: str, seeker=None, link=None):
+        """
+        :param name: name of the phase
+        :param seeker: name of the seeker running the phase, if any
+        :param link: name of the seeker at the other end of the link, if any
+        :return: context manager timing the block
+        """
+        if not self.enabled:
+            return NULL_PHASE
+        return Phase(self, name, seeker, link)
+
+    def begin_step(self, step: int):
+        """
+        marks the start of a simulation step and starts or stops the profile sessions
+        :param step: step that is about to run
+        :return: none
+        """
+        self.step = step
+        for session in self.profile_sessions:
+            session.update(step)
+
+    def finish(self):
+        """
+        stops any profile session still running at the end of the simulation
+        :return: none
+        """
+        for session in self.profile_sessions:
+            session.stop()
+
+    def get_stats(self):
+        """
+        aggregates the records by phase, seeker and link
+        :return: list of dictionaries with the keys in STATS_FIELDS, in order of first appearance
+        """
+        groups = {}
+        for record in self.records:
+            key = (record.name, record.seeker, record.link)
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = [0, 0, 0, 0]
+            group[0] += 1
+            group[1] += record.duration_ns
+            group[2] = max(group[2], record.duration_ns)
+            group[3] += record.allocated_blocks
+
+        rows = list()
+        for (name, seeker, link), (calls, total_ns, max_ns, allocated_blocks) in groups.items():
+            rows.append({
+                'phase': name,
+                'seeker': '' if seeker is None else seeker,
+                'link': '' if link is None else link,
+                'calls': calls,
+                'total_ms': total_ns / 1e6,
+                'mean_us': total_ns / calls / 1e3,
+                'max_us': max_ns / 1e3,
+                'allocated_blocks': allocated_blocks,
+            })
+        return rows
+
+    def print_stats(self):
+        print("{:>18} {:>10} {:>10} {:>7} {:>10} {:>10} {:>10} {:>8}".format(*STATS_FIELDS))
+        for row in self.get_stats():
+            print("{phase:>18} {seeker:>10} {link:>10} {calls:>7} {total_ms:>10.3f} {mean_us:>10.1f} {max_us:>10.1f} "
+                  "{allocated_blocks:>8}".format(**row))
+        print()
+
+    def save_stats(self, filename: str):
+        """
+        writes the flat stats table to a CSV file
+        """
+        with open(filename, 'w', newline='', encoding='utf8') as fout:
+            writer = csv.DictWriter(fout, fieldnames=STATS_FIELDS)
+            writer.writeheader()
+            writer.writerows(self.get_stats())
+
+    def save_chrome_trace(self, filename: str):
+        """
+        writes the records in the Chrome trace event format, open it in chrome://tracing or Perfetto. Every seeker is
+        a thread, phases without a seeker go on thread 0
+        """
+        threads = {None: 0}
+        for record in self.records:
+            if record.seeker not in threads:
+                threads[record.seeker] = len(threads)
+
+        # records are appended as phases end, so an enclosing phase starts before the first record
+        origin_ns = min((record.start_ns for record in self.records), default=0)
+        events = list()
+        for seeker, tid in threads.items():
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': 0, 'tid': tid,
+                           'args': {'name': 'simulation' if seeker is None else seeker}})
+
+        for record in self.records:
+            args = {'step': record.step, 'allocated_blocks': record.allocated_blocks}
+            if record.link is not None:
+                args['link'] = record.link
+            events.append({
+                'name': record.name if record.link is None else "{} -> {}".format(record.name, record.link),
+                'cat': record.name,
+                'ph': 'X',
+                'ts': (record.start_ns - origin_ns) / 1e3,
+                'dur': record.duration_ns / 1e3,
+                'pid': 0,
+                'tid': threads[record.seeker],
+                'args': args,
+            })
+
+        with open(filename, 'w', encoding='utf8') as fout:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, fout)
+
+
+# default for code that takes an optional instrumentation
+DISABLED = Instrumentation(enabled=False)
@@ -0,0 +1,241 @@
+import numpy as np
+from scipy import linalg, stats
+
+from batch_information_filter import time_update
+from channel_filter import ChannelFilterBank
+import covariance_intersection as CI
+from estimation_tools import DiscreteLinearStateSpace
+from system_dynamics import generate_trajectory
+from topology import CommunicationGraph
+import wire_format
+
+
+class MonteCarloResults:
+    """
+    data object holding every trial of a Monte Carlo run. Arrays are indexed as (trial, step, seeker, ...) where step 0
+    is the first filtered step
+    """
+    def __init__(self, ground_truth, estimates, info_vectors, info_matrices, nees, nis, transmissions=None):
+        """
+        :param ground_truth: (step, n) array of the truth shared by every trial, or (trial, step, n) with process noise
+        :param transmissions: optional (trial, step, edge) boolean array, True where a channel filter sent its novel
+        information
+        """
+        self.ground_truth = ground_truth
+        self.estimates = estimates
+        self.info_vectors = info_vectors
+        self.info_matrices = info_matrices
+        self.nees = nees
+        self.nis = nis
+        self.transmissions = transmissions
+
+    def get_dimensions(self):
+        trials, steps, seekers, n = np.shape(self.estimates)
+        return [trials, steps, seekers, n]
+
+    def get_average_nees(self):
+        """
+        :return: (steps, seekers) array of the NEES averaged over all trials
+        """
+        return np.mean(self.nees, axis=0)
+
+    def get_average_nis(self):
+        """
+        :return: (steps, seekers) array of the NIS averaged over all trials, NaN where the prior was uninformative
+        """
+        return np.mean(self.nis, axis=0)
+
+    def get_nees_bounds(self, alpha=0.05):
+        """
+        two sided chi-square acceptance region for the trial averaged NEES
+        :param alpha: significance level
+        :return: tuple of the lower and upper bound
+        """
+        trials, _, _, n = self.get_dimensions()
+        return get_chi_square_bounds(trials, n, alpha)
+
+    def get_nis_bounds(self, m: int, alpha=0.05):
+        """
+        two sided chi-square acceptance region for the trial averaged NIS
+        :param m: measurement dimension
+        :param alpha: significance level
+        :return: tuple of the lower and upper bound
+        """
+        trials, _, _, _ = self.get_dimensions()
+        return get_chi_square_bounds(trials, m, alpha)
+
+    def get_rmse(self):
+        """
+        :return: (steps, seekers) array of the root mean square position error over all trials
+        """
+        ground_truth = self.ground_truth if np.ndim(self.ground_truth) == 3 else self.ground_truth[np.newaxis]
+        error = self.estimates - ground_truth[:, :, np.newaxis, :]
+        return np.sqrt(np.mean(np.sum(error ** 2, axis=-1), axis=0))
+
+    def get_transmission_rate(self):
+        """
+        :return: fraction of the possible channel filter messages that were sent
+        """
+        if self.transmissions is None or self.transmissions.size == 0:
+            return 1.0
+        return float(np.mean(self.transmissions))
+
+    def get_bytes_per_trial(self):
+        """
+        link traffic of one trial when sent messages use the float64 wire format and skipped ones a bare header
+        :return: mean number of bytes sent per trial
+        """
+        _, _, _, n = self.get_dimensions()
+        sent = np.count_nonzero(self.transmissions, axis=(1, 2))
+        skipped = np.size(self.transmissions[0]) - sent
+        return float(np.mean(sent * wire_format.get_message_size(n) + skipped * wire_format.HEADER.size))
+
+
+def get_chi_square_bounds(trials: int, dof: int, alpha=0.05):
+    """
+    bounds on a chi-square statistic averaged over a number of trials
+    :param trials: number of averaged trials
+    :param dof: degrees of freedom of a single trial
+    :param alpha: significance level
+    :return: tuple of the lower and upper bound
+    """
+    lower = stats.chi2.ppf(alpha / 2, trials * dof) / trials
+    upper = stats.chi2.ppf(1 - alpha / 2, trials * dof) / trials
+    return lower, upper
+
+
+FUSION_MODES = ('cf', 'ci')
+
+
+def run_trials(state_space: DiscreteLinearStateSpace, x0: np.ndarray, R_stack: np.ndarray, comm_edges,
+               steps: int, trials: int, rng=None, threshold=None, metric='trace', fusion='cf', omega='fast',
+               process_noise=False):
+    """
+    runs independent noisy realizations of a static seeker network with channel filter fusion in one vectorized pass.
+    The trial dimension is the leading axis of every array
+    :param state_space: target state space
+    :param x0: n x 1 numpy array with the initial target state
+    :param R_stack: (N, m, m) array of sensor noise covariances, one per seeker
+    :param comm_edges: CommunicationGraph, or list of (i, j) tuples of seeker indices where two way communication
+    exists
+    :param steps: number of filter steps
+    :param trials: number of independent trials
+    :param rng: numpy random Generator, a fresh one is created if not provided
+    :param threshold: event trigger threshold of the channel filters, None sends every step
+    :param metric: novelty metric used with the threshold
+    :param fusion: 'cf' for channel filters, which are only exact on trees, or 'ci' for covariance intersection with
+    every neighbor, which works on any graph
+    :param omega: covariance intersection weight method, 'fast' or 'optimal'
+    :param process_noise: give every trial its own target trajectory driven by process noise from Q, instead of one
+    noise free trajectory shared by all trials
+    :return: MonteCarloResults object
+    """
+    if fusion not in FUSION_MODES:
+        raise ValueError("fusion must be one of {}".format(FUSION_MODES))
+
+    rng = np.random.default_rng() if rng is None else rng
+
+    H = state_space.H
+    n, _ = state_space.get_dimensions()
+    seekers = np.size(R_stack, 0)
+    m = np.size(R_stack, 1)
+
+    # (1, steps + 1, n) ground truth shared by every trial, or one trajectory per trial with process noise
+    x0 = np.asarray(x0, dtype=float).reshape((1, n))
+    if process_noise:
+        ground_truth = generate_trajectory(state_space, np.repeat(x0, trials, axis=0), steps, rng)
+    else:
+        ground_truth = generate_trajectory(state_space, x0, steps)
+    true_measurements = ground_truth @ H.T
+
+    # noise for every trial, step and seeker in a single draw
+    S_v = np.stack([linalg.cholesky(R, lower=True) for R in R_stack])
+    noise = S_v @ rng.standard_normal((trials, steps, seekers, m, 1))
+    measurements = true_measurements[:, 1:, np.newaxis, :, np.newaxis] + noise
+
+    R_inv = np.linalg.inv(R_stack)
+    HtR_inv = H.T @ R_inv
+    HtR_invH = HtR_inv @ H
+
+    graph = comm_edges
+    if not isinstance(graph, CommunicationGraph):
+        graph = CommunicationGraph.create_from_pairs(comm_edges, seekers)
+    channel_filters = ChannelFilterBank(graph, state_space, (trials,), threshold, metric)
+
+    y = np.zeros((trials, seekers, n, 1))
+    Y = np.zeros((trials, seekers, n, n))
+
+    info_vectors = np.zeros((trials, steps, seekers, n))
+    info_matrices = np.zeros((trials, steps, seekers, n, n))
+    nis = np.full((trials, steps, seekers), np.nan)
+    transmissions = np.ones((trials, steps, graph.get_edge_count()), dtype=bool)
+
+    for k in range(0, steps):
+        z_k = measurements[:, k]
+
+        # local filters
+        y_m, Y_m = time_update(state_space, y, Y)
+        nis[:, k] = get_nis(y_m, Y_m, z_k, H, R_stack)
+        y = y_m + HtR_inv @ z_k
+        Y = Y_m + HtR_invH
+
+        if fusion == 'ci':
+            y, Y = CI.fuse_graph(graph, y, Y, omega)
+        else:
+            # channel filters and fusion
+            channel_filters.update_and_send(y, Y)
+            channel_filters.receive_and_update()
+            transmissions[:, k] = channel_filters.sent
+            y, Y = channel_filters.fuse(y, Y)
+
+        info_vectors[:, k] = y[..., 0]
+        info_matrices[:, k] = Y
+
+    estimates = np.linalg.solve(info_matrices, info_vectors[..., np.newaxis])[..., 0]
+    error = estimates - ground_truth[:, 1:, np.newaxis, :]
+    nees = np.einsum('...i,...ij,...j->...', error, info_matrices, error)
+
+    ground_truth = ground_truth[:, 1:] if process_noise else ground_truth[0, 1:]
+    return MonteCarloResults(ground_truth, estimates, info_vectors, info_matrices, nees, nis, transmissions)
+
+
+def run_trigger_study(state_space: DiscreteLinearStateSpace, x0: np.ndarray, R_stack: np.ndarray, comm_edges,
+                      steps: int, trials: int, thresholds: list, metric='trace', seed=None):
+    """
+    bandwidth against estimation error for a range of event trigger thresholds. Every threshold sees the same noise
+    so the differences come from the trigger alone
+    :param thresholds: list of thresholds, None for the always send baseline
+    :param metric: novelty metric used with the thresholds
+    :param seed: seed for the random number generator shared by every threshold
+    :return: list of (threshold, transmission rate, bytes per trial, final mean RMSE, final mean NEES) tuples
+    """
+    rows = list()
+    for threshold in thresholds:
+        results = run_trials(state_space, x0, R_stack, comm_edges, steps, trials, np.random.default_rng(seed),
+                             threshold, metric)
+        rows.append((threshold, results.get_transmission_rate(), results.get_bytes_per_trial(),
+                     float(np.mean(results.get_rmse()[-1])), float(np.mean(results.get_average_nees()[-1]))))
+    return rows
+
+
+def get_nis(y_m: np.ndarray, Y_m: np.ndarray, z: np.ndarray, H: np.ndarray, R: np.ndarray):
+    """
+    normalized innovation squared of a batch of predicted information estimates
+    :param y_m: (..., n, 1) array of predicted information vectors
+    :param Y_m: (..., n, n) array of predicted information matrices
+    :param z: (..., m, 1) array of measurements
+    :param H: measurement matrix
+    :param R: (..., m, m) array of sensor noise covariances
+    :return: (...) array of the NIS, NaN where the prior information is singular
+    """
+    n = np.size(H, 1)
+    informative = np.all(np.linalg.eigvalsh(Y_m) > 0, axis=-1)
+
+    # uninformative priors are swapped for the identity so the batched solve stays valid, then masked out
+    Y_safe = np.where(informative[..., np.newaxis, np.newaxis], Y_m, np.eye(n))
+    P_m = np.linalg.inv(Y_safe)
+    innovation = z - H @ P_m @ y_m
+    S = H @ P_m @ H.T + R
+    value = (np.swapaxes(innovation, -1, -2) @ np.linalg.solve(S, innovation))[..., 0, 0]
+
+    return np.where(informative, value, np.nan)
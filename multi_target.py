@@ -0,0 +1,104 @@
+import numpy as np
+
+from batch_information_filter import BatchInformationFilter
+from estimation_tools import DiscreteLinearStateSpace
+from workspace import Hider
+
+
+class MultiTargetInformationFilter(BatchInformationFilter):
+    """
+    information filter for a fleet of seekers that each track the same independent targets. The information is held as
+    stacked (N, T, n, 1) and (N, T, n, n) arrays, the diagonal blocks of every seeker's block diagonal joint
+    information, so a step costs the same per target whether there is one target or dozens
+    """
+    def __init__(self, state_space: DiscreteLinearStateSpace, R_stack: np.ndarray, target_count: int, step=0):
+        """
+        :param state_space: state space shared by all targets
+        :param R_stack: (N, m, m) array of sensor noise covariances, one per seeker
+        :param target_count: number of targets T
+        :param step: time step associated with the initial information
+        """
+        n, _ = state_space.get_dimensions()
+        count = np.size(R_stack, 0)
+        super().__init__(state_space, R_stack[:, np.newaxis], np.zeros((count, target_count, n, 1)),
+                         np.zeros((count, target_count, n, n)), step)
+        self.target_count = target_count
+
+    @staticmethod
+    def create_from_seekers(seeker_list: list, state_space: DiscreteLinearStateSpace, square_root=False):
+        """
+        fast way to create a MultiTargetInformationFilter from seekers set up with Seeker.track_targets
+        :param seeker_list: list of Seeker objects, their order sets the order of the stacked arrays
+        :param state_space: state space shared by all targets
+        :param square_root: not supported for multiple targets, must be False
+        :return: MultiTargetInformationFilter object
+        """
+        if square_root:
+            raise ValueError("the multi target filter has no square root form")
+        R_stack = np.stack([seeker.R for seeker in seeker_list])
+        batch_filter = MultiTargetInformationFilter(state_space, R_stack, len(seeker_list[0].targets))
+        batch_filter.load_seekers(seeker_list)
+        return batch_filter
+
+    def load_seekers(self, seeker_list: list):
+        """
+        copies the latest information about every target of every seeker into the stacked arrays
+        :param seeker_list: list of Seeker objects in the same order used to create the filter
+        :return: none
+        """
+        for i, seeker in enumerate(seeker_list):
+            self.step, y, Y = seeker.target_history.get_blocks(-1)
+            self.y[i] = y
+            self.Y[i] = Y
+
+    def run_filters(self, seeker_list: list, visible=None):
+        """
+        measures every target from every seeker and runs one batched filter step
+        :param seeker_list: list of Seeker objects in the same order used to create the filter
+        :param visible: (N, T) boolean array of the targets each seeker can see, None if every target is visible
+        :return: none
+        """
+        self.load_seekers(seeker_list)
+        step = self.step + 1
+        targets = seeker_list[0].targets
+
+        # (T, m, 1) true outputs shared by every seeker, noise is drawn for all targets of a seeker at once
+        z_true = np.stack([target.truth_model.get_true_measurement(step).return_data_array() for target in targets])
+        noise = np.stack([seeker.noise_generator.draw(self.target_count).T for seeker in seeker_list])
+        z_stack = z_true + noise[..., np.newaxis]
+
+        self.run(z_stack, visible)
+        for i, seeker in enumerate(seeker_list):
+            seeker.target_history.append_blocks(self.step, self.y[i], self.Y[i])
+
+
+def create_hiders(count: int, state_space: DiscreteLinearStateSpace, x_bounds: tuple, y_bounds: tuple, rng=None):
+    """
+    places hiders uniformly at random inside a box
+    :param count: number of hiders
+    :param state_space: state space shared by the hiders
+    :param x_bounds: tuple of the lowest and highest x coordinate
+    :param y_bounds: tuple of the lowest and highest y coordinate
+    :param rng: numpy random Generator
+    :return: list of Hider objects
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    positions = rng.uniform((x_bounds[0], y_bounds[0]), (x_bounds[1], y_bounds[1]), (count, 2))
+    return [Hider('hider_{}'.format(i + 1), {'x1': x, 'x2': y}, 'r', state_space)
+            for i, (x, y) in enumerate(positions.tolist())]
+
+
+def get_target_errors(seeker_list: list):
+    """
+    :param seeker_list: list of Seeker objects tracking the same targets
+    :return: (N, T) array of the position errors of the latest estimates and (N, T) array of their NEES
+    """
+    targets = seeker_list[0].targets
+    step, _, _ = seeker_list[0].target_history.get_blocks(-1)
+    truth = np.stack([target.truth_model.get_ground_truth(step).return_data_array()[:, 0] for target in targets])
+
+    states, covariances = zip(*[seeker.target_history.get_state_arrays([-1]) for seeker in seeker_list])
+    errors = np.stack(states)[:, 0] - truth
+    information = np.linalg.inv(np.stack(covariances)[:, 0])
+    nees = np.einsum('...i,...ij,...j->...', errors, information, errors)
+    return np.linalg.norm(errors[..., 0:2], axis=-1), nees
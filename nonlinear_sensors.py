@@ -0,0 +1,188 @@
+import numpy as np
+
+from batch_information_filter import BatchInformationFilter, time_update
+from data_objects import Measurement
+from estimation_tools import DiscreteLinearStateSpace
+
+SENSOR_MODELS = ('linear', 'range-bearing')
+
+
+class BatchExtendedInformationFilter(BatchInformationFilter):
+    """
+    extended information filter for a fleet of range/bearing sensors. Every seeker linearizes the sensor model about
+    its own predicted position, and the Jacobians and H^T R^-1 H terms of all seekers are formed as stacked arrays. The
+    results are ordinary information vectors and matrices, so they go into InformationEstimate and ChannelFilter as is
+    """
+    def __init__(self, state_space: DiscreteLinearStateSpace, R_stack: np.ndarray, sensor_poses: np.ndarray,
+                 y_stack=None, Y_stack=None, step=0):
+        """
+        :param state_space: target state space shared by all seekers, the first two states are the target position
+        :param R_stack: (N, 2, 2) array of range and bearing noise covariances, one per seeker
+        :param sensor_poses: (N, 3) array of sensor x, y and heading, one per seeker
+        :param y_stack: (N, n, 1) array of initial information vectors, defaults to zeros
+        :param Y_stack: (N, n, n) array of initial information matrices, defaults to zeros
+        :param step: time step associated with the initial information
+        """
+        super().__init__(state_space, R_stack, y_stack, Y_stack, step)
+        self.sensor_poses = np.asarray(sensor_poses, dtype=float)
+
+    @staticmethod
+    def create_from_seekers(seeker_list: list, state_space: DiscreteLinearStateSpace, square_root=False):
+        """
+        fast way to create a BatchExtendedInformationFilter from the current estimates, sensors and poses of a list of
+        seekers
+        :param seeker_list: list of Seeker objects, their order sets the order of the stacked arrays
+        :param state_space: target state space shared by all seekers
+        :param square_root: not supported by the extended filter, must be False
+        :return: BatchExtendedInformationFilter object
+        """
+        if square_root:
+            raise ValueError("the extended information filter has no square root form")
+        R_stack = np.stack([seeker.R for seeker in seeker_list])
+        batch_filter = BatchExtendedInformationFilter(state_space, R_stack, get_sensor_poses(seeker_list))
+        batch_filter.load_seekers(seeker_list)
+        return batch_filter
+
+    def run(self, z_stack: np.ndarray, visible=None):
+        """
+        time update and linearized measurement update for every seeker
+        :param z_stack: (N, 2, 1) array of range and bearing measurements, one per seeker
+        :param visible: (N,) boolean array, seekers marked False only run the time update, None updates every seeker
+        :return: none
+        """
+        y_m, Y_m = time_update(self.state_space, self.y, self.Y)
+
+        if visible is None:
+            self.y, self.Y = measurement_update(y_m, Y_m, z_stack, self.sensor_poses, self.R_inv)
+        else:
+            visible = np.asarray(visible, dtype=bool)[:, np.newaxis, np.newaxis]
+            # occluded seekers are given a harmless measurement and then masked out
+            z_safe = np.where(visible, z_stack, [[1], [0]])
+            y_p, Y_p = measurement_update(y_m, Y_m, z_safe, self.sensor_poses, self.R_inv)
+            self.y = np.where(visible, y_p, y_m)
+            self.Y = np.where(visible, Y_p, Y_m)
+        self.step += 1
+
+    def run_filters(self, seeker_list: list, target, visible=None):
+        """
+        batched replacement for calling Seeker.run_filter on every seeker in the list with range/bearing sensors
+        :param seeker_list: list of Seeker objects in the same order used to create the filter
+        :param target: robot being estimated, must have a truth model
+        :param visible: (N,) boolean array from Workspace.get_line_of_sight, None if every seeker sees the target
+        :return: none
+        """
+        self.load_seekers(seeker_list)
+        step = self.step + 1
+        target_position = target.truth_model.get_ground_truth(step).return_data_array()[0:2]
+        z_true = get_range_bearing(self.sensor_poses, target_position)
+
+        visible = np.ones(len(seeker_list), dtype=bool) if visible is None else visible
+        measurements = [seeker.get_measurement(Measurement.create_from_array(step, z), v)
+                        for seeker, z, v in zip(seeker_list, z_true, visible)]
+        z_stack = np.stack([measurement.return_data_array() for measurement in measurements])
+
+        self.run(z_stack, visible)
+        for i, seeker in enumerate(seeker_list):
+            seeker.information_history.append_record(self.step, vector=self.y[i], matrix=self.Y[i])
+
+
+def get_sensor_poses(seeker_list: list):
+    """
+    :param seeker_list: list of Seeker objects, a missing heading is taken as zero
+    :return: (N, 3) array of sensor x, y and heading
+    """
+    poses = np.zeros((len(seeker_list), 3))
+    for i, seeker in enumerate(seeker_list):
+        pose = seeker.return_state_list()[0:3]
+        poses[i, 0:len(pose)] = pose
+    return poses
+
+
+def wrap_angle(angle):
+    """
+    :param angle: array of angles in radians
+    :return: the same angles in [-pi, pi)
+    """
+    return (angle + np.pi) % (2 * np.pi) - np.pi
+
+
+def get_range_bearing(sensor_poses: np.ndarray, positions: np.ndarray):
+    """
+    range/bearing measurement model broadcast over any leading dimensions
+    :param sensor_poses: (..., N, 3) array of sensor x, y and heading
+    :param positions: (..., N, 2, 1) or (2, 1) array of target positions
+    :return: (..., N, 2, 1) array of ranges and bearings relative to the sensor headings
+    """
+    dx = positions[..., 0, 0] - sensor_poses[..., 0]
+    dy = positions[..., 1, 0] - sensor_poses[..., 1]
+    ranges = np.hypot(dx, dy)
+    bearings = wrap_angle(np.arctan2(dy, dx) - sensor_poses[..., 2])
+    return np.stack([ranges, bearings], axis=-1)[..., np.newaxis]
+
+
+def get_jacobian(sensor_poses: np.ndarray, positions: np.ndarray, n: int):
+    """
+    Jacobian of the range/bearing model with respect to the target state, only the position states are observed
+    :param sensor_poses: (..., N, 3) array of sensor x, y and heading
+    :param positions: (..., N, 2, 1) array of linearization positions
+    :param n: target state dimension
+    :return: (..., N, 2, n) array of measurement Jacobians
+    """
+    dx = positions[..., 0, 0] - sensor_poses[..., 0]
+    dy = positions[..., 1, 0] - sensor_poses[..., 1]
+    range_squared = dx ** 2 + dy ** 2
+    ranges = np.sqrt(range_squared)
+
+    H = np.zeros(np.shape(dx) + (2, n))
+    H[..., 0, 0] = dx / ranges
+    H[..., 0, 1] = dy / ranges
+    H[..., 1, 0] = -dy / range_squared
+    H[..., 1, 1] = dx / range_squared
+    return H
+
+
+def invert_range_bearing(sensor_poses: np.ndarray, z: np.ndarray):
+    """
+    target positions that produce the given measurements without noise
+    :param sensor_poses: (..., N, 3) array of sensor x, y and heading
+    :param z: (..., N, 2, 1) array of ranges and bearings
+    :return: (..., N, 2, 1) array of positions
+    """
+    angle = z[..., 1, 0] + sensor_poses[..., 2]
+    x = sensor_poses[..., 0] + z[..., 0, 0] * np.cos(angle)
+    y = sensor_poses[..., 1] + z[..., 0, 0] * np.sin(angle)
+    return np.stack([x, y], axis=-1)[..., np.newaxis]
+
+
+def measurement_update(y_k1_m: np.ndarray, Y_k1_m: np.ndarray, z_k1: np.ndarray, sensor_poses: np.ndarray,
+                       R_inv: np.ndarray):
+    """
+    extended information filter measurement update broadcast over any leading dimensions. Seekers with a full rank
+    prior linearize about their predicted position, the others about the position their measurement points to
+    :param y_k1_m: (..., N, n, 1) array of predicted information vectors
+    :param Y_k1_m: (..., N, n, n) array of predicted information matrices
+    :param z_k1: (..., N, 2, 1) array of range and bearing measurements
+    :param sensor_poses: (N, 3) array of sensor x, y and heading
+    :param R_inv: (N, 2, 2) array of inverse range and bearing noise covariances
+    :return: updated information vectors and matrices
+    """
+    n = np.size(Y_k1_m, -1)
+
+    eigenvalues = np.linalg.eigvalsh(Y_k1_m)
+    informed = eigenvalues[..., 0] > 1e-12 * np.maximum(eigenvalues[..., -1], 1e-300)
+    Y_safe = np.where(informed[..., np.newaxis, np.newaxis], Y_k1_m, np.eye(n))
+    x_predicted = np.linalg.solve(Y_safe, y_k1_m)
+    x_lin = np.where(informed[..., np.newaxis, np.newaxis], x_predicted, 0)
+    x_lin[..., 0:2, :] = np.where(informed[..., np.newaxis, np.newaxis], x_predicted[..., 0:2, :],
+                                  invert_range_bearing(sensor_poses, z_k1))
+
+    H = get_jacobian(sensor_poses, x_lin[..., 0:2, :], n)
+    HtR_inv = np.swapaxes(H, -1, -2) @ R_inv
+
+    # innovation with the bearing wrapped, the linearization point is added back to form the pseudo measurement
+    innovation = z_k1 - get_range_bearing(sensor_poses, x_lin[..., 0:2, :])
+    innovation[..., 1, :] = wrap_angle(innovation[..., 1, :])
+
+    y_k1_p = y_k1_m + HtR_inv @ (innovation + H @ x_lin)
+    Y_k1_p = Y_k1_m + HtR_inv @ H
+    return y_k1_p, Y_k1_p
@@ -22,6 +22,7 @@ def print_header():
 def get_user_input():
     print('This program runs the following exercises:')
     print(' [1]: Static Process, Stationary Linear Sensors')
+    print(' [2]: Static Process, Monte Carlo Consistency Check')
     print()
 
     cmd = input(' Select an exercise would you like to run: ')
@@ -34,6 +35,9 @@ def interpret_command(cmd):
     if cmd == '1':      # path planning
         os.system("python static_linear_program.py")
 
+    elif cmd == '2':
+        os.system("python static_linear_program.py --monte-carlo 1000")
+
     else:
         print(' ERROR: unexpected command...')
 
@@ -0,0 +1,198 @@
+from math import sqrt
+import os
+
+import matplotlib
+from matplotlib import pyplot as plt
+from matplotlib.animation import FFMpegWriter, FuncAnimation, PillowWriter
+from matplotlib.patches import Ellipse
+import numpy as np
+
+
+class Track:
+    """
+    array-backed animation data for one robot. Each row of the arrays is one animation frame
+    """
+    def __init__(self, name: str, color: str, states: np.ndarray, two_sigma: np.ndarray, measurements=None):
+        """
+        :param name: robot name
+        :param color: robot color
+        :param states: (T, 2) array of position estimates
+        :param two_sigma: (T, 2) array of two sigma values for the position estimates
+        :param measurements: (T, 2) array of position measurements, or None to leave them out of the animation
+        """
+        self.name = name
+        self.color = color
+        self.states = states
+        self.two_sigma = two_sigma
+        self.measurements = measurements
+
+    @staticmethod
+    def create_from_seeker(robot, positions, plot_measurements=True):
+        """
+        fast way to create a Track from the history of a seeker with a single batched state conversion
+        :param robot: Seeker object
+        :param positions: sequence of history positions to animate
+        :param plot_measurements: include the seeker's measurements in the animation
+        :return: Track object
+        """
+        states, covariances = robot.information_history.get_state_arrays(positions)
+        two_sigma = 2 * np.sqrt(np.diagonal(covariances, axis1=-2, axis2=-1))
+        measurements = robot.measurement_history.get_measurements()[positions] if plot_measurements else None
+        return Track(robot.name, robot.color, states[:, 0:2], two_sigma[:, 0:2], measurements)
+
+    def get_frame_count(self):
+        return np.size(self.states, 0)
+
+
+class TrackArtists:
+    """
+    the reusable artists of an animation. They are created once and updated in place every frame
+    """
+    def __init__(self, lines: list, patches: list, measurements: list, count_text):
+        self.lines = lines
+        self.patches = patches
+        self.measurements = measurements
+        self.count_text = count_text
+
+    def return_artist_list(self):
+        return self.lines + self.patches + self.measurements + [self.count_text]
+
+
+def use_headless_backend():
+    """
+    switches matplotlib to the Agg backend so figures can be rendered without a display
+    :return: none
+    """
+    matplotlib.use('Agg')
+
+
+def setup_figure(ax, workspace, comm_lines: list, tracks: list, title: str, legend_labels: list):
+    """
+    draws the static background of the animation and creates the artists that are updated every frame
+    :param ax: matplotlib axes to draw on
+    :param workspace: Workspace object with the map and robots
+    :param comm_lines: list of tuples of robots that communicate
+    :param tracks: list of Track objects to animate
+    :param title: figure title
+    :param legend_labels: labels for the workspace, the first state estimate, and the first comm line
+    :return: TrackArtists object
+    """
+    plt.sca(ax)
+    plt.title(title)
+    plt.xlabel("x position [m]")
+    plt.ylabel("y position [m]")
+    plt.axis("equal")
+
+    ax.set_xlim([-55, 55])
+    ax.set_ylim([-55, 55])
+
+    workspace.plot()
+    lines = [ax.plot([], [], 'd', mfc=tracks[0].color, mec='None')[0]]
+    plot_comm_lines(comm_lines)
+    plt.legend(legend_labels, loc="upper left")
+
+    lines += [ax.plot([], [], 'd', mfc=track.color, mec='None')[0] for track in tracks[1:]]
+
+    patches = []
+    for track in tracks:
+        patch = Ellipse(xy=(0, 0), width=10, height=10, edgecolor=track.color, fc='None', ls='--')
+        ax.add_patch(patch)
+        patches.append(patch)
+
+    measurements = [ax.plot([], [], 'o', mfc=track.color, markersize=2, mec='None')[0]
+                    for track in tracks if track.measurements is not None]
+
+    count_text = ax.text(15, -45, "Current Step: ")
+    count_text.set_bbox(dict(facecolor='white'))
+
+    return TrackArtists(lines, patches, measurements, count_text)
+
+
+def draw_frame(i: int, artists: TrackArtists, tracks: list):
+    """
+    moves the artists to frame i of the tracks
+    :param i: frame index
+    :param artists: TrackArtists object from setup_figure
+    :param tracks: list of Track objects
+    :return: list of updated artists
+    """
+    artists.count_text.set_text("Current Step: {}".format(i + 1))
+    for line, track in zip(artists.lines, tracks):
+        x, y = track.states[i]
+        line.set_data([x], [y])
+
+    # TODO: These aren't plotting right for R2
+    for patch, track in zip(artists.patches, tracks):
+        patch.center = tuple(track.states[i])
+        patch.width = 2 * track.two_sigma[i, 0] * sqrt(5.991)
+        patch.height = 2 * track.two_sigma[i, 1] * sqrt(5.991)
+
+    measured_tracks = [track for track in tracks if track.measurements is not None]
+    for measurement, track in zip(artists.measurements, measured_tracks):
+        x, y = track.measurements[i]
+        measurement.set_data([x], [y])
+
+    return artists.return_artist_list()
+
+
+def get_frames(tracks: list, frame_step=1):
+    """
+    :param tracks: list of Track objects
+    :param frame_step: keep only every frame_step frame
+    :return: range of frame indices to draw
+    """
+    return range(0, tracks[0].get_frame_count(), frame_step)
+
+
+def create_animation(fig, artists: TrackArtists, tracks: list, frame_step=1, interval=1000):
+    """
+    creates the interactive animation
+    :param fig: matplotlib figure
+    :param artists: TrackArtists object from setup_figure
+    :param tracks: list of Track objects
+    :param frame_step: keep only every frame_step frame
+    :param interval: delay between frames in milliseconds
+    :return: FuncAnimation object, it must be kept alive while the figure is shown
+    """
+    return FuncAnimation(fig, draw_frame, frames=get_frames(tracks, frame_step), fargs=[artists, tracks],
+                         interval=interval, blit=True, repeat_delay=5000)
+
+
+def save_animation(fig, artists: TrackArtists, tracks: list, filename: str, frame_step=1, fps=1, dpi=100):
+    """
+    renders the animation straight to disk without a display. The writer is picked from the file extension: '.mp4'
+    uses ffmpeg, '.gif' uses pillow, and anything else is treated as a directory of PNG frames
+    :param fig: matplotlib figure
+    :param artists: TrackArtists object from setup_figure
+    :param tracks: list of Track objects
+    :param filename: path of the video file or frame directory
+    :param frame_step: keep only every frame_step frame
+    :param fps: frames per second of the video
+    :param dpi: resolution of the rendered frames
+    :return: none
+    """
+    frames = get_frames(tracks, frame_step)
+    extension = os.path.splitext(filename)[1].lower()
+
+    if extension in ('.mp4', '.gif'):
+        writer = FFMpegWriter(fps=fps) if extension == '.mp4' else PillowWriter(fps=fps)
+        with writer.saving(fig, filename, dpi):
+            for i in frames:
+                draw_frame(i, artists, tracks)
+                writer.grab_frame()
+    else:
+        os.makedirs(filename, exist_ok=True)
+        for i in frames:
+            draw_frame(i, artists, tracks)
+            fig.savefig(os.path.join(filename, 'frame_{:05d}.png'.format(i)), dpi=dpi)
+
+
+def plot_comm_lines(comm_lines, line_style='b--'):
+    for line in comm_lines:
+        coords1 = line[0].return_state_list()
+        coords2 = line[1].return_state_list()
+
+        x_ords = [coords1[0], coords2[0]]
+        y_ords = [coords1[1], coords2[1]]
+
+        plt.plot(x_ords, y_ords, line_style, alpha=0.5)
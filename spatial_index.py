@@ -0,0 +1,250 @@
+import numpy as np
+
+
+class ObstacleIndex:
+    """
+    uniform grid over the edges of a set of polygon obstacles. Every cell keeps, in CSR form, the edges whose bounding
+    box touches it and the polygons whose bounding box touches it, so point and segment queries only look at the
+    obstacles near them. All queries are batched over many points or segments
+    """
+    def __init__(self, polygons: list, cell_size=None):
+        """
+        :param polygons: list of (V, 2) arrays of polygon vertices, the closing edge is implied
+        :param cell_size: width of a grid cell, sized for about one edge per cell if None
+        """
+        self.polygon_count = len(polygons)
+
+        # flat edge arrays, the edges of polygon p are edges polygon_indptr[p] to polygon_indptr[p + 1]
+        vertex_counts = np.array([len(polygon) for polygon in polygons], dtype=np.int64)
+        self.polygon_indptr = np.concatenate([[0], np.cumsum(vertex_counts)])
+        if polygons:
+            starts = np.concatenate([np.asarray(polygon, dtype=float).reshape((-1, 2)) for polygon in polygons])
+            ends = np.concatenate([np.roll(np.asarray(polygon, dtype=float).reshape((-1, 2)), -1, axis=0)
+                                   for polygon in polygons])
+        else:
+            starts = np.zeros((0, 2))
+            ends = np.zeros((0, 2))
+        self.edge_starts = starts
+        self.edge_ends = ends
+        self.edge_polygons = np.repeat(np.arange(0, self.polygon_count), vertex_counts)
+
+        edge_lower = np.minimum(starts, ends)
+        edge_upper = np.maximum(starts, ends)
+        self.polygon_lower = np.array([edge_lower[a:b].min(axis=0) for a, b in self.get_polygon_ranges()]).reshape(
+            (-1, 2))
+        self.polygon_upper = np.array([edge_upper[a:b].max(axis=0) for a, b in self.get_polygon_ranges()]).reshape(
+            (-1, 2))
+
+        # grid geometry
+        edge_count = np.size(starts, 0)
+        self.origin = edge_lower.min(axis=0) if edge_count else np.zeros(2)
+        extent = edge_upper.max(axis=0) - self.origin if edge_count else np.ones(2)
+        if cell_size is None:
+            cell_size = max(float(np.max(extent)) / max(np.ceil(np.sqrt(edge_count)), 1), 1e-9)
+        self.cell_size = cell_size
+        self.shape = np.maximum(np.ceil(extent / cell_size).astype(np.int64), 1)
+
+        self.edge_indptr, self.cell_edges = self._bin_boxes(edge_lower, edge_upper)
+        self.polygon_cell_indptr, self.cell_polygons = self._bin_boxes(self.polygon_lower, self.polygon_upper)
+
+    @staticmethod
+    def create_from_obstacles(obstacle_list: list, cell_size=None):
+        """
+        :param obstacle_list: list of workspace Obstacle objects
+        :param cell_size: width of a grid cell
+        :return: ObstacleIndex object
+        """
+        return ObstacleIndex([np.asarray(obstacle.vertices, dtype=float) for obstacle in obstacle_list], cell_size)
+
+    def get_polygon_ranges(self):
+        return zip(self.polygon_indptr[:-1], self.polygon_indptr[1:])
+
+    def get_cell_count(self):
+        return int(np.prod(self.shape))
+
+    def get_cells(self, points: np.ndarray):
+        """
+        :param points: (K, 2) array of points
+        :return: (K,) array of flat cell ids, -1 for points outside the grid
+        """
+        cell = np.floor((np.asarray(points, dtype=float) - self.origin) / self.cell_size).astype(np.int64)
+        # points on the far boundary belong to the last cell, the few points just past it only add candidates
+        cell = np.where(cell == self.shape, self.shape - 1, cell)
+        inside = np.all((cell >= 0) & (cell < self.shape), axis=1)
+        return np.where(inside, cell[:, 0] * self.shape[1] + cell[:, 1], -1)
+
+    def find_obstacles(self, points: np.ndarray):
+        """
+        point in polygon test by ray casting, only against the polygons registered in the cell of each point
+        :param points: (K, 2) array of points
+        :return: (K,) array with the index of an obstacle containing each point, -1 where there is none
+        """
+        points = np.asarray(points, dtype=float).reshape((-1, 2))
+        result = np.full(np.size(points, 0), -1, dtype=np.int64)
+
+        # candidate (point, polygon) pairs
+        cells = self.get_cells(points)
+        valid = np.flatnonzero(cells >= 0)
+        pair_points, pair_polygons = expand_csr(valid, self.polygon_cell_indptr, self.cell_polygons, cells[valid])
+
+        in_box = np.all((points[pair_points] >= self.polygon_lower[pair_polygons]) &
+                        (points[pair_points] <= self.polygon_upper[pair_polygons]), axis=1)
+        pair_points = pair_points[in_box]
+        pair_polygons = pair_polygons[in_box]
+
+        # every edge of every candidate polygon
+        pair_ids, edges = expand_csr(np.arange(0, np.size(pair_points)), self.polygon_indptr,
+                                     np.arange(0, np.size(self.edge_starts, 0)), pair_polygons)
+        p = points[pair_points[pair_ids]]
+        a = self.edge_starts[edges]
+        b = self.edge_ends[edges]
+
+        straddles = (a[:, 1] > p[:, 1]) != (b[:, 1] > p[:, 1])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_cross = a[:, 0] + (p[:, 1] - a[:, 1]) * (b[:, 0] - a[:, 0]) / (b[:, 1] - a[:, 1])
+        crossings = np.bincount(pair_ids, weights=straddles & (p[:, 0] < x_cross), minlength=np.size(pair_points))
+
+        inside = crossings % 2 == 1
+        result[pair_points[inside]] = pair_polygons[inside]
+        return result
+
+    def contains_points(self, points: np.ndarray):
+        """
+        :param points: (K, 2) array of points
+        :return: (K,) boolean array, True where a point is inside an obstacle
+        """
+        return self.find_obstacles(points) >= 0
+
+    def intersects_segments(self, segment_starts: np.ndarray, segment_ends: np.ndarray):
+        """
+        segment against obstacle edge test. The grid cells each segment passes through are found exactly from its
+        crossings of the grid lines, and only the edges registered in those cells are tested. A segment lying
+        completely inside an obstacle crosses no edge, combine with contains_points for that case
+        :param segment_starts: (K, 2) array of segment start points
+        :param segment_ends: (K, 2) array of segment end points
+        :return: (K,) boolean array, True where a segment touches an obstacle edge
+        """
+        p0 = np.asarray(segment_starts, dtype=float).reshape((-1, 2))
+        p1 = np.asarray(segment_ends, dtype=float).reshape((-1, 2))
+        result = np.zeros(np.size(p0, 0), dtype=bool)
+
+        segments, cells = self.traverse_segments(p0, p1)
+        pair_segments, edges = expand_csr(segments, self.edge_indptr, self.cell_edges, cells)
+        if np.size(edges) == 0:
+            return result
+
+        # an edge spanning several cells is tested once for each of them, which is cheaper than removing duplicates
+        hit = segments_intersect(p0[pair_segments], p1[pair_segments], self.edge_starts[edges], self.edge_ends[edges])
+        result[pair_segments[hit]] = True
+        return result
+
+    def traverse_segments(self, p0: np.ndarray, p1: np.ndarray):
+        """
+        every grid cell crossed by every segment, a cell may be listed more than once
+        :param p0: (K, 2) array of segment start points
+        :param p1: (K, 2) array of segment end points
+        :return: (S,) array of segment indices and (S,) array of the flat ids of the cells they cross
+        """
+        K = np.size(p0, 0)
+        g0 = (p0 - self.origin) / self.cell_size
+        g1 = (p1 - self.origin) / self.cell_size
+        delta = g1 - g0
+
+        # clip every segment to the grid box [0, shape], the parts outside the grid cross no cells
+        t_enter = np.zeros(K)
+        t_exit = np.ones(K)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for axis in range(0, 2):
+                t_low = -g0[:, axis] / delta[:, axis]
+                t_high = (self.shape[axis] - g0[:, axis]) / delta[:, axis]
+                moving = delta[:, axis] != 0
+                outside = (g0[:, axis] < 0) | (g0[:, axis] > self.shape[axis])
+                t_enter = np.where(moving, np.maximum(t_enter, np.minimum(t_low, t_high)), t_enter)
+                t_exit = np.where(moving, np.minimum(t_exit, np.maximum(t_low, t_high)), np.where(outside, -1, t_exit))
+        clipped = np.flatnonzero(t_enter <= t_exit)
+        c0 = np.clip(g0[clipped] + t_enter[clipped, np.newaxis] * delta[clipped], 0, self.shape)
+        c1 = np.clip(g0[clipped] + t_exit[clipped, np.newaxis] * delta[clipped], 0, self.shape)
+
+        # parameters t where the clipped segments cross the interior vertical and horizontal grid lines
+        t_values = [t_enter[clipped], t_exit[clipped]]
+        segment_ids = [clipped, clipped]
+        for axis in range(0, 2):
+            lower = np.clip(np.floor(np.minimum(c0[:, axis], c1[:, axis])) + 1, 1, self.shape[axis])
+            upper = np.clip(np.ceil(np.maximum(c0[:, axis], c1[:, axis])) - 1, 0, self.shape[axis] - 1)
+            counts = np.maximum(upper - lower + 1, 0).astype(np.int64)
+            ids = np.repeat(clipped, counts)
+            offsets = np.arange(0, np.sum(counts)) - np.repeat(np.cumsum(counts) - counts, counts)
+            lines = np.repeat(lower, counts) + offsets
+            t_values.append((lines - g0[ids, axis]) / delta[ids, axis])
+            segment_ids.append(ids)
+
+        t = np.concatenate(t_values)
+        ids = np.concatenate(segment_ids)
+        order = np.lexsort((t, ids))
+        t = t[order]
+        ids = ids[order]
+
+        # the midpoint of every stretch between consecutive crossings lies in exactly one crossed cell, stretches of
+        # zero length where a segment passes a grid corner give a cell next to the corner
+        same = ids[1:] == ids[:-1]
+        t_mid = (t[1:] + t[:-1])[same] / 2
+        mid_ids = ids[1:][same]
+        points = g0[mid_ids] + t_mid[:, np.newaxis] * delta[mid_ids]
+        cell = np.clip(np.floor(points).astype(np.int64), 0, self.shape - 1)
+        return mid_ids, cell[:, 0] * self.shape[1] + cell[:, 1]
+
+    def _bin_boxes(self, lower: np.ndarray, upper: np.ndarray):
+        # CSR lists of the box indices in every cell that a box overlaps
+        low = np.clip(np.floor((lower - self.origin) / self.cell_size).astype(np.int64), 0, self.shape - 1)
+        high = np.clip(np.floor((upper - self.origin) / self.cell_size).astype(np.int64), 0, self.shape - 1)
+        spans = high - low + 1
+        counts = spans[:, 0] * spans[:, 1]
+
+        boxes = np.repeat(np.arange(0, np.size(lower, 0)), counts)
+        offsets = np.arange(0, np.sum(counts)) - np.repeat(np.cumsum(counts) - counts, counts)
+        ix = low[boxes, 0] + offsets // spans[boxes, 1]
+        iy = low[boxes, 1] + offsets % spans[boxes, 1]
+        cells = ix * self.shape[1] + iy
+
+        order = np.argsort(cells, kind='stable')
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(cells, minlength=self.get_cell_count()))])
+        return indptr, boxes[order]
+
+
+def expand_csr(owners: np.ndarray, indptr: np.ndarray, indices: np.ndarray, rows: np.ndarray):
+    """
+    gathers the CSR rows of many owners at once
+    :param owners: (K,) array of owner ids, repeated once for every entry of their row
+    :param indptr: CSR row pointer
+    :param indices: CSR column indices
+    :param rows: (K,) array of the row of every owner
+    :return: (S,) array of owners and (S,) array of the entries of their rows
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    counts = indptr[rows + 1] - indptr[rows]
+    positions = np.arange(0, np.sum(counts)) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(
+        indptr[rows], counts)
+    return np.repeat(owners, counts), indices[positions]
+
+
+def segments_intersect(p0: np.ndarray, p1: np.ndarray, q0: np.ndarray, q1: np.ndarray):
+    """
+    orientation test of pairs of closed segments, touching counts as intersecting
+    :param p0: (K, 2) array of the first segment start points
+    :param p1: (K, 2) array of the first segment end points
+    :param q0: (K, 2) array of the second segment start points
+    :param q1: (K, 2) array of the second segment end points
+    :return: (K,) boolean array
+    """
+    def cross(o, a, b):
+        return (a[:, 0] - o[:, 0]) * (b[:, 1] - o[:, 1]) - (a[:, 1] - o[:, 1]) * (b[:, 0] - o[:, 0])
+
+    d1 = cross(q0, q1, p0)
+    d2 = cross(q0, q1, p1)
+    d3 = cross(p0, p1, q0)
+    d4 = cross(p0, p1, q1)
+
+    # collinear segments only intersect where their bounding boxes overlap
+    boxes_overlap = np.all((np.minimum(p0, p1) <= np.maximum(q0, q1)) & (np.minimum(q0, q1) <= np.maximum(p0, p1)),
+                           axis=1)
+    return (d1 * d2 <= 0) & (d3 * d4 <= 0) & boxes_overlap
@@ -0,0 +1,148 @@
+import numpy as np
+from scipy import linalg
+
+from data_objects import InformationEstimate, Measurement
+from estimation_tools import DiscreteLinearStateSpace
+
+
+class SquareRootInformationEstimate:
+    """
+    information estimate held as a square root factor S with Y = S^T S and a whitened state z with y = S^T z. S is
+    upper triangular after every filter update, but any square root of Y is accepted
+    """
+    def __init__(self, step: int, info_sqrt: np.ndarray, whitened_state: np.ndarray):
+        self.step = step
+        self.info_sqrt = info_sqrt
+        self.whitened_state = whitened_state
+
+    @staticmethod
+    def create_from_information_estimate(estimate: InformationEstimate):
+        """
+        factors an information estimate, singular information matrices are allowed
+        :param estimate: InformationEstimate object
+        :return: SquareRootInformationEstimate object
+        """
+        S, z = factor_information(estimate.return_data_array(), estimate.return_information_matrix())
+        return SquareRootInformationEstimate(estimate.step, S, z)
+
+    def return_information_estimate(self):
+        y, Y = return_information(self.info_sqrt, self.whitened_state)
+        return InformationEstimate.create_from_array(self.step, y, Y)
+
+
+def run(target_state_space: DiscreteLinearStateSpace, state: SquareRootInformationEstimate, measurement: Measurement,
+        R_inv_sqrt: np.ndarray):
+    """
+    square root information filter step, the drop in replacement for information_filter.run
+    :param target_state_space: target state space
+    :param state: SquareRootInformationEstimate at the previous step
+    :param measurement: Measurement at the new step
+    :param R_inv_sqrt: m x m whitening matrix of the sensor noise from get_inverse_square_root
+    :return: SquareRootInformationEstimate at the new step
+    """
+    z_k1 = measurement.return_data_array()
+
+    S_k1_m, z_k1_m = time_update(target_state_space, state.info_sqrt, state.whitened_state)
+    if np.isnan(z_k1).any():
+        # occluded sensor, the prediction is the estimate
+        return SquareRootInformationEstimate(state.step + 1, S_k1_m, z_k1_m)
+
+    S_k1_p, z_k1_p = measurement_update(target_state_space, S_k1_m, z_k1_m, z_k1, R_inv_sqrt)
+
+    return SquareRootInformationEstimate(state.step + 1, S_k1_p, z_k1_p)
+
+
+def time_update(state_space: DiscreteLinearStateSpace, S_k0_p: np.ndarray, z_k0_p: np.ndarray):
+    """
+    square root time update broadcast over any leading dimensions. The process noise w = Q^1/2 v is appended to the
+    state and eliminated again by a single QR factorization of
+        [ I                 0          0     ]
+        [ -S F^-1 Q^1/2     S F^-1     z     ]
+    no matrix is inverted and the information matrix is never formed
+    :param state_space: target state space
+    :param S_k0_p: (..., n, n) array of information square roots
+    :param z_k0_p: (..., n, 1) array of whitened states
+    :return: predicted square roots and whitened states with the same shapes
+    """
+    n, _ = state_space.get_dimensions()
+    S_F_inv = S_k0_p @ state_space.get_F_inv()
+    leading_shape = np.broadcast_shapes(np.shape(S_F_inv)[:-2], np.shape(z_k0_p)[:-2])
+
+    A = np.zeros(leading_shape + (2 * n, 2 * n + 1))
+    A[..., :n, :n] = np.eye(n)
+    A[..., n:, :n] = -S_F_inv @ state_space.get_Q_sqrt()
+    A[..., n:, n:2 * n] = S_F_inv
+    A[..., n:, 2 * n:] = z_k0_p
+
+    T = np.linalg.qr(A, mode='r')
+    return T[..., n:, n:2 * n], T[..., n:, 2 * n:]
+
+
+def measurement_update(state_space: DiscreteLinearStateSpace, S_k1_m: np.ndarray, z_k1_m: np.ndarray,
+                       z_k1: np.ndarray, R_inv_sqrt: np.ndarray):
+    """
+    square root measurement update broadcast over any leading dimensions, a QR factorization of the prior stacked on
+    the whitened measurement equation
+    :param state_space: target state space
+    :param S_k1_m: (..., n, n) array of predicted information square roots
+    :param z_k1_m: (..., n, 1) array of predicted whitened states
+    :param z_k1: (..., m, 1) array of measurements
+    :param R_inv_sqrt: (m, m) or (..., m, m) whitening matrix of the sensor noise
+    :return: updated square roots and whitened states
+    """
+    n, _ = state_space.get_dimensions()
+    W_H = R_inv_sqrt @ state_space.H
+    W_z = R_inv_sqrt @ z_k1
+    m = np.size(W_H, -2)
+    leading_shape = np.broadcast_shapes(np.shape(S_k1_m)[:-2], np.shape(z_k1_m)[:-2], np.shape(W_H)[:-2],
+                                        np.shape(W_z)[:-2])
+
+    A = np.zeros(leading_shape + (n + m, n + 1))
+    A[..., :n, :n] = S_k1_m
+    A[..., :n, n:] = z_k1_m
+    A[..., n:, :n] = W_H
+    A[..., n:, n:] = W_z
+
+    T = np.linalg.qr(A, mode='r')
+    return T[..., :n, :n], T[..., :n, n:]
+
+
+def get_inverse_square_root(R: np.ndarray):
+    """
+    whitening matrix L^-1 of a noise covariance R = L L^T, so that L^-1 v has identity covariance
+    :param R: (..., m, m) array of noise covariances
+    :return: (..., m, m) array of lower triangular whitening matrices
+    """
+    L = np.linalg.cholesky(R)
+    m = np.size(R, -1)
+    if np.ndim(L) == 2:
+        return linalg.solve_triangular(L, np.eye(m), lower=True)
+    return np.linalg.solve(L, np.broadcast_to(np.eye(m), np.shape(L)))
+
+
+def factor_information(y: np.ndarray, Y: np.ndarray):
+    """
+    square root form of information estimates from their eigen decomposition, S = sqrt(L) V^T. Unlike a Cholesky
+    factorization this works for the singular information matrices of uninformed seekers
+    :param y: (..., n, 1) array of information vectors
+    :param Y: (..., n, n) array of information matrices
+    :return: (..., n, n) square roots and (..., n, 1) whitened states
+    """
+    eigenvalues, V = np.linalg.eigh(Y)
+    root = np.sqrt(np.clip(eigenvalues, 0, None))
+    S = root[..., :, np.newaxis] * np.swapaxes(V, -1, -2)
+
+    # z = S^-T y on the informed subspace, directions without information carry no whitened state
+    inverse_root = np.divide(1, root, out=np.zeros_like(root), where=root > 0)
+    z = inverse_root[..., :, np.newaxis] * (np.swapaxes(V, -1, -2) @ y)
+    return S, z
+
+
+def return_information(S: np.ndarray, z: np.ndarray):
+    """
+    :param S: (..., n, n) array of information square roots
+    :param z: (..., n, 1) array of whitened states
+    :return: information vectors S^T z and information matrices S^T S
+    """
+    S_T = np.swapaxes(S, -1, -2)
+    return S_T @ z, S_T @ S
@@ -1,19 +1,40 @@
-from math import sqrt
+import argparse
+import itertools
 
 from matplotlib import pyplot as plt
-from matplotlib.animation import FuncAnimation
-from matplotlib.patches import Ellipse
 import numpy as np
 
+from batch_information_filter import BatchInformationFilter
+from channel_filter import NOVELTY_METRICS
+from covariance_intersection import OMEGA_METHODS
 from data_objects import GroundTruth
-from data_model import TruthModel
-from estimation_tools import DiscreteLinearStateSpace, get_time_vector, get_true_measurements
+from data_model import StreamingTruthModel
+from estimation_tools import DiscreteLinearStateSpace, generate_true_measurements, get_time_vector
 import information_filter as IF
 from initialize import initialize_environment, initialize_seeker, initialize_hider
-from system_dynamics import get_ground_truth
-
-
-def main():
+from instrumentation import DISABLED, Instrumentation, ProfileSession
+import monte_carlo as MC
+import multi_target as MT
+from nonlinear_sensors import BatchExtendedInformationFilter, SENSOR_MODELS
+import render
+from render import Track
+from system_dynamics import generate_ground_truth
+
+
+def main(seed=None, render_path=None, frame_step=1, fusion='cf', omega='fast', square_root=False,
+         instrumentation=DISABLED, sensor='linear'):
+    """
+    runs the static linear example and animates the results
+    :param seed: seed for the sensor noise
+    :param render_path: write the animation to this video file or frame directory instead of showing it
+    :param frame_step: animate only every frame_step step
+    :param fusion: 'cf' for channel filters on the example tree, 'ci' for covariance intersection on a full mesh
+    :param omega: covariance intersection weight method, 'fast' or 'optimal'
+    :param square_root: run the networked seekers with the square root information filter
+    :param instrumentation: Instrumentation object that times the phases of the main loop
+    :param sensor: 'linear' position sensors or 'range-bearing' sensors run with the extended information filter
+    :return: none
+    """
     # plt.figure()
     # ax = plt.gca()
 
@@ -36,7 +57,7 @@ def main():
     ])
 
     # Init ===================================
-    workspace, state_space = setup(dt)
+    workspace, state_space = setup(dt, np.random.default_rng(seed), sensor=sensor)
 
     seeker1 = workspace.robots[0]
     seeker2 = workspace.robots[1]
@@ -48,90 +69,78 @@ def main():
     seekerSolo = workspace.robots[5]
     hider = workspace.robots[6]
 
-    # establishes where two way communication exists
-    comm_lines = [
-        # (seeker1, seeker2),
-        (seeker2, seeker3),
-        (seeker3, seeker4),
-        (seeker4, seeker5),
-    ]
-    create_channel_filters(comm_lines, hider)
+    if fusion == 'ci':
+        comm_lines = get_mesh_lines(seeker_list)
+    else:
+        comm_lines = get_comm_lines(seeker_list)
+        create_channel_filters(comm_lines, hider)
 
-    # TODO: make this a method in the hider
-    x0 = GroundTruth.create_from_array(0, hider.return_state_array())
+    x0 = hider.return_ground_truth()
     truth_model = build_truth_model(state_space, x0, steps)
     hider.truth_model = truth_model
 
-    for _ in range(0, steps):
+    filter_class = BatchExtendedInformationFilter if sensor == 'range-bearing' else BatchInformationFilter
+    batch_filter = filter_class.create_from_seekers(seeker_list, hider.state_space, square_root)
+    seeker_positions = np.array([robot.return_state_list()[0:2] for robot in seeker_list])
+
+    for k in range(0, steps):
+        instrumentation.begin_step(k + 1)
+
+        # Sense ================================================================
+        with instrumentation.phase('line_of_sight'):
+            hider_position = truth_model.get_ground_truth(k + 1).return_data_array()[0:2, 0]
+            visible = workspace.get_line_of_sight(seeker_positions, hider_position)
+
         # Run Local Updates ====================================================
+        with instrumentation.phase('run_filters'):
+            batch_filter.run_filters(seeker_list, hider, visible)
+        if fusion == 'ci':
+            with instrumentation.phase('fuse_data_ci'):
+                fuse_covariance_intersection(seeker_list, comm_lines, omega)
+            continue
+
         for robot in seeker_list:
-            robot.run_filter(hider)
-            robot.send_update()
+            with instrumentation.phase('send_update', robot.name):
+                robot.send_update(instrumentation)
         # Fuse Data ============================================================
         for robot in seeker_list:
-            robot.receive_update()
-            robot.fuse_data()
+            with instrumentation.phase('receive_update', robot.name):
+                robot.receive_update(instrumentation)
+            with instrumentation.phase('fuse_data', robot.name):
+                robot.fuse_data()
+
+    instrumentation.finish()
 
     # Set control seeker ========================================================
-    seekerSolo.measurement_list = seeker3.measurement_list
-    for y in seekerSolo.measurement_list:
-        seekerSolo.information_list.append(IF.run(hider.state_space, seekerSolo.information_list[-1], y, seekerSolo.R))
+    seekerSolo.measurement_history = seeker3.measurement_history
+    if sensor == 'range-bearing':
+        # the measurements were taken from seeker 3's pose
+        control_filter = BatchExtendedInformationFilter.create_from_seekers([seeker3], hider.state_space)
+        control_filter.load_seekers([seekerSolo])
+        for y in seekerSolo.measurement_history:
+            z = y.return_data_array()
+            control_filter.run(z[np.newaxis], [not np.isnan(z).any()])
+            seekerSolo.information_history.append_record(control_filter.step, vector=control_filter.y[0],
+                                                         matrix=control_filter.Y[0])
+    else:
+        for y in seekerSolo.measurement_history:
+            estimate = IF.run(hider.state_space, seekerSolo.information_history[-1], y, seekerSolo.R)
+            seekerSolo.information_history.append(estimate)
 
 # =====================================================================
     states_of_interest = times[1:-1]
-    plotter_list = []
-    for robot in seeker_list:
-        state_estimate_list = []
-        ellipse_list = []
-        meas_list = []
-        for i in states_of_interest:
-        # TODO: have robot invert these real time to state estimates
-            state_estimate = robot.information_list[i].get_state_estimate()
-            ellipse = state_estimate.get_covariance_ellipse(robot.color)
-            meas = robot.measurement_list[i]
-            state_estimate_list.append(state_estimate)
-            ellipse_list.append(ellipse)
-            meas_list.append(meas)
-
-        plotter = Plotter(robot, states_of_interest, state_estimate_list, ellipse_list, meas_list)
-        plotter_list.append(plotter)
-
-    state_estimate_list = []
-    ellipse_list = []
-    meas_list = []
-    for i in states_of_interest:
-        state_estimate = seekerSolo.information_list[i].get_state_estimate()
-        ellipse = state_estimate.get_covariance_ellipse(seekerSolo.color)
-        meas = seekerSolo.measurement_list[i]
-        state_estimate_list.append(state_estimate)
-        ellipse_list.append(ellipse)
-        meas_list.append(meas)
-
-    plotter = Plotter(seekerSolo, states_of_interest, state_estimate_list, ellipse_list, meas_list)
-    plotter_list.append(plotter)
+    # range and bearing measurements are not positions, so they are left out of the animation
+    plot_measurements = sensor == 'linear'
+    tracks = [Track.create_from_seeker(robot, states_of_interest, plot_measurements) for robot in seeker_list]
+    tracks.append(Track.create_from_seeker(seekerSolo, states_of_interest, plot_measurements=False))
 # =======================================================================
 
-    for robot in seeker_list:
+    for robot in seeker_list + [seekerSolo]:
         print("State Estimate from {}: ".format(robot.name))
-        print(np.around(robot.information_list[-1].get_state_estimate().return_data_array(), 2))
+        print(np.around(robot.information_history.get_state_estimate().return_data_array(), 2))
         print()
 
-    print("State Estimate from {}: ".format(seekerSolo.name))
-    print(np.around(seekerSolo.information_list[-1].get_state_estimate().return_data_array(), 2))
-    print()
-
     # Animate results =============================================================
-    state_estimate_anim = []
-    for i in states_of_interest:
-        # TODO: have robot invert these real time to state estimates
-        robot = seeker_list[0]
-        state_estimate_anim.append(robot.information_list[i].get_state_estimate())
-
-    fig, ax = plt.subplots()
-    plt.title("Stationary Hiders and Seekers with Noisy Position Measurements")
-    plt.xlabel("x position [m]")
-    plt.ylabel("y position [m]")
-    plt.axis("equal")
     legend_labels = [
         "Map Border",
         "Seeker 1 Position",
@@ -145,81 +154,200 @@ def main():
         "Comm Lines"
     ]
 
-    ax.set_xlim([-55, 55])
-    ax.set_ylim([-55, 55])
-
-    workspace.plot()
-    pos1, = ax.plot([], [], 'd', mfc=seeker1.color, mec='None')
-    plot_comm_lines(comm_lines)
-    plt.legend(legend_labels, loc="upper left")
-
-    pos2, = ax.plot([], [], 'd', mfc=seeker2.color, mec='None')
-    pos3, = ax.plot([], [], 'd', mfc=seeker3.color, mec='None')
-    pos4, = ax.plot([], [], 'd', mfc=seeker4.color, mec='None')
-    pos5, = ax.plot([], [], 'd', mfc=seeker5.color, mec='None')
-    pos6, = ax.plot([], [], 'd', mfc=seekerSolo.color, mec='None')
-    lines = [pos1, pos2, pos3, pos4, pos5, pos6]
-
-    patch1 = Ellipse(xy=(0, 0), width=10, height=10, edgecolor=seeker1.color, fc='None', ls='--')
-    patch2 = Ellipse(xy=(0, 0), width=10, height=10, edgecolor=seeker2.color, fc='None', ls='--')
-    patch3 = Ellipse(xy=(0, 0), width=10, height=10, edgecolor=seeker3.color, fc='None', ls='--')
-    patch4 = Ellipse(xy=(0, 0), width=10, height=10, edgecolor=seeker4.color, fc='None', ls='--')
-    patch5 = Ellipse(xy=(0, 0), width=10, height=10, edgecolor=seeker5.color, fc='None', ls='--')
-    patch6 = Ellipse(xy=(0, 0), width=10, height=10, edgecolor=seekerSolo.color, fc='None', ls='--')
-    patches = [patch1, patch2, patch3, patch4, patch5, patch6]
-    for patch in patches:
-        ax.add_patch(patch)
-
-    meas1, = ax.plot([], [], 'o', mfc=seeker1.color, markersize=2, mec='None')
-    meas2, = ax.plot([], [], 'o', mfc=seeker2.color, markersize=2, mec='None')
-    meas3, = ax.plot([], [], 'o', mfc=seeker3.color, markersize=2, mec='None')
-    meas4, = ax.plot([], [], 'o', mfc=seeker4.color, markersize=2, mec='None')
-    meas5, = ax.plot([], [], 'o', mfc=seeker5.color, markersize=2, mec='None')
-    meas = [meas1, meas2, meas3, meas4, meas5]
-
-    count_text = ax.text(15, -45, "Current Step: ")
-    count_text.set_bbox(dict(facecolor='white'))
-
-    anim = FuncAnimation(fig, animate, frames=len(states_of_interest),
-                         fargs=[lines, patches, meas, plotter_list, count_text],
-                         interval=1000, blit=True, repeat_delay=5000)
+    fig, ax = plt.subplots()
+    title = "Stationary Hiders and Seekers with Noisy Position Measurements"
+    artists = render.setup_figure(ax, workspace, comm_lines, tracks, title, legend_labels)
+
+    if render_path:
+        render.save_animation(fig, artists, tracks, render_path, frame_step)
+        plt.close(fig)
+        return
+
+    anim = render.create_animation(fig, artists, tracks, frame_step)
 
     plt.show()
 
 
-def animate(i, lines, patches, meas, plotter_list, title):
+def run_monte_carlo(trials: int, seed=None, fusion='cf', omega='fast'):
+    """
+    headless Monte Carlo run of the same seekers, topology and hider used by main, with the trial dimension as an
+    array axis
+    :param trials: number of independent noisy realizations
+    :param seed: seed for the random number generator
+    :param fusion: 'cf' for channel filters on the example tree, 'ci' for covariance intersection on a full mesh
+    :param omega: covariance intersection weight method, 'fast' or 'optimal'
+    :return: MonteCarloResults object
+    """
+    dt = 1
+    t0 = 0
+    tf = 10
+    times = get_time_vector(t0, tf + dt, dt)
+    steps = len(times) - 1
+
+    seeker_list, state_space, x0, R_stack, comm_edges = setup_network(dt, fusion == 'ci')
+
+    results = MC.run_trials(state_space, x0, R_stack, comm_edges, steps, trials, np.random.default_rng(seed),
+                            fusion=fusion, omega=omega)
 
-    title.set_text("Current Step: {}".format(i + 1))
-    for lnum, line in enumerate(lines):
-        x, y = plotter_list[lnum].state_list[i].return_data_list()
-        line.set_data(x, y)
+    m = np.size(R_stack, 1)
+    nees_lower, nees_upper = results.get_nees_bounds()
+    nis_lower, nis_upper = results.get_nis_bounds(m)
+    average_nees = results.get_average_nees()[-1]
+    average_nis = results.get_average_nis()[-1]
+    rmse = results.get_rmse()[-1]
+
+    print("Monte Carlo consistency over {} trials at step {}".format(trials, steps))
+    print("NEES bounds: [{:.3f}, {:.3f}]   NIS bounds: [{:.3f}, {:.3f}]".format(
+        nees_lower, nees_upper, nis_lower, nis_upper))
+    for i, robot in enumerate(seeker_list):
+        print("{}: NEES {:.3f}   NIS {:.3f}   RMSE {:.3f} m".format(
+            robot.name, average_nees[i], average_nis[i], rmse[i]))
+    print()
 
-    # TODO: These aren't plotting right for R2
-    for pnum, patch in enumerate(patches):
-        x, y = plotter_list[pnum].state_list[i].return_data_list()
-        width = 2 * plotter_list[pnum].state_list[i].x1_2sigma * sqrt(5.991)
-        height = 2 * plotter_list[pnum].state_list[i].x2_2sigma * sqrt(5.991)
-        patch.center = (x, y)
-        patch.width = width
-        patch.height = height
+    return results
 
-    for mnum, measurement in enumerate(meas):
-        x, y = plotter_list[mnum].meas_list[i].return_data_list()
-        measurement.set_data(x, y)
 
-    # return lines + [title]
-    return lines + patches + meas + [title]
+def run_trigger_study(trials: int, thresholds: list, metric='trace', seed=None):
+    """
+    Monte Carlo comparison of event triggered channel filters against sending every step
+    :param trials: number of independent noisy realizations per threshold
+    :param thresholds: list of event trigger thresholds
+    :param metric: novelty metric used with the thresholds
+    :param seed: seed for the random number generator, shared by every threshold
+    :return: list of rows from monte_carlo.run_trigger_study
+    """
+    dt = 1
+    t0 = 0
+    tf = 10
+    steps = len(get_time_vector(t0, tf + dt, dt)) - 1
+
+    _, state_space, x0, R_stack, comm_edges = setup_network(dt)
+    rows = MC.run_trigger_study(state_space, x0, R_stack, comm_edges, steps, trials, [None] + list(thresholds),
+                                metric, seed)
+
+    _, _, baseline_bytes, _, _ = rows[0]
+    nees_lower, nees_upper = MC.get_chi_square_bounds(trials, np.size(x0, 0))
+
+    print("Event triggered channel filters over {} trials, {} metric".format(trials, metric))
+    print("NEES bounds: [{:.3f}, {:.3f}]".format(nees_lower, nees_upper))
+    print("{:>10} {:>10} {:>12} {:>12} {:>10} {:>10}".format(
+        "threshold", "sent", "bytes/trial", "bytes saved", "RMSE", "NEES"))
+    for threshold, rate, bytes_sent, rmse, nees in rows:
+        print("{:>10} {:>9.1f}% {:>12.0f} {:>11.1f}% {:>10.3f} {:>10.3f}".format(
+            "always" if threshold is None else "{:g}".format(threshold), 100 * rate, bytes_sent,
+            100 * (1 - bytes_sent / baseline_bytes), rmse, nees))
+    print()
 
+    return rows
 
-def setup(dt: float):
+
+def run_multi_target(hider_count: int, seed=None, threshold=None, metric='trace'):
+    """
+    headless run of the example seekers and channel filters tracking many hiders at once, every link carries the
+    novel information of all hiders in one message
+    :param hider_count: number of hiders, placed at random on the right half of the map
+    :param seed: seed for the random number generator
+    :param threshold: event trigger threshold applied to every hider, None sends every step
+    :param metric: novelty metric used with the threshold
+    :return: (N, T) arrays of the final position errors and NEES
+    """
+    dt = 1
+    t0 = 0
+    tf = 10
+    steps = len(get_time_vector(t0, tf + dt, dt)) - 1
+
+    rng = np.random.default_rng(seed)
+    workspace, state_space = setup(dt, rng)
+    seeker_list = workspace.robots[0:5]
+
+    hiders = MT.create_hiders(hider_count, state_space, (0, workspace.x_bounds[1]), workspace.y_bounds, rng)
+    for hider in hiders:
+        hider.truth_model = build_truth_model(state_space, hider.return_ground_truth(), steps)
+
+    for robot in seeker_list:
+        robot.track_targets(hiders)
+    for seeker_i, seeker_j in get_comm_lines(seeker_list):
+        seeker_i.create_multi_target_channel_filter(seeker_j, threshold, metric)
+        seeker_j.create_multi_target_channel_filter(seeker_i, threshold, metric)
+
+    batch_filter = MT.MultiTargetInformationFilter.create_from_seekers(seeker_list, state_space)
+    seeker_positions = np.array([robot.return_state_list()[0:2] for robot in seeker_list])
+    sight_starts = np.repeat(seeker_positions, hider_count, axis=0)
+
+    for k in range(0, steps):
+        hider_positions = np.stack([hider.truth_model.get_ground_truth(k + 1).return_data_array()[0:2, 0]
+                                    for hider in hiders])
+        visible = workspace.get_line_of_sight(sight_starts, np.tile(hider_positions, (len(seeker_list), 1)))
+        batch_filter.run_filters(seeker_list, visible.reshape((len(seeker_list), hider_count)))
+
+        for robot in seeker_list:
+            robot.send_update()
+        for robot in seeker_list:
+            robot.receive_update()
+            robot.fuse_target_data()
+
+    errors, nees = MT.get_target_errors(seeker_list)
+
+    print("Tracking {} hiders for {} steps".format(hider_count, steps))
+    for i, robot in enumerate(seeker_list):
+        print("{}: mean error {:.3f} m   mean NEES {:.3f}".format(robot.name, np.mean(errors[i]), np.mean(nees[i])))
+    print()
+
+    return errors, nees
+
+
+def setup_network(dt: float, mesh=False):
+    """
+    the seekers, topology and hider of the static example as the arrays used by the Monte Carlo tools
+    :param dt: time step
+    :param mesh: link every pair of seekers instead of using the example tree
+    :return: seeker list, state space, n x 1 initial target state, (N, m, m) R stack and list of seeker index pairs
+    """
+    workspace, state_space = setup(dt)
+    seeker_list = workspace.robots[0:5]
+    hider = workspace.robots[6]
+
+    comm_lines = get_mesh_lines(seeker_list) if mesh else get_comm_lines(seeker_list)
+    comm_edges = [(seeker_list.index(i), seeker_list.index(j)) for i, j in comm_lines]
+    x0 = hider.return_ground_truth().return_data_array()
+    R_stack = np.stack([robot.R for robot in seeker_list])
+
+    return seeker_list, state_space, x0, R_stack, comm_edges
+
+
+# range/bearing sensors keep seeker 1 as the better sensor, with (2 m)^2 against (4 m)^2 and (5 degrees)^2 bearings
+RANGE_VARIANCES = (4, 16)
+BEARING_VARIANCE = np.radians(5) ** 2
+
+DEFAULT_SEEKER_POSE_FILES = (
+    'pose_m40_40.txt',
+    'pose_m20_20.txt',
+    'pose_m40_0.txt',
+    'pose_m20_m5.txt',
+    'pose_m40_m40.txt',
+    'pose_m25_5.txt',
+)
+
+
+def setup(dt: float, rng=None, r1=250, r2=500, seeker_pose_files=DEFAULT_SEEKER_POSE_FILES,
+          hider_pose_file='pose_30_0.txt', sensor='linear', range_variances=RANGE_VARIANCES,
+          bearing_variance=BEARING_VARIANCE):
+    """
+    builds the workspace, seekers, and hider of the static linear example
+    :param dt: time step
+    :param rng: numpy random Generator shared by the seeker sensors
+    :param r1: measurement noise variance of seeker 1
+    :param r2: measurement noise variance of the remaining seekers
+    :param seeker_pose_files: pose file names for the five networked seekers and the control seeker
+    :param hider_pose_file: pose file name for the hider
+    :param sensor: 'linear' position sensors with variances r1 and r2, or 'range-bearing' sensors
+    :param range_variances: range noise variances of seeker 1 and of the remaining seekers for range/bearing sensors
+    :param bearing_variance: bearing noise variance of the range/bearing sensors in rad^2
+    :return: the workspace and the hider state space
+    """
     map_file = 'empty_map.txt'
-    seeker1_pose_file = 'pose_m40_40.txt'
-    seeker2_pose_file = 'pose_m20_20.txt'
-    seeker3_pose_file = 'pose_m40_0.txt'
-    seeker4_pose_file = 'pose_m20_m5.txt'
-    seeker5_pose_file = 'pose_m40_m40.txt'
-    seeker6_pose_file = 'pose_m25_5.txt'
-    hider_pose_file = 'pose_30_0.txt'
+    seeker1_pose_file, seeker2_pose_file, seeker3_pose_file, seeker4_pose_file, seeker5_pose_file, \
+        seeker6_pose_file = seeker_pose_files
 
     workspace = initialize_environment(map_file)
 
@@ -231,21 +359,25 @@ def setup(dt: float):
     Q = np.eye(2)*.000001
 
     R1 = np.array([
-        [250, 0],
-        [0, 250]
+        [r1, 0],
+        [0, r1]
     ])
 
     R2 = np.array([
-        [500, 0],
-        [0, 500]
+        [r2, 0],
+        [0, r2]
     ])
 
-    initialize_seeker('seeker_1', seeker1_pose_file, 'darkred', workspace, R1)
-    initialize_seeker('seeker_2', seeker2_pose_file, 'darkorange', workspace, R2)
-    initialize_seeker('seeker_3', seeker3_pose_file, 'darkgoldenrod', workspace, R2)
-    initialize_seeker('seeker_4', seeker4_pose_file, 'rebeccapurple', workspace, R2)
-    initialize_seeker('seeker_5', seeker5_pose_file, 'darkgreen', workspace, R2)
-    initialize_seeker('seeker_6', seeker6_pose_file, 'k', workspace, R2)
+    if sensor == 'range-bearing':
+        R1 = np.diag([range_variances[0], bearing_variance])
+        R2 = np.diag([range_variances[1], bearing_variance])
+
+    initialize_seeker('seeker_1', seeker1_pose_file, 'darkred', workspace, R1, rng)
+    initialize_seeker('seeker_2', seeker2_pose_file, 'darkorange', workspace, R2, rng)
+    initialize_seeker('seeker_3', seeker3_pose_file, 'darkgoldenrod', workspace, R2, rng)
+    initialize_seeker('seeker_4', seeker4_pose_file, 'rebeccapurple', workspace, R2, rng)
+    initialize_seeker('seeker_5', seeker5_pose_file, 'darkgreen', workspace, R2, rng)
+    initialize_seeker('seeker_6', seeker6_pose_file, 'k', workspace, R2, rng)
 
     # TODO: need a dynamics model
     state_space = DiscreteLinearStateSpace(F, G, H, M, Q, None, dt)
@@ -255,45 +387,135 @@ def setup(dt: float):
     return workspace, state_space
 
 
-def create_channel_filters(comm_lines, target):
-    for line in comm_lines:
-        line[0].create_channel_filter(line[1], target)
-        line[1].create_channel_filter(line[0], target)
+def get_comm_lines(seeker_list: list):
+    """
+    establishes where two way communication exists
+    :param seeker_list: list of the five networked seekers
+    :return: list of tuples of seekers that share a channel filter
+    """
+    return [
+        # (seeker_list[0], seeker_list[1]),
+        (seeker_list[1], seeker_list[2]),
+        (seeker_list[2], seeker_list[3]),
+        (seeker_list[3], seeker_list[4]),
+    ]
+
 
+def get_mesh_lines(seeker_list: list):
+    """
+    two way communication between every pair of seekers, full of cycles so it needs covariance intersection
+    :param seeker_list: list of networked seekers
+    :return: list of tuples of seekers that communicate
+    """
+    return [(seeker_i, seeker_j) for i, seeker_i in enumerate(seeker_list) for seeker_j in seeker_list[i + 1:]]
+
+
+def fuse_covariance_intersection(seeker_list: list, comm_lines: list, omega='fast'):
+    """
+    every seeker fuses the local estimates of its neighbors by covariance intersection
+    :param seeker_list: list of networked seekers that just ran their local filters
+    :param comm_lines: list of tuples of seekers that communicate, may contain cycles
+    :param omega: covariance intersection weight method, 'fast' or 'optimal'
+    :return: none
+    """
+    # the local estimates before fusion, indexing the history returns copies that fusion does not overwrite
+    local_information = {}
+    for robot in seeker_list:
+        estimate = robot.information_history[-1]
+        local_information[robot.name] = (estimate.return_data_array(), estimate.return_information_matrix())
 
-def build_truth_model(state_space: DiscreteLinearStateSpace, x0: GroundTruth, steps: int):
+    neighbors = {robot.name: list() for robot in seeker_list}
+    for robot_i, robot_j in comm_lines:
+        neighbors[robot_i.name].append(local_information[robot_j.name])
+        neighbors[robot_j.name].append(local_information[robot_i.name])
 
-    ground_truth_list = get_ground_truth(state_space, x0, steps)
-    true_measurements = get_true_measurements(state_space, ground_truth_list)
-    truth_model = TruthModel(ground_truth_list, None, true_measurements)
-    return truth_model
+    for robot in seeker_list:
+        robot.fuse_data_ci(neighbors[robot.name], omega)
 
 
-def plot_comm_lines(comm_lines, line_style='b--'):
+def create_channel_filters(comm_lines, target, threshold=None, metric='trace'):
     for line in comm_lines:
-        coords1 = line[0].return_state_list()
-        coords2 = line[1].return_state_list()
+        line[0].create_channel_filter(line[1], target, threshold, metric)
+        line[1].create_channel_filter(line[0], target, threshold, metric)
 
-        x_ords = [coords1[0], coords2[0]]
-        y_ords = [coords1[1], coords2[1]]
 
-        plt.plot(x_ords, y_ords, line_style, alpha=0.5)
+def build_truth_model(state_space: DiscreteLinearStateSpace, x0: GroundTruth, steps=None, window=64):
+    """
+    streaming truth model, the ground truth and true measurements are generated as the seekers ask for them
+    :param state_space: target state space
+    :param x0: GroundTruth at the first step
+    :param steps: number of steps to generate, or None for a run of any length
+    :param window: number of past steps kept for lookups
+    :return: StreamingTruthModel object
+    """
+    ground_truth_stream, measured_stream = itertools.tee(generate_ground_truth(state_space, x0, steps))
+    true_measurement_stream = generate_true_measurements(state_space, measured_stream)
+    return StreamingTruthModel(ground_truth_stream, true_measurement_stream, window)
 
 
 def print_attributes(item):
     print(item.__dict__)
 
 
-class Plotter:
-    def __init__(self, robot, steps: list, states: list, two_sigmas: list, measurements: list, state_names=None):
-        self.name = robot.name
-        self.step_list = steps
-        self.state_list = states
-        self.two_sigma_list = two_sigmas
-        self.meas_list = measurements
-        self.color = robot.color
-        self.state_names = state_names
-
-
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--monte-carlo', type=int, metavar='TRIALS', help="run headless Monte Carlo trials instead")
+    parser.add_argument('--event-trigger', type=float, nargs='+', metavar='THRESHOLD',
+                        help="with --monte-carlo, compare event triggered channel filters at these thresholds")
+    parser.add_argument('--metric', choices=NOVELTY_METRICS, default='trace', help="event trigger novelty metric")
+    parser.add_argument('--fusion', choices=MC.FUSION_MODES, default='cf',
+                        help="channel filters on the example tree or covariance intersection on a full mesh")
+    parser.add_argument('--omega', choices=OMEGA_METHODS, default='fast', help="covariance intersection weight")
+    parser.add_argument('--square-root', action='store_true', help="use the square root information filter")
+    parser.add_argument('--sensor', choices=SENSOR_MODELS, default='linear',
+                        help="position sensors or range/bearing sensors with the extended information filter")
+    parser.add_argument('--hiders', type=int, metavar='COUNT', help="track this many random hiders headless instead")
+    parser.add_argument('--seed', type=int, default=None, help="random seed for the sensor noise")
+    parser.add_argument('--render', metavar='PATH', help="write the animation to an .mp4, .gif, or PNG frame directory")
+    parser.add_argument('--frame-step', type=int, default=1, help="animate only every FRAME_STEP step")
+    parser.add_argument('--stats', metavar='PATH', help="time the main loop phases and write the stats table to CSV")
+    parser.add_argument('--trace', metavar='PATH', help="time the main loop phases and write a Chrome trace JSON")
+    parser.add_argument('--cprofile', type=int, nargs=2, metavar=('FIRST', 'LAST'),
+                        help="run cProfile over this range of steps")
+    parser.add_argument('--tracemalloc', type=int, nargs=2, metavar=('FIRST', 'LAST'),
+                        help="trace memory allocations over this range of steps")
+    args = parser.parse_args()
+    if args.sensor == 'range-bearing' and args.square_root:
+        parser.error("--square-root is not available with --sensor range-bearing, the extended information filter has "
+                     "no square root form")
+    if args.hiders and (args.fusion != 'cf' or args.square_root or args.sensor != 'linear'):
+        parser.error("--hiders runs the multi-target channel filter with linear sensors only, it cannot be combined "
+                     "with --fusion ci, --square-root or --sensor range-bearing")
+
+    if args.monte_carlo and args.event_trigger:
+        run_trigger_study(args.monte_carlo, args.event_trigger, args.metric, args.seed)
+    elif args.monte_carlo:
+        run_monte_carlo(args.monte_carlo, args.seed, args.fusion, args.omega)
+    elif args.hiders:
+        run_multi_target(args.hiders, args.seed, args.event_trigger[0] if args.event_trigger else None, args.metric)
+    else:
+        if args.render:
+            render.use_headless_backend()
+
+        sessions = list()
+        if args.cprofile:
+            sessions.append(ProfileSession(*args.cprofile))
+        if args.tracemalloc:
+            sessions.append(ProfileSession(*args.tracemalloc, use_cprofile=False, use_tracemalloc=True))
+
+        if args.stats or args.trace or sessions:
+            instrumentation = Instrumentation(bool(args.stats or args.trace), sessions)
+        else:
+            instrumentation = DISABLED
+
+        main(args.seed, args.render, args.frame_step, args.fusion, args.omega, args.square_root, instrumentation,
+             args.sensor)
+
+        if instrumentation.enabled:
+            instrumentation.print_stats()
+        if args.stats:
+            instrumentation.save_stats(args.stats)
+        if args.trace:
+            instrumentation.save_chrome_trace(args.trace)
+        for session in sessions:
+            session.print_summary()
@@ -0,0 +1,191 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import csv
+import itertools
+
+import numpy as np
+
+import monte_carlo as MC
+from static_linear_program import DEFAULT_SEEKER_POSE_FILES, setup
+from topology import CommunicationGraph
+
+# communication lines between the five networked seekers, as seeker index pairs
+TOPOLOGIES = {
+    'example': [(1, 2), (2, 3), (3, 4)],
+    'chain': [(0, 1), (1, 2), (2, 3), (3, 4)],
+    'star': [(2, 0), (2, 1), (2, 3), (2, 4)],
+    'ring': [(0, 1), (1, 2), (2, 3), (3, 4), (4, 0)],
+    'mesh': [(i, j) for i in range(0, 5) for j in range(i + 1, 5)],
+    'none': [],
+}
+
+RESULT_FIELDS = [
+    ('index', int),
+    ('r1', float),
+    ('r2', float),
+    ('topology', 'U16'),
+    ('fusion', 'U4'),
+    ('tf', int),
+    ('trials', int),
+    ('poses', 'U128'),
+    ('rmse_mean', float),
+    ('rmse_max', float),
+    ('nees_mean', float),
+    ('nis_mean', float),
+    ('nees_lower', float),
+    ('nees_upper', float),
+    ('nees_consistent', bool),
+]
+
+
+class Scenario:
+    """
+    data object to hold the parameters of a single static linear scenario in a sweep
+    """
+    def __init__(self, r1: float, r2: float, topology: str, tf: int, trials=100,
+                 seeker_pose_files=DEFAULT_SEEKER_POSE_FILES, hider_pose_file='pose_30_0.txt', index=0, fusion='cf'):
+        self.r1 = r1
+        self.r2 = r2
+        self.topology = topology
+        self.fusion = fusion
+        self.tf = tf
+        self.trials = trials
+        self.seeker_pose_files = tuple(seeker_pose_files)
+        self.hider_pose_file = hider_pose_file
+        self.index = index
+
+
+def get_default_fusion(topology: str):
+    """
+    channel filters double count information around cycles, so loopy topologies default to covariance intersection
+    :param topology: name of a communication topology from TOPOLOGIES
+    :return: 'ci' if the topology has cycles, 'cf' otherwise
+    """
+    graph = CommunicationGraph.create_from_pairs(TOPOLOGIES[topology], 5)
+    return 'ci' if graph.has_cycles() else 'cf'
+
+
+def create_scenario_grid(r1_values: list, r2_values: list, topologies: list, horizons: list, trials=100,
+                         pose_sets=(DEFAULT_SEEKER_POSE_FILES,), fusions=None):
+    """
+    creates every combination of the given parameters
+    :param r1_values: measurement noise variances for seeker 1
+    :param r2_values: measurement noise variances for the remaining seekers
+    :param topologies: names of communication topologies from TOPOLOGIES
+    :param horizons: final times
+    :param trials: Monte Carlo trials per scenario
+    :param pose_sets: tuples of seeker pose file names
+    :param fusions: fusion modes from monte_carlo.FUSION_MODES, or None for get_default_fusion of every topology
+    :return: list of Scenario objects
+    """
+    scenarios = list()
+    grid = itertools.product(r1_values, r2_values, topologies)
+    for r1, r2, topology in grid:
+        topology_fusions = (get_default_fusion(topology),) if fusions is None else fusions
+        for fusion, tf, poses in itertools.product(topology_fusions, horizons, pose_sets):
+            scenarios.append(Scenario(r1, r2, topology, tf, trials, poses, index=len(scenarios), fusion=fusion))
+
+    return scenarios
+
+
+def run_scenario(scenario: Scenario, seed_sequence: np.random.SeedSequence):
+    """
+    runs the Monte Carlo trials of one scenario and summarizes them, executed inside the worker processes
+    :param scenario: Scenario object
+    :param seed_sequence: independent seed sequence for this scenario
+    :return: tuple with one value per RESULT_FIELDS entry
+    """
+    dt = 1
+    steps = scenario.tf + 1
+
+    workspace, state_space = setup(dt, None, scenario.r1, scenario.r2, scenario.seeker_pose_files,
+                                   scenario.hider_pose_file)
+    seeker_list = workspace.robots[0:5]
+    hider = workspace.robots[6]
+
+    x0 = hider.return_ground_truth().return_data_array()
+    R_stack = np.stack([robot.R for robot in seeker_list]).astype(float)
+    rng = np.random.default_rng(seed_sequence)
+
+    results = MC.run_trials(state_space, x0, R_stack, TOPOLOGIES[scenario.topology], steps, scenario.trials, rng,
+                            fusion=scenario.fusion)
+
+    rmse = results.get_rmse()[-1]
+    nees = results.get_average_nees()[-1]
+    nis = results.get_average_nis()[-1]
+    nees_lower, nees_upper = results.get_nees_bounds()
+
+    return (
+        scenario.index,
+        scenario.r1,
+        scenario.r2,
+        scenario.topology,
+        scenario.fusion,
+        scenario.tf,
+        scenario.trials,
+        ';'.join(scenario.seeker_pose_files),
+        np.mean(rmse),
+        np.max(rmse),
+        np.mean(nees),
+        np.mean(nis),
+        nees_lower,
+        nees_upper,
+        bool(np.all((nees > nees_lower) & (nees < nees_upper))),
+    )
+
+
+def run_sweep(scenarios: list, max_workers=None, seed=None):
+    """
+    spreads the scenarios over a process pool. Every scenario gets its own child of one SeedSequence, so the results
+    do not depend on the number of workers or the order they finish in
+    :param scenarios: list of Scenario objects
+    :param max_workers: number of worker processes, defaults to the number of processors
+    :param seed: root seed of the sweep
+    :return: numpy structured array with one row per scenario and the columns in RESULT_FIELDS
+    """
+    seed_sequences = np.random.SeedSequence(seed).spawn(len(scenarios))
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        rows = list(executor.map(run_scenario, scenarios, seed_sequences))
+
+    return np.array(rows, dtype=RESULT_FIELDS)
+
+
+def save_results(results: np.ndarray, filename: str):
+    """
+    writes a sweep result table to a CSV file
+    :param results: numpy structured array from run_sweep
+    :param filename: path of the CSV file
+    :return: none
+    """
+    with open(filename, 'w', newline='', encoding='utf8') as fout:
+        writer = csv.writer(fout)
+        writer.writerow(results.dtype.names)
+        writer.writerows(results.tolist())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="sweep the static linear example over noise, topology and horizon")
+    parser.add_argument('--r1', type=float, nargs='+', default=[125, 250, 500])
+    parser.add_argument('--r2', type=float, nargs='+', default=[250, 500, 1000])
+    parser.add_argument('--topology', nargs='+', default=list(TOPOLOGIES.keys()), choices=list(TOPOLOGIES.keys()))
+    parser.add_argument('--fusion', nargs='+', default=None, choices=MC.FUSION_MODES,
+                        help="defaults to channel filters on acyclic topologies and covariance intersection on ring "
+                             "and mesh, channel filters are only consistent without cycles")
+    parser.add_argument('--tf', type=int, nargs='+', default=[10, 50])
+    parser.add_argument('--trials', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--output', default='sweep_results.csv')
+    args = parser.parse_args()
+
+    scenarios = create_scenario_grid(args.r1, args.r2, args.topology, args.tf, args.trials, fusions=args.fusion)
+    results = run_sweep(scenarios, args.workers, args.seed)
+    save_results(results, args.output)
+
+    print("{} scenarios written to {}".format(len(results), args.output))
+    print("{} of them have consistent NEES".format(np.count_nonzero(results['nees_consistent'])))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,120 @@
+import numpy as np
+from scipy import signal
+
 from data_objects import GroundTruth
 from estimation_tools import DiscreteLinearStateSpace
 
+TRAJECTORY_METHODS = ('auto', 'eigen', 'scan')
+
+# eigenvector matrices worse conditioned than this are treated as defective
+EIGEN_CONDITION_LIMIT = 1e8
+
+# steps generated at a time when streaming the ground truth
+CHUNK_STEPS = 4096
+
+
+def get_ground_truth(state_space: DiscreteLinearStateSpace, state: GroundTruth, steps: int, rng=None):
+    """
+    :param state_space: target state space
+    :param state: GroundTruth at the first step
+    :param steps: number of steps after the first one
+    :param rng: numpy random Generator for process noise drawn from Q, or None for a noise free trajectory
+    :return: list of GroundTruth objects
+    """
+    trajectory = generate_trajectory(state_space, state.return_data_array()[:, 0], steps, rng)
+    return [GroundTruth.create_from_array(state.step + k, x.reshape((-1, 1))) for k, x in enumerate(trajectory)]
+
+
+def generate_ground_truth(state_space: DiscreteLinearStateSpace, state: GroundTruth, steps=None, rng=None):
+    """
+    streams the ground truth one step at a time. The states are generated in chunks of CHUNK_STEPS by
+    generate_trajectory, so only the current chunk is held in memory
+    :param state_space: target state space
+    :param state: GroundTruth at the first step, yielded first
+    :param steps: number of steps after the first one, or None to never stop
+    :param rng: numpy random Generator for process noise drawn from Q, or None for a noise free trajectory
+    :return: generator of GroundTruth objects
+    """
+    yield state
+    x_0 = state.return_data_array()[:, 0]
+    step = state.step
+    while steps is None or step - state.step < steps:
+        chunk_steps = CHUNK_STEPS if steps is None else min(CHUNK_STEPS, steps - (step - state.step))
+        trajectory = generate_trajectory(state_space, x_0, chunk_steps, rng)
+        for x_1 in trajectory[1:]:
+            step += 1
+            yield GroundTruth.create_from_array(step, x_1.reshape((-1, 1)))
+        x_0 = trajectory[-1]
+
+
+def generate_trajectory(state_space: DiscreteLinearStateSpace, x_0: np.ndarray, steps: int, rng=None, method='auto'):
+    """
+    whole trajectories of x_k+1 = F x_k + w_k as one array, for any number of targets or trials at once
+    :param state_space: target state space, F is time invariant
+    :param x_0: (..., n) array of initial states, leading dimensions are independent targets or trials
+    :param steps: number of steps after the initial state
+    :param rng: numpy random Generator for process noise w_k ~ N(0, Q) drawn in one batch, or None for no noise
+    :param method: 'eigen' for the closed form in the eigenbasis of F, 'scan' for a doubling scan that also works for
+        defective F, or 'auto' to use the eigenbasis when it is well conditioned
+    :return: (..., steps + 1, n) array of states, starting with x_0
+    """
+    if method not in TRAJECTORY_METHODS:
+        raise ValueError("method must be one of {}".format(TRAJECTORY_METHODS))
 
-def get_ground_truth(state_space: DiscreteLinearStateSpace, state: GroundTruth, steps: int):
-    x_0 = state.return_data_array()
     F = state_space.F
+    n = np.size(F, 0)
+    x_0 = np.asarray(x_0, dtype=float)
+
+    # the driving sequence s_0 = x_0, s_k = w_k-1 turns the trajectory into x_k = sum_j F^(k - j) s_j
+    drive = np.zeros(np.shape(x_0)[:-1] + (steps + 1, n))
+    drive[..., 0, :] = x_0
+    if rng is not None:
+        drive[..., 1:, :] = rng.standard_normal(np.shape(drive[..., 1:, :])) @ state_space.get_Q_sqrt().T
+
+    if method != 'scan':
+        eigenvalues, V = np.linalg.eig(F)
+        if method == 'eigen' or np.linalg.cond(V) < EIGEN_CONDITION_LIMIT:
+            return run_eigen(eigenvalues, V, drive, rng is None)
+
+    return run_scan(F, drive)
+
+
+def run_eigen(eigenvalues: np.ndarray, V: np.ndarray, drive: np.ndarray, noise_free: bool):
+    """
+    trajectory in the eigenbasis of F = V diag(eigenvalues) V^-1, where every mode is a scalar recurrence
+    :param eigenvalues: (n,) array of eigenvalues
+    :param V: n x n array of eigenvectors
+    :param drive: (..., T, n) driving sequence, the initial state followed by the process noise
+    :param noise_free: True if only the initial state is nonzero, which allows the closed form eigenvalue powers
+    :return: (..., T, n) array of states
+    """
+    modes = drive @ np.linalg.inv(V).T
+    if noise_free:
+        # closed form, c_k = eigenvalue^k c_0
+        powers = eigenvalues[np.newaxis, :] ** np.arange(0, np.size(drive, -2))[:, np.newaxis]
+        modes = powers * modes[..., 0:1, :]
+    else:
+        # c_k = eigenvalue c_k-1 + s_k, a first order IIR filter along the time axis of every mode
+        modes = np.stack([signal.lfilter([1], [1, -eigenvalue], modes[..., i], axis=-1)
+                          for i, eigenvalue in enumerate(eigenvalues)], axis=-1)
+
+    trajectory = modes @ V.T
+    return np.real(trajectory) if np.isrealobj(drive) else trajectory
 
-    ground_truth_list = [state]
-    for step in range(0, steps):
-        x_1 = F @ x_0
-        ground_truth_list.append(GroundTruth.create_from_array(step + 1, x_1))
-        x_0 = x_1
 
-    return ground_truth_list
+def run_scan(F: np.ndarray, drive: np.ndarray):
+    """
+    inclusive doubling scan of x_k = F x_k-1 + s_k, log2(T) batched passes that need no eigen decomposition
+    :param F: n x n dynamics matrix
+    :param drive: (..., T, n) driving sequence, the initial state followed by the process noise
+    :return: (..., T, n) array of states
+    """
+    trajectory = drive.copy()
+    F_power = F
+    offset = 1
+    while offset < np.size(drive, -2):
+        # after this pass every state includes the contributions of the 2 * offset steps before it
+        trajectory[..., offset:, :] = trajectory[..., offset:, :] + trajectory[..., :-offset, :] @ F_power.T
+        F_power = F_power @ F_power
+        offset *= 2
+    return trajectory
@@ -0,0 +1,36 @@
+import numpy as np
+
+from async_runtime import AsyncRuntime, LinkSettings
+from estimation_tools import NoiseGenerator
+import static_linear_program as SLP
+
+
+def create_network(steps: int):
+    workspace, state_space = SLP.setup(1)
+    seeker_list = workspace.robots[0:5]
+    hider = workspace.robots[6]
+    for i, seeker in enumerate(seeker_list):
+        seeker.noise_generator = NoiseGenerator(seeker.R, np.random.default_rng(i))
+    SLP.create_channel_filters(SLP.get_comm_lines(seeker_list), hider)
+    hider.truth_model = SLP.build_truth_model(state_space, hider.return_ground_truth(), steps, steps + 1)
+    return seeker_list, hider
+
+
+def test_matches_synchronous_loop():
+    steps = 150
+    seeker_list, hider = create_network(steps)
+    for _ in range(0, steps):
+        for seeker in seeker_list:
+            seeker.run_filter(hider)
+            seeker.send_update()
+        for seeker in seeker_list:
+            seeker.receive_update()
+            seeker.fuse_data()
+    expected = [seeker.information_history[-1].get_state_estimate().return_data_array() for seeker in seeker_list]
+
+    # runs longer than the default truth window, the unlinked seeker gets far ahead of the others
+    seeker_list, hider = create_network(steps)
+    AsyncRuntime(seeker_list, hider, LinkSettings(0.0, 0.0), np.random.default_rng(0)).run(steps)
+    for seeker, state in zip(seeker_list, expected):
+        assert seeker.information_history[-1].step == steps
+        assert np.allclose(seeker.information_history[-1].get_state_estimate().return_data_array(), state)
@@ -0,0 +1,60 @@
+import numpy as np
+from scipy import linalg
+
+from batch_information_filter import BatchInformationFilter, cho_solve, time_update
+from data_objects import InformationEstimate, Measurement
+from estimation_tools import DiscreteLinearStateSpace
+import information_filter as IF
+
+
+def create_state_space(n: int, rng):
+    F = np.eye(n) + 0.1 * rng.standard_normal((n, n))
+    Q = np.diag(rng.uniform(0.01, 0.1, n))
+    return DiscreteLinearStateSpace(F, np.zeros((n, n)), np.eye(n), np.zeros((n, n)), Q, None, 1)
+
+
+def create_information(rng, shape: tuple, n: int):
+    A = rng.standard_normal(shape + (n, n))
+    return rng.standard_normal(shape + (n, 1)), A @ np.swapaxes(A, -1, -2) + n * np.eye(n)
+
+
+def test_cho_solve_matches_scipy():
+    rng = np.random.default_rng(0)
+    _, A = create_information(rng, (4, 3), 5)
+    B = rng.standard_normal((4, 3, 5, 2))
+    X = cho_solve(np.linalg.cholesky(A), B)
+    for index in np.ndindex(4, 3):
+        assert np.allclose(X[index], linalg.cho_solve(linalg.cho_factor(A[index], lower=True), B[index]))
+
+
+def test_time_update_matches_scalar_filter():
+    rng = np.random.default_rng(1)
+    state_space = create_state_space(4, rng)
+    y, Y = create_information(rng, (6,), 4)
+
+    y_m, Y_m = time_update(state_space, y, Y)
+    for i in range(0, 6):
+        y_expected, Y_expected = IF.time_update(state_space, y[i], Y[i])
+        assert np.allclose(y_m[i], y_expected)
+        assert np.allclose(Y_m[i], Y_expected)
+
+
+def test_run_matches_scalar_filter():
+    rng = np.random.default_rng(2)
+    state_space = create_state_space(3, rng)
+    R_stack = np.stack([np.diag(rng.uniform(1, 10, 3)) for _ in range(0, 5)])
+    y, Y = create_information(rng, (5,), 3)
+
+    batch_filter = BatchInformationFilter(state_space, R_stack, y.copy(), Y.copy())
+    estimates = [InformationEstimate.create_from_array(0, y[i], Y[i]) for i in range(0, 5)]
+    for k in range(1, 8):
+        z_stack = rng.standard_normal((5, 3, 1))
+        visible = rng.random(5) > 0.3
+        batch_filter.run(z_stack, visible)
+        for i in range(0, 5):
+            z = z_stack[i] if visible[i] else np.full((3, 1), np.nan)
+            estimates[i] = IF.run(state_space, estimates[i], Measurement.create_from_array(k, z), R_stack[i])
+
+    for i, estimate in enumerate(estimates):
+        assert np.allclose(batch_filter.y[i], estimate.return_data_array())
+        assert np.allclose(batch_filter.Y[i], estimate.return_information_matrix())
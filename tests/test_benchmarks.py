@@ -0,0 +1,46 @@
+import json
+
+import numpy as np
+
+import benchmarks
+from benchmarks import BenchmarkResult
+
+
+def create_results(name: str, values: list, times: list):
+    return [BenchmarkResult(name, 'state_dimension', value, time, time, 1, 3) for value, time in zip(values, times)]
+
+
+def test_compare_flags_slow_downs_past_tolerance(capsys):
+    baseline = create_results('filter', [2, 4, 8], [1e-3, 1e-3, 1e-3]) + create_results('bank', [1], [1e-3])
+    results = create_results('filter', [2, 4, 8, 16], [1.2e-3, 1.3e-3, 0.5e-3, 9e-3])
+    results += create_results('bank', [1], [2e-3])
+
+    regressions = benchmarks.compare_results(results, baseline, tolerance=0.25)
+    assert [(name, value) for name, value, _ in regressions] == [('filter', 4), ('bank', 1)]
+    assert np.allclose([ratio for _, _, ratio in regressions], [1.3, 2.0])
+
+    # benchmarks missing from the baseline are left out of the table
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 1 + 4
+    assert sum('REGRESSION' in line for line in lines) == 2
+
+
+def test_saved_results_round_trip(tmp_path):
+    results = create_results('filter', [2, 4, 8], [1e-6, 8e-6, 64e-6])
+    filename = str(tmp_path / 'benchmarks.json')
+    benchmarks.save_results(results, benchmarks.get_metadata(3, 0, 'quick'), filename)
+
+    loaded = benchmarks.load_results(filename)
+    assert [result.return_dict() for result in loaded] == [result.return_dict() for result in results]
+    assert benchmarks.compare_results(loaded, results) == []
+
+    with open(filename, encoding='utf8') as fin:
+        report = json.load(fin)
+    assert report['metadata']['sweep'] == 'quick'
+    assert np.isclose(report['scaling_exponents']['filter'], 3.0)
+
+
+def test_time_function():
+    best, median, number = benchmarks.time_function(lambda: sum(range(100)), repeat=3, number=10)
+    assert number == 10
+    assert 0 < best <= median
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+import batch_information_filter as BIF
+from channel_filter import ChannelFilterBank
+import static_linear_program as SLP
+from topology import CommunicationGraph
+
+
+def get_local_updates(seeker_list: list, state_space, y: np.ndarray, Y: np.ndarray):
+    # the local filter step of every seeker from the given information, with the measurements the seekers recorded
+    y_m, Y_m = BIF.time_update(state_space, y, Y)
+    z_stack = np.stack([seeker.measurement_history[-1].return_data_array() for seeker in seeker_list])
+    R_stack = np.stack([seeker.R for seeker in seeker_list])
+    return BIF.measurement_update(state_space, y_m, Y_m, z_stack, R_stack)
+
+
+@pytest.mark.parametrize('threshold', [None, 0.2])
+def test_bank_matches_channel_filters(threshold):
+    workspace, state_space = SLP.setup(1, np.random.default_rng(4))
+    seeker_list = workspace.robots[0:5]
+    hider = workspace.robots[6]
+    hider.truth_model = SLP.build_truth_model(state_space, hider.return_ground_truth(), 12)
+
+    # a tree with a branch, run once by per link ChannelFilter objects and once by the bank
+    pairs = [(0, 1), (1, 2), (1, 3), (3, 4)]
+    SLP.create_channel_filters([(seeker_list[i], seeker_list[j]) for i, j in pairs], hider, threshold)
+    bank = ChannelFilterBank(CommunicationGraph.create_from_pairs(pairs, 5), state_space, threshold=threshold)
+
+    y = np.stack([seeker.information_history[-1].return_data_array() for seeker in seeker_list])
+    Y = np.stack([seeker.information_history[-1].return_information_matrix() for seeker in seeker_list])
+    for _ in range(0, 12):
+        for seeker in seeker_list:
+            seeker.run_filter(hider)
+            seeker.send_update()
+        for seeker in seeker_list:
+            seeker.receive_update()
+            seeker.fuse_data()
+
+        y_local, Y_local = get_local_updates(seeker_list, state_space, y, Y)
+        bank.update_and_send(y_local, Y_local)
+        bank.receive_and_update()
+        y, Y = bank.fuse(y_local, Y_local)
+
+        for i, seeker in enumerate(seeker_list):
+            assert np.allclose(seeker.information_history[-1].return_data_array(), y[i])
+            assert np.allclose(seeker.information_history[-1].return_information_matrix(), Y[i])
+
+    messages_sent = sum(cf.messages_sent for seeker in seeker_list for cf in seeker.channel_filter_dict.values())
+    assert bank.messages_sent == messages_sent
+    if threshold is not None:
+        assert bank.messages_skipped > 0
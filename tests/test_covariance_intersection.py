@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+import covariance_intersection as CI
+from topology import CommunicationGraph
+
+
+def create_information(rng, shape: tuple, n: int):
+    A = rng.standard_normal(shape + (n, n))
+    return rng.standard_normal(shape + (n, 1)), A @ np.swapaxes(A, -1, -2) + np.eye(n)
+
+
+@pytest.mark.parametrize('method', CI.OMEGA_METHODS)
+def test_fuse_graph_matches_sequential_fusion(method):
+    rng = np.random.default_rng(0)
+    graph = CommunicationGraph.create_from_pairs([(0, 1), (1, 2), (2, 3), (3, 0), (0, 2), (4, 1)], 6)
+    y_local, Y_local = create_information(rng, (3, 6), 2)
+
+    y, Y = CI.fuse_graph(graph, y_local, Y_local, method)
+    for i in range(0, 6):
+        y_expected, Y_expected = y_local[:, i], Y_local[:, i]
+        for j in graph.get_neighbors(i):
+            y_expected, Y_expected = CI.fuse(y_expected, Y_expected, y_local[:, j], Y_local[:, j], method)
+        assert np.allclose(y[:, i], y_expected)
+        assert np.allclose(Y[:, i], Y_expected)
+
+
+def test_optimal_omega_maximizes_determinant():
+    rng = np.random.default_rng(1)
+    _, Y_a = create_information(rng, (20,), 3)
+    _, Y_b = create_information(rng, (20,), 3)
+
+    # the search stops at a bracket of width 1e-4, so the maximum is only matched to that accuracy
+    omega = CI.get_optimal_omega(Y_a, Y_b)[:, np.newaxis, np.newaxis]
+
+    best = np.linalg.slogdet(omega * Y_a + (1 - omega) * Y_b)[1]
+    for candidate in np.linspace(0, 1, 101):
+        assert np.all(best >= np.linalg.slogdet(candidate * Y_a + (1 - candidate) * Y_b)[1] - 1e-4)
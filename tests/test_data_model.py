@@ -0,0 +1,127 @@
+import numpy as np
+import pytest
+
+from batch_information_filter import BatchInformationFilter
+import data_objects
+from data_model import (BlockInformationHistory, InformationHistory, MeasurementHistory, StepSeries,
+                        StreamingTruthModel, TruthModel)
+from data_objects import GroundTruth, InformationEstimate, Measurement
+from estimation_tools import DiscreteLinearStateSpace
+
+
+def test_information_history_returns_copies():
+    history = InformationHistory(2, capacity=2, ring_buffer=True)
+    history.append(InformationEstimate.create_from_array(0, np.array([1.0, 2.0]), np.eye(2)))
+    first = history[-1]
+
+    # overwriting the record and wrapping the ring buffer around leave the earlier estimate as it was
+    history.update_last(np.array([5.0, 6.0]), 2 * np.eye(2))
+    history.append(InformationEstimate.create_from_array(1, np.array([3.0, 4.0]), 3 * np.eye(2)))
+    history.append(InformationEstimate.create_from_array(2, np.array([7.0, 8.0]), 4 * np.eye(2)))
+
+    assert np.array_equal(first.return_data_array(), [[1.0], [2.0]])
+    assert np.array_equal(first.return_information_matrix(), np.eye(2))
+    assert np.array_equal(history[0].return_data_array(), [[3.0], [4.0]])
+    assert np.array_equal(history[-1].return_information_matrix(), 4 * np.eye(2))
+
+
+def test_measurement_history_returns_copies():
+    history = MeasurementHistory(2, capacity=1, ring_buffer=True)
+    history.append(Measurement.create_from_array(0, np.array([1.0, 2.0])))
+    first = history[-1]
+    history.append(Measurement.create_from_array(1, np.array([3.0, 4.0])))
+
+    assert np.array_equal(first.return_data_array(), [[1.0], [2.0]])
+    assert np.array_equal(history[-1].return_data_array(), [[3.0], [4.0]])
+
+
+def test_cached_state_estimate_follows_history(monkeypatch):
+    solves = list()
+    cho_factor = data_objects.linalg.cho_factor
+
+    def counting_cho_factor(*args, **kwargs):
+        solves.append(1)
+        return cho_factor(*args, **kwargs)
+
+    monkeypatch.setattr(data_objects.linalg, 'cho_factor', counting_cho_factor)
+    history = InformationHistory(2, capacity=2, ring_buffer=True)
+    history.append(InformationEstimate.create_from_array(0, np.array([1.0, 2.0]), np.eye(2)))
+    assert np.allclose(history.get_state_estimate().return_data_array(), [[1.0], [2.0]])
+    assert history.get_state_estimate() is history.get_state_estimate(0)
+    assert len(solves) == 1
+
+    history.update_last(np.array([4.0, 4.0]), 2 * np.eye(2))
+    assert np.allclose(history.get_state_estimate().return_data_array(), [[2.0], [2.0]])
+    assert np.allclose(history.get_state_estimate().covariance, np.eye(2) / 2)
+    assert len(solves) == 2
+
+    # the ring buffer overwrites step 0, a new record with the same step is solved again
+    history.append(InformationEstimate.create_from_array(1, np.array([1.0, 1.0]), np.eye(2)))
+    history.append(InformationEstimate.create_from_array(0, np.array([3.0, 3.0]), np.eye(2)))
+    assert np.allclose(history.get_state_estimate().return_data_array(), [[3.0], [3.0]])
+    assert len(solves) == 3
+
+
+def test_block_estimates_are_copies():
+    history = BlockInformationHistory(3, 2)
+    history.append_blocks(0, np.ones((3, 2, 1)), np.broadcast_to(np.eye(2), (3, 2, 2)))
+    estimate = history.get_estimate(1)
+    state = estimate.get_state_estimate().return_data_array().copy()
+
+    history.update_last(np.zeros((3, 2, 1)), np.broadcast_to(4 * np.eye(2), (3, 2, 2)))
+    assert np.array_equal(estimate.return_information_matrix(), np.eye(2))
+    assert np.allclose(estimate.get_state_estimate().return_data_array(), state)
+    assert np.allclose(history.get_estimate(1).get_state_estimate().covariance, np.eye(2) / 4)
+
+
+def test_batch_estimates_are_copies():
+    state_space = DiscreteLinearStateSpace(np.eye(2), np.zeros((2, 2)), np.eye(2), np.zeros((2, 2)), np.eye(2), None, 1)
+    batch_filter = BatchInformationFilter(state_space, np.broadcast_to(np.eye(2), (2, 2, 2)),
+                                          np.ones((2, 2, 1)), np.broadcast_to(np.eye(2), (2, 2, 2)).copy())
+    estimates = batch_filter.return_information_estimates()
+    batch_filter.y[0] = 0
+    batch_filter.Y[0] = 3 * np.eye(2)
+    assert np.array_equal(estimates[0].return_data_array(), np.ones((2, 1)))
+    assert np.array_equal(estimates[0].return_information_matrix(), np.eye(2))
+
+
+def test_streaming_truth_outlives_window():
+    ground_truth = (GroundTruth.create_from_array(k, np.array([k, -k])) for k in range(0, 100))
+    measurements = (Measurement.create_from_array(k, np.array([2 * k])) for k in range(0, 100))
+    truth_model = StreamingTruthModel(ground_truth, measurements, window=4)
+
+    first = truth_model.get_ground_truth(0)
+    measurement = truth_model.get_true_measurement(0)
+    assert np.array_equal(truth_model.get_ground_truth(10).return_data_array(), [[10], [-10]])
+    assert np.array_equal(first.return_data_array(), [[0], [0]])
+    assert np.array_equal(measurement.return_data_array(), [[0]])
+    with pytest.raises(IndexError):
+        truth_model.get_true_measurement(6)
+
+
+def test_step_series_lookup():
+    measurements = [Measurement.create_from_array(k, np.array([k, 10.0 * k])) for k in range(3, 8)]
+    series = StepSeries.create_from_measurements(measurements)
+
+    assert (series.get_first_step(), series.get_last_step(), len(series)) == (3, 7, 5)
+    assert np.array_equal(series.get_row(5), [5.0, 50.0])
+    assert np.array_equal(series.get_range(4, 6), [[4.0, 40.0], [5.0, 50.0]])
+    assert np.array_equal(series.get_batch([7, 3]), [[7.0, 70.0], [3.0, 30.0]])
+    with pytest.raises(IndexError):
+        series.get_row(8)
+    with pytest.raises(IndexError):
+        series.get_batch([2, 3])
+    with pytest.raises(ValueError):
+        StepSeries.create_from_measurements(measurements[:2] + measurements[3:])
+
+
+def test_truth_model_returns_copies():
+    truth_model = TruthModel(true_measurements=[Measurement.create_from_array(k, np.array([k, -k])) for k in range(3)])
+    measurement = truth_model.get_true_measurement(1)
+    assert (measurement.step, measurement.get_dimension()) == (1, 2)
+
+    measurement.return_data_array()[:] = 0
+    assert np.array_equal(truth_model.get_true_measurement(1).return_data_array(), [[1.0], [-1.0]])
+
+    with pytest.raises(IndexError):
+        TruthModel().get_true_measurement(0)
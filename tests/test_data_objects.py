@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from data_objects import GroundTruth, InformationEstimate, Measurement, StateEstimate
+
+
+def test_components_read_by_name():
+    ground_truth = GroundTruth.create_from_list(3, [1.0, 2.0, 3.0])
+    assert (ground_truth.x_1, ground_truth.x_2, ground_truth.x_3) == (1.0, 2.0, 3.0)
+
+    measurement = Measurement.create_from_dict({'step': '4', 'y_1': '5.5', 'y_2': '-1'})
+    assert (measurement.step, measurement.y_1, measurement.y_2) == (4, 5.5, -1.0)
+
+    estimate = InformationEstimate.create_from_array(0, np.array([7.0, 8.0]), np.eye(2))
+    assert estimate.i_2 == 8.0
+
+    state = StateEstimate.create_from_list(1, [1.0, 2.0], np.diag([4.0, 9.0]))
+    assert (state.x1_2sigma, state.x2_2sigma) == (4.0, 6.0)
+    assert state.get_two_sigma_value('x_2') == 6.0
+
+
+@pytest.mark.parametrize('name', ['x_0', 'x_4', 'y_1', 'x_', 'x_a', 'data_1'])
+def test_unknown_names_raise_attribute_error(name):
+    ground_truth = GroundTruth.create_from_list(0, [1.0, 2.0, 3.0])
+    with pytest.raises(AttributeError):
+        getattr(ground_truth, name)
+    assert not hasattr(ground_truth, name)
+
+
+def test_records_have_no_instance_dict():
+    for record in [GroundTruth.create_from_list(0, [1.0]), Measurement.create_from_list(0, [1.0]),
+                   InformationEstimate.create_from_array(0, np.ones(1), np.eye(1)),
+                   StateEstimate.create_from_list(0, [1.0], np.eye(1))]:
+        assert not hasattr(record, '__dict__')
+        with pytest.raises(AttributeError):
+            record.unknown = 1
@@ -0,0 +1,39 @@
+import numpy as np
+
+import distributed
+from estimation_tools import NoiseGenerator
+import static_linear_program as SLP
+
+
+def test_process_groups_match_synchronous_loop():
+    steps = 11
+    workspace, state_space = SLP.setup(1)
+    seeker_list = workspace.robots[0:5]
+    hider = workspace.robots[6]
+
+    # the seeker specs and the in process seekers draw the same sensor noise
+    seed_sequences = np.random.SeedSequence(5).spawn(5)
+    specs = [distributed.SeekerSpec.create_from_seeker(seeker, seed_sequence)
+             for seeker, seed_sequence in zip(seeker_list, seed_sequences)]
+    for seeker, seed_sequence in zip(seeker_list, seed_sequences):
+        seeker.noise_generator = NoiseGenerator(seeker.R, np.random.default_rng(seed_sequence))
+
+    comm_lines = SLP.get_comm_lines(seeker_list)
+    SLP.create_channel_filters(comm_lines, hider)
+    hider.truth_model = SLP.build_truth_model(state_space, hider.return_ground_truth(), steps)
+    for _ in range(0, steps):
+        for seeker in seeker_list:
+            seeker.run_filter(hider)
+            seeker.send_update()
+        for seeker in seeker_list:
+            seeker.receive_update()
+            seeker.fuse_data()
+
+    results = distributed.run_distributed([specs[0:2], specs[2:3], specs[3:5]],
+                                          [(seeker_i.name, seeker_j.name) for seeker_i, seeker_j in comm_lines],
+                                          state_space, hider.return_ground_truth().return_data_array(), steps)
+    for seeker in seeker_list:
+        history_steps, vectors, matrices = results[seeker.name]
+        assert np.array_equal(history_steps, seeker.information_history.get_steps())
+        assert np.allclose(vectors, seeker.information_history.get_information_vectors())
+        assert np.allclose(matrices, seeker.information_history.get_information_matrices())
@@ -0,0 +1,34 @@
+import numpy as np
+from scipy import linalg
+
+from data_objects import Measurement
+from estimation_tools import get_noisy_measurement, get_noisy_measurements, monte_carlo_sample
+
+
+def test_noisy_measurements_match_single_draws():
+    R = np.array([[4.0, 1.0], [1.0, 2.0]])
+    true_measurements = [Measurement.create_from_array(k, np.array([k, -k])) for k in range(0, 5)]
+
+    noisy_measurements = get_noisy_measurements(R, true_measurements, np.random.default_rng(3))
+    rng = np.random.default_rng(3)
+    for noisy, true in zip(noisy_measurements, true_measurements):
+        assert noisy.step == true.step
+        assert np.allclose(noisy.return_data_array(), get_noisy_measurement(R, true, rng).return_data_array())
+
+
+def test_noisy_measurement_uses_global_random_state():
+    R = np.array([[4.0, 1.0], [1.0, 2.0]])
+    true_measurement = Measurement.create_from_array(0, np.array([1.0, 2.0]))
+
+    np.random.seed(5)
+    expected = true_measurement.return_data_array() + linalg.cholesky(R, lower=True) @ np.random.randn(2, 1)
+    np.random.seed(5)
+    assert np.allclose(get_noisy_measurement(R, true_measurement).return_data_array(), expected)
+
+
+def test_monte_carlo_sample_covariance():
+    R = np.array([[4.0, 1.0], [1.0, 2.0]])
+    samples = monte_carlo_sample(np.array([[1.0], [-1.0]]), R, 50000, np.random.default_rng(0))
+    assert np.shape(samples) == (2, 50000)
+    assert np.allclose(np.mean(samples, axis=1), [1.0, -1.0], atol=0.05)
+    assert np.allclose(np.cov(samples), R, atol=0.1)
@@ -0,0 +1,80 @@
+import csv
+import json
+
+from instrumentation import DISABLED, NULL_PHASE, STATS_FIELDS, Instrumentation, ProfileSession
+
+
+def run_phases(instrumentation: Instrumentation, steps=3):
+    for k in range(0, steps):
+        instrumentation.begin_step(k)
+        with instrumentation.phase('step'):
+            for seeker in ('seeker_1', 'seeker_2'):
+                with instrumentation.phase('filter', seeker):
+                    pass
+            with instrumentation.phase('channel', 'seeker_1', 'seeker_2'):
+                pass
+    instrumentation.finish()
+
+
+def test_stats_group_by_phase_seeker_and_link():
+    instrumentation = Instrumentation()
+    run_phases(instrumentation)
+
+    rows = {(row['phase'], row['seeker'], row['link']): row for row in instrumentation.get_stats()}
+    assert list(rows) == [('filter', 'seeker_1', ''), ('filter', 'seeker_2', ''), ('channel', 'seeker_1', 'seeker_2'),
+                          ('step', '', '')]
+    assert all(row['calls'] == 3 for row in rows.values())
+    for row in rows.values():
+        assert row['max_us'] >= row['mean_us'] and abs(3 * row['mean_us'] - 1e3 * row['total_ms']) < 1e-6
+
+    # the enclosing phase lasts at least as long as the phases nested in it
+    assert rows[('step', '', '')]['total_ms'] >= rows[('filter', 'seeker_1', '')]['total_ms']
+    assert [record.step for record in instrumentation.records if record.name == 'step'] == [0, 1, 2]
+
+
+def test_saved_stats_and_trace(tmp_path):
+    instrumentation = Instrumentation()
+    run_phases(instrumentation, steps=2)
+
+    instrumentation.save_stats(str(tmp_path / 'stats.csv'))
+    with open(str(tmp_path / 'stats.csv'), newline='', encoding='utf8') as fin:
+        reader = csv.DictReader(fin)
+        assert reader.fieldnames == STATS_FIELDS
+        assert [row['calls'] for row in reader] == ['2'] * 4
+
+    instrumentation.save_chrome_trace(str(tmp_path / 'trace.json'))
+    with open(str(tmp_path / 'trace.json'), encoding='utf8') as fin:
+        events = json.load(fin)['traceEvents']
+
+    threads = {event['tid']: event['args']['name'] for event in events if event['ph'] == 'M'}
+    assert threads == {0: 'simulation', 1: 'seeker_1', 2: 'seeker_2'}
+
+    complete = [event for event in events if event['ph'] == 'X']
+    assert len(complete) == len(instrumentation.records) == 8
+    for event in complete:
+        assert set(event) == {'name', 'cat', 'ph', 'ts', 'dur', 'pid', 'tid', 'args'}
+        assert event['ts'] >= 0 and event['dur'] >= 0 and event['tid'] in threads
+    assert 'channel -> seeker_2' in [event['name'] for event in complete]
+
+
+def test_disabled_instrumentation_records_nothing():
+    instrumentation = Instrumentation(enabled=False)
+    assert instrumentation.phase('filter', 'seeker_1') is NULL_PHASE
+    assert DISABLED.phase('step') is NULL_PHASE
+
+    run_phases(instrumentation)
+    assert instrumentation.records == [] and instrumentation.get_stats() == []
+
+
+def test_profile_session_follows_steps():
+    session = ProfileSession(1, 2, use_cprofile=True)
+    instrumentation = Instrumentation(profile_sessions=[session])
+
+    active = list()
+    for k in range(0, 5):
+        instrumentation.begin_step(k)
+        active.append(session.active)
+    instrumentation.finish()
+
+    assert active == [False, True, True, False, False]
+    assert session.profiler is not None and not session.active
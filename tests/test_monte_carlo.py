@@ -0,0 +1,83 @@
+import numpy as np
+from scipy import linalg
+
+from data_objects import InformationEstimate, Measurement
+from estimation_tools import DiscreteLinearStateSpace
+import information_filter as IF
+import monte_carlo as MC
+from system_dynamics import generate_trajectory
+
+
+def create_state_space(dt=1.0):
+    # slowly drifting planar target with both coordinates measured
+    F = np.array([[1.0, 0.1 * dt], [-0.1 * dt, 1.0]])
+    Q = 0.5 * dt * np.eye(2)
+    return DiscreteLinearStateSpace(F, np.zeros((2, 2)), np.eye(2), np.zeros((2, 2)), Q, None, dt)
+
+
+X0 = np.array([[30.0], [0.0]])
+R_STACK = np.stack([np.diag([4.0, 9.0]), np.diag([16.0, 1.0])])
+
+
+def test_batched_trials_match_per_trial_filter():
+    state_space = create_state_space()
+    steps, trials = 6, 3
+    n, _ = state_space.get_dimensions()
+    seekers, m, _ = np.shape(R_STACK)
+    results = MC.run_trials(state_space, X0, R_STACK, [], steps, trials, np.random.default_rng(4))
+
+    # the same measurement noise as the batched run, which draws it first and in one block
+    ground_truth = generate_trajectory(state_space, X0.reshape((1, n)), steps)[0]
+    S_v = np.stack([linalg.cholesky(R, lower=True) for R in R_STACK])
+    noise = S_v @ np.random.default_rng(4).standard_normal((trials, steps, seekers, m, 1))
+
+    for trial in range(0, trials):
+        for i in range(0, seekers):
+            estimate = InformationEstimate.create_from_array(0, np.zeros((n, 1)), np.zeros((n, n)))
+            for k in range(0, steps):
+                prior = estimate
+                z = state_space.H @ ground_truth[k + 1].reshape((n, 1)) + noise[trial, k, i]
+                estimate = IF.run(state_space, prior, Measurement.create_from_array(k + 1, z), R_STACK[i])
+
+                x = linalg.solve(estimate.return_information_matrix(), estimate.return_data_array())
+                error = x - ground_truth[k + 1].reshape((n, 1))
+                assert np.allclose(results.estimates[trial, k, i], x[:, 0])
+                Y = estimate.return_information_matrix()
+                assert np.isclose(results.nees[trial, k, i], (error.T @ Y @ error)[0, 0])
+
+                y_m, Y_m = IF.time_update(state_space, prior.return_data_array(), prior.return_information_matrix())
+                if k == 0:
+                    # the uninformative prior has no innovation covariance
+                    assert np.isnan(results.nis[trial, k, i])
+                    continue
+                P_m = np.linalg.inv(Y_m)
+                innovation = z - state_space.H @ P_m @ y_m
+                S = state_space.H @ P_m @ state_space.H.T + R_STACK[i]
+                assert np.isclose(results.nis[trial, k, i], (innovation.T @ np.linalg.solve(S, innovation))[0, 0])
+
+
+def test_average_nees_inside_chi_square_bounds():
+    state_space = create_state_space()
+    trials = 500
+    results = MC.run_trials(state_space, X0, R_STACK, [(0, 1)], 20, trials, np.random.default_rng(7),
+                            process_noise=True)
+
+    lower, upper = MC.get_chi_square_bounds(trials, 2)
+    assert (lower, upper) == results.get_nees_bounds()
+    average_nees = results.get_average_nees()[-1]
+    assert np.all(average_nees > lower) and np.all(average_nees < upper)
+
+
+def test_trigger_study_trades_bandwidth_for_error():
+    state_space = create_state_space()
+    rows = MC.run_trigger_study(state_space, X0, R_STACK, [(0, 1)], 15, 50, [None, 0.0, 1e6], seed=2)
+    assert [row[0] for row in rows] == [None, 0.0, 1e6]
+
+    (_, always_rate, always_bytes, always_rmse, always_nees), zero, never = rows
+    assert always_rate == 1.0
+    # a zero threshold sends whenever there is any novel information, so it sees the same noise and matches
+    assert np.allclose(zero[1:], (always_rate, always_bytes, always_rmse, always_nees))
+
+    _, never_rate, never_bytes, never_rmse, _ = never
+    assert never_rate < always_rate and never_bytes < always_bytes
+    assert never_rmse > always_rmse
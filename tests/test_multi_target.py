@@ -0,0 +1,103 @@
+import copy
+
+import numpy as np
+import pytest
+
+from batch_information_filter import BatchInformationFilter
+from channel_filter import ChannelFilterBank
+import multi_target as MT
+import static_linear_program as SLP
+from topology import CommunicationGraph
+
+
+def create_network(target_count: int, threshold=None):
+    rng = np.random.default_rng(5)
+    workspace, state_space = SLP.setup(1, rng)
+    seeker_list = workspace.robots[0:5]
+    hiders = MT.create_hiders(target_count, state_space, (0, 50), (-50, 50), rng)
+    for hider in hiders:
+        hider.truth_model = SLP.build_truth_model(state_space, hider.return_ground_truth(), 10)
+
+    for seeker in seeker_list:
+        seeker.track_targets(hiders)
+    comm_lines = SLP.get_comm_lines(seeker_list)
+    for seeker_i, seeker_j in comm_lines:
+        seeker_i.create_multi_target_channel_filter(seeker_j, threshold)
+        seeker_j.create_multi_target_channel_filter(seeker_i, threshold)
+
+    pairs = [(seeker_list.index(seeker_i), seeker_list.index(seeker_j)) for seeker_i, seeker_j in comm_lines]
+    return seeker_list, state_space, CommunicationGraph.create_from_pairs(pairs, len(seeker_list))
+
+
+def test_filter_matches_single_target_filters():
+    rng = np.random.default_rng(0)
+    _, state_space = SLP.setup(1)
+    R_stack = np.stack([np.diag(rng.uniform(100, 500, 2)) for _ in range(0, 4)])
+
+    multi_target_filter = MT.MultiTargetInformationFilter(state_space, R_stack, 6)
+    single_target_filters = [BatchInformationFilter(state_space, R_stack) for _ in range(0, 6)]
+    for _ in range(0, 8):
+        z_stack = rng.normal(0, 20, (4, 6, 2, 1))
+        visible = rng.random((4, 6)) > 0.3
+        multi_target_filter.run(z_stack, visible)
+        for t, batch_filter in enumerate(single_target_filters):
+            batch_filter.run(z_stack[:, t], visible[:, t])
+
+    for t, batch_filter in enumerate(single_target_filters):
+        assert np.allclose(multi_target_filter.y[:, t], batch_filter.y)
+        assert np.allclose(multi_target_filter.Y[:, t], batch_filter.Y)
+
+
+@pytest.mark.parametrize('threshold', [None, 0.2])
+def test_channel_filters_match_bank(threshold):
+    target_count = 7
+    seeker_list, state_space, graph = create_network(target_count, threshold)
+    batch_filter = MT.MultiTargetInformationFilter.create_from_seekers(seeker_list, state_space)
+    bank = ChannelFilterBank(graph, state_space, (target_count,), threshold)
+
+    visible_rng = np.random.default_rng(9)
+    for _ in range(0, 10):
+        batch_filter.run_filters(seeker_list, visible_rng.random((5, target_count)) > 0.3)
+
+        # the bank holds the seekers along the second to last block axis, with the targets leading
+        y_local = np.swapaxes(np.stack([seeker.target_history.get_blocks(-1)[1] for seeker in seeker_list]), 0, 1)
+        Y_local = np.swapaxes(np.stack([seeker.target_history.get_blocks(-1)[2] for seeker in seeker_list]), 0, 1)
+
+        for seeker in seeker_list:
+            seeker.send_update()
+        for seeker in seeker_list:
+            seeker.receive_update()
+            seeker.fuse_target_data()
+
+        bank.update_and_send(y_local, Y_local)
+        bank.receive_and_update()
+        y, Y = bank.fuse(y_local, Y_local)
+        for i, seeker in enumerate(seeker_list):
+            _, y_fused, Y_fused = seeker.target_history.get_blocks(-1)
+            assert np.allclose(y_fused, y[:, i])
+            assert np.allclose(Y_fused, Y[:, i])
+
+
+@pytest.mark.parametrize('sent', [None, [True, False, True, False, False, True, True], [False] * 7])
+def test_message_matches_direct_exchange(sent):
+    seeker_list, state_space, _ = create_network(7, 0.2)
+    batch_filter = MT.MultiTargetInformationFilter.create_from_seekers(seeker_list, state_space)
+    for _ in range(0, 3):
+        batch_filter.run_filters(seeker_list)
+        for seeker in seeker_list:
+            seeker.send_update()
+
+    cf_i = seeker_list[1].channel_filter_dict['seeker_3']
+    cf_j = seeker_list[2].channel_filter_dict['seeker_2']
+    if sent is not None:
+        cf_i.sent = np.array(sent)
+
+    direct = copy.copy(cf_j)
+    direct.receive_novel(cf_i.yi_novel, cf_i.Yi_novel, cf_i.sent)
+    message = cf_i.get_message(3, 1)
+    over_the_wire = copy.copy(cf_j)
+    over_the_wire.receive_message(bytes(message))
+
+    assert np.allclose(over_the_wire.y_ij, direct.y_ij)
+    assert np.allclose(over_the_wire.Y_ij, direct.Y_ij)
+    assert np.array_equal(over_the_wire.yj_novel, direct.yj_novel)
@@ -0,0 +1,66 @@
+import numpy as np
+
+from batch_information_filter import time_update
+from estimation_tools import DiscreteLinearStateSpace
+import nonlinear_sensors as NS
+
+
+def create_sensors(rng, count: int):
+    return rng.uniform(-10, 10, (count, 3)), rng.uniform(-10, 10, (count, 2, 1))
+
+
+def test_jacobian_matches_finite_differences():
+    sensor_poses, positions = create_sensors(np.random.default_rng(0), 6)
+    H = NS.get_jacobian(sensor_poses, positions, 4)
+    assert np.shape(H) == (6, 2, 4)
+    assert np.all(H[..., 2:] == 0)
+
+    step = 1e-6
+    for j in range(0, 2):
+        offset = np.zeros((2, 1))
+        offset[j] = step
+        difference = NS.get_range_bearing(sensor_poses, positions + offset) - \
+            NS.get_range_bearing(sensor_poses, positions - offset)
+        difference[..., 1, :] = NS.wrap_angle(difference[..., 1, :])
+        assert np.allclose(difference[..., 0] / (2 * step), H[..., j], atol=1e-6)
+
+
+def test_invert_range_bearing():
+    sensor_poses, positions = create_sensors(np.random.default_rng(1), 6)
+    z = NS.get_range_bearing(sensor_poses, positions)
+    assert np.all(z[..., 0, 0] >= 0)
+    assert np.all((z[..., 1, 0] >= -np.pi) & (z[..., 1, 0] < np.pi))
+    assert np.allclose(NS.invert_range_bearing(sensor_poses, z), positions)
+
+
+def test_noise_free_update_recovers_position():
+    sensor_poses, positions = create_sensors(np.random.default_rng(2), 5)
+    R_inv = np.linalg.inv(np.broadcast_to(np.diag([4.0, 1e-3]), (5, 2, 2)))
+    z = NS.get_range_bearing(sensor_poses, positions)
+
+    # uninformed seekers linearize about the position their measurement points to
+    y, Y = NS.measurement_update(np.zeros((5, 2, 1)), np.zeros((5, 2, 2)), z, sensor_poses, R_inv)
+    assert np.allclose(np.linalg.solve(Y, y), positions)
+
+    # informed seekers linearize about their prediction, a second update at the truth keeps the estimate there
+    y, Y = NS.measurement_update(y, Y, z, sensor_poses, R_inv)
+    assert np.allclose(np.linalg.solve(Y, y), positions)
+
+
+def test_occluded_seekers_only_predict():
+    rng = np.random.default_rng(3)
+    sensor_poses, positions = create_sensors(rng, 4)
+    state_space = DiscreteLinearStateSpace(np.eye(2), np.zeros((2, 2)), np.eye(2), None, 1e-3 * np.eye(2), None, 1)
+    R_stack = np.broadcast_to(np.diag([4.0, 1e-3]), (4, 2, 2))
+    y_0 = np.zeros((4, 2, 1))
+    Y_0 = np.broadcast_to(np.eye(2), (4, 2, 2))
+
+    batch_filter = NS.BatchExtendedInformationFilter(state_space, R_stack, sensor_poses, y_0, Y_0)
+    visible = np.array([True, False, True, False])
+    batch_filter.run(NS.get_range_bearing(sensor_poses, positions), visible)
+
+    y_m, Y_m = time_update(state_space, y_0, Y_0)
+    assert batch_filter.step == 1
+    assert np.allclose(batch_filter.Y[~visible], Y_m[~visible])
+    assert np.allclose(batch_filter.y[~visible], y_m[~visible])
+    assert np.all(np.linalg.eigvalsh(batch_filter.Y[visible] - Y_m[visible])[..., -1] > 0)
@@ -0,0 +1,58 @@
+from math import sqrt
+import os
+
+from matplotlib import pyplot as plt
+import numpy as np
+import pytest
+
+import render
+from render import Track
+from workspace import Workspace
+
+render.use_headless_backend()
+
+
+def create_tracks(frames=5):
+    steps = np.arange(0, frames, dtype=float)
+    states = np.column_stack([steps, -steps])
+    two_sigma = np.column_stack([1 + steps, 2 + steps])
+    return [Track('seeker_1', 'darkred', states, two_sigma, states + 0.5),
+            Track('hider', 'k', states + 10, two_sigma)]
+
+
+def create_figure(tracks: list):
+    workspace = Workspace('empty', [(-50, -50), (-50, 50), (50, 50), (50, -50)], [])
+    fig, ax = plt.subplots()
+    artists = render.setup_figure(ax, workspace, [], tracks, 'test', ['Map Border', 'Seeker', 'Hider'])
+    return fig, artists
+
+
+def test_draw_frame_moves_artists():
+    tracks = create_tracks()
+    fig, artists = create_figure(tracks)
+
+    updated = render.draw_frame(3, artists, tracks)
+    assert len(updated) == 2 + 2 + 1 + 1
+    assert artists.count_text.get_text() == "Current Step: 4"
+    assert [line.get_xydata().tolist() for line in artists.lines] == [[[3.0, -3.0]], [[13.0, 7.0]]]
+    assert artists.measurements[0].get_xydata().tolist() == [[3.5, -2.5]]
+    assert artists.patches[1].center == (13.0, 7.0)
+    assert np.isclose(artists.patches[0].width, 2 * 4 * sqrt(5.991))
+    assert np.isclose(artists.patches[0].height, 2 * 5 * sqrt(5.991))
+    plt.close(fig)
+
+
+def test_save_animation_frames_and_gif(tmp_path):
+    tracks = create_tracks()
+    fig, artists = create_figure(tracks)
+
+    frame_directory = str(tmp_path / 'frames')
+    render.save_animation(fig, artists, tracks, frame_directory, frame_step=2, dpi=20)
+    assert sorted(os.listdir(frame_directory)) == ['frame_00000.png', 'frame_00002.png', 'frame_00004.png']
+
+    gif = str(tmp_path / 'animation.gif')
+    render.save_animation(fig, artists, tracks, gif, frame_step=2, dpi=20)
+    Image = pytest.importorskip('PIL.Image')
+    with Image.open(gif) as image:
+        assert image.n_frames == 3
+    plt.close(fig)
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from spatial_index import ObstacleIndex, segments_intersect
+
+
+def get_brute_force_hits(index: ObstacleIndex, starts: np.ndarray, ends: np.ndarray):
+    edge_count = np.size(index.edge_starts, 0)
+    return np.array([segments_intersect(np.repeat(start[np.newaxis], edge_count, 0),
+                                        np.repeat(end[np.newaxis], edge_count, 0),
+                                        index.edge_starts, index.edge_ends).any() for start, end in zip(starts, ends)])
+
+
+def create_random_polygons(rng, count: int, spread: float):
+    polygons = []
+    for center in rng.uniform(-spread, spread, (count, 2)):
+        vertex_count = rng.integers(3, 9)
+        angles = np.sort(rng.uniform(0, 2 * np.pi, vertex_count))
+        radii = rng.uniform(1, 8, vertex_count)
+        polygons.append(center + np.c_[radii * np.cos(angles), radii * np.sin(angles)])
+    return polygons
+
+
+@pytest.fixture
+def corner_index():
+    # a small triangle and a square in the far corner, so the grid ends at the square
+    return ObstacleIndex([np.array([[0, 0], [1, 0], [0, 1]]), np.array([[8, 8], [10, 8], [10, 10], [8, 10]])])
+
+
+def test_segments_crossing_far_boundary(corner_index):
+    starts = np.array([[-50, 9], [50, 9], [9, -50], [9, 50], [50, 50]])
+    ends = np.array([[50, 9], [9.5, 9], [9, 50], [9, 9.5], [-50, -50]])
+    assert corner_index.intersects_segments(starts, ends).all()
+
+
+def test_segments_missing_grid(corner_index):
+    starts = np.array([[-50, 20], [20, -50], [11, 11], [-5, -5]])
+    ends = np.array([[50, 20], [20, 50], [30, 30], [-5, -5]])
+    assert not corner_index.intersects_segments(starts, ends).any()
+
+
+@pytest.mark.parametrize('cell_size', [None, 3.0, 50.0])
+def test_segments_match_brute_force(cell_size):
+    rng = np.random.default_rng(4)
+    index = ObstacleIndex(create_random_polygons(rng, 60, 100), cell_size)
+
+    # segments inside, leaving, and passing outside the grid, plus grid aligned and degenerate ones
+    starts = rng.uniform(-150, 150, (400, 2))
+    ends = starts + rng.normal(0, 60, (400, 2))
+    aligned = np.c_[rng.uniform(-150, 150, 40), np.floor(rng.uniform(-150, 150, 40))]
+    starts = np.concatenate([starts, aligned, aligned, starts[:20]])
+    ends = np.concatenate([ends, aligned + [200, 0], aligned[:, ::-1], starts[:20]])
+
+    assert np.array_equal(index.intersects_segments(starts, ends), get_brute_force_hits(index, starts, ends))
+
+
+def test_traversal_visits_every_cell():
+    rng = np.random.default_rng(7)
+    index = ObstacleIndex(create_random_polygons(rng, 20, 50), 4.0)
+    starts = rng.uniform(-80, 80, (200, 2))
+    ends = rng.uniform(-80, 80, (200, 2))
+    segments, cells = index.traverse_segments(starts, ends)
+
+    # dense samples along each segment inside the grid must land in one of its listed cells
+    for k in range(0, 200):
+        samples = starts[k] + np.linspace(0, 1, 2001)[:, np.newaxis] * (ends[k] - starts[k])
+        grid = (samples - index.origin) / index.cell_size
+        inside = np.all((grid >= 0) & (grid <= index.shape), axis=1)
+        assert set(index.get_cells(samples[inside])) <= set(cells[segments == k])
+
+
+def test_points_match_ray_casting():
+    rng = np.random.default_rng(2)
+    polygons = create_random_polygons(rng, 40, 60)
+    index = ObstacleIndex(polygons)
+    points = rng.uniform(-80, 80, (3000, 2))
+
+    expected = np.zeros(3000, dtype=bool)
+    for polygon in polygons:
+        edges = np.roll(polygon, -1, axis=0)
+        straddles = (polygon[:, 1] > points[:, np.newaxis, 1]) != (edges[:, 1] > points[:, np.newaxis, 1])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_cross = polygon[:, 0] + (points[:, np.newaxis, 1] - polygon[:, 1]) * (edges[:, 0] - polygon[:, 0]) / (
+                    edges[:, 1] - polygon[:, 1])
+        expected |= np.sum(straddles & (points[:, np.newaxis, 0] < x_cross), axis=1) % 2 == 1
+
+    assert np.array_equal(index.contains_points(points), expected)
+
+
+def test_empty_index():
+    index = ObstacleIndex([])
+    points = np.array([[0.0, 0.0], [5.0, 5.0]])
+    assert not index.contains_points(points).any()
+    assert not index.intersects_segments(points, points[::-1]).any()
@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+from batch_information_filter import BatchInformationFilter
+from data_objects import InformationEstimate, Measurement
+from estimation_tools import DiscreteLinearStateSpace
+import information_filter as IF
+import square_root_information_filter as SRIF
+import static_linear_program as SLP
+
+
+def create_state_space(rng, n=3, m=2):
+    F = np.eye(n) + 0.1 * rng.standard_normal((n, n))
+    H = rng.standard_normal((m, n))
+    Q = np.diag(rng.uniform(0.01, 0.1, n))
+    return DiscreteLinearStateSpace(F, np.zeros((n, n)), H, np.zeros((n, n)), Q, None, 1)
+
+
+@pytest.mark.parametrize('informed', [False, True])
+def test_run_matches_information_filter(informed):
+    rng = np.random.default_rng(3)
+    state_space = create_state_space(rng)
+    R = np.array([[2.0, 0.5], [0.5, 1.0]])
+    R_inv_sqrt = SRIF.get_inverse_square_root(R)
+
+    # an uninformed filter starts from a singular information matrix
+    Y_0 = np.eye(3) * 0.5 if informed else np.zeros((3, 3))
+    estimate = InformationEstimate.create_from_array(0, rng.standard_normal(3) if informed else np.zeros(3), Y_0)
+    square_root_estimate = SRIF.SquareRootInformationEstimate.create_from_information_estimate(estimate)
+
+    for k in range(1, 15):
+        z = rng.standard_normal((2, 1)) if k % 4 else np.full((2, 1), np.nan)
+        measurement = Measurement.create_from_array(k, z)
+        estimate = IF.run(state_space, estimate, measurement, R)
+        square_root_estimate = SRIF.run(state_space, square_root_estimate, measurement, R_inv_sqrt)
+
+        result = square_root_estimate.return_information_estimate()
+        assert result.step == estimate.step
+        assert np.allclose(result.return_data_array(), estimate.return_data_array())
+        assert np.allclose(result.return_information_matrix(), estimate.return_information_matrix())
+
+
+def test_factor_information_round_trip():
+    rng = np.random.default_rng(4)
+    A = rng.standard_normal((5, 4, 2))
+    Y = A @ np.swapaxes(A, -1, -2)
+    y = Y @ rng.standard_normal((5, 4, 1))
+
+    # rank two information matrices with information vectors in their range
+    S, z = SRIF.factor_information(y, Y)
+    y_round_trip, Y_round_trip = SRIF.return_information(S, z)
+    assert np.allclose(y_round_trip, y)
+    assert np.allclose(Y_round_trip, Y)
+
+
+def test_batched_square_root_matches_information_form():
+    rng = np.random.default_rng(5)
+    state_space = create_state_space(rng)
+    R_stack = np.stack([np.diag(rng.uniform(0.5, 2.0, 2)) for _ in range(0, 4)])
+
+    information_filter = BatchInformationFilter(state_space, R_stack)
+    square_root_filter = BatchInformationFilter(state_space, R_stack, square_root=True)
+    for _ in range(0, 10):
+        z_stack = rng.standard_normal((4, 2, 1))
+        visible = rng.random(4) > 0.3
+        information_filter.run(z_stack, visible)
+        square_root_filter.run(z_stack, visible)
+
+    assert np.allclose(square_root_filter.y, information_filter.y)
+    assert np.allclose(square_root_filter.Y, information_filter.Y)
+
+
+def test_factors_carried_between_steps(monkeypatch):
+    workspace, state_space = SLP.setup(1, np.random.default_rng(6))
+    seeker_list = workspace.robots[0:5]
+    hider = workspace.robots[6]
+    hider.truth_model = SLP.build_truth_model(state_space, hider.return_ground_truth(), 8)
+
+    factored = list()
+    factor_information = SRIF.factor_information
+
+    def count_factorizations(y, Y):
+        factored.append(np.size(y, 0))
+        return factor_information(y, Y)
+
+    monkeypatch.setattr(SRIF, 'factor_information', count_factorizations)
+    batch_filter = BatchInformationFilter.create_from_seekers(seeker_list, state_space, square_root=True)
+    expected = [seeker.information_history[-1] for seeker in seeker_list]
+    for k in range(0, 8):
+        batch_filter.run_filters(seeker_list, hider)
+        if k == 3:
+            # fusion changes the information of one seeker
+            estimate = seeker_list[2].information_history[-1]
+            seeker_list[2].information_history.update_last(2 * estimate.return_data_array(),
+                                                           2 * estimate.return_information_matrix())
+        for i, seeker in enumerate(seeker_list):
+            expected[i] = IF.run(state_space, expected[i], seeker.measurement_history[-1], seeker.R)
+            if k == 3 and i == 2:
+                expected[i] = seeker.information_history[-1]
+
+    # every seeker factored once at the start, and the fused seeker once more
+    assert factored == [5, 1]
+    for seeker, estimate in zip(seeker_list, expected):
+        assert np.allclose(seeker.information_history[-1].return_data_array(), estimate.return_data_array())
+        assert np.allclose(seeker.information_history[-1].return_information_matrix(),
+                           estimate.return_information_matrix())
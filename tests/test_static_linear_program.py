@@ -0,0 +1,24 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+PROGRAM = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static_linear_program.py')
+
+
+def run_program(*arguments):
+    return subprocess.run([sys.executable, PROGRAM] + list(arguments), capture_output=True, text=True, timeout=300)
+
+
+@pytest.mark.parametrize('arguments', [
+    ('--sensor', 'range-bearing', '--square-root'),
+    ('--hiders', '2', '--fusion', 'ci'),
+    ('--hiders', '2', '--square-root'),
+    ('--hiders', '2', '--sensor', 'range-bearing'),
+])
+def test_rejects_incompatible_flags(arguments):
+    result = run_program(*arguments)
+    assert result.returncode == 2
+    assert 'error:' in result.stderr
+    assert 'Traceback' not in result.stderr
@@ -0,0 +1,22 @@
+import sweep
+from topology import CommunicationGraph, create_chain
+
+
+def test_has_cycles():
+    assert not create_chain(5).has_cycles()
+    assert not CommunicationGraph.create_from_pairs([(1, 2), (3, 4)], 5).has_cycles()
+    assert CommunicationGraph.create_from_pairs([(0, 1), (1, 2), (2, 0), (3, 4)], 5).has_cycles()
+
+
+def test_loopy_topologies_default_to_covariance_intersection():
+    scenarios = sweep.create_scenario_grid([250], [500], list(sweep.TOPOLOGIES), [10])
+    fusions = {scenario.topology: scenario.fusion for scenario in scenarios}
+    assert fusions == {'example': 'cf', 'chain': 'cf', 'star': 'cf', 'ring': 'ci', 'mesh': 'ci', 'none': 'cf'}
+    assert [scenario.index for scenario in scenarios] == list(range(0, len(scenarios)))
+
+
+def test_given_fusions_apply_to_every_topology():
+    scenarios = sweep.create_scenario_grid([250], [500], ['ring', 'star'], [10, 50], fusions=('cf', 'ci'))
+    assert [(scenario.topology, scenario.fusion, scenario.tf) for scenario in scenarios] == [
+        ('ring', 'cf', 10), ('ring', 'cf', 50), ('ring', 'ci', 10), ('ring', 'ci', 50),
+        ('star', 'cf', 10), ('star', 'cf', 50), ('star', 'ci', 10), ('star', 'ci', 50)]
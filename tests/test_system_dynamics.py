@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from data_objects import GroundTruth
+from estimation_tools import DiscreteLinearStateSpace
+import system_dynamics
+from system_dynamics import generate_ground_truth, generate_trajectory, get_ground_truth
+
+ANGLE = 0.1
+DYNAMICS = {
+    'rotation': 0.99 * np.array([[np.cos(ANGLE), -np.sin(ANGLE)], [np.sin(ANGLE), np.cos(ANGLE)]]),
+    'defective': np.array([[1.0, 1.0], [0.0, 1.0]]),
+    'random': 0.4 * np.random.default_rng(0).standard_normal((4, 4)),
+    'static': np.eye(2),
+}
+
+
+def create_state_space(F: np.ndarray):
+    n = np.size(F, 0)
+    return DiscreteLinearStateSpace(F, np.zeros((n, n)), np.eye(n), None, 0.01 * np.eye(n), None, 1)
+
+
+def run_loop(F: np.ndarray, x_0: np.ndarray, noise: np.ndarray):
+    trajectory = [x_0]
+    for w in noise:
+        trajectory.append(F @ trajectory[-1] + w)
+    return np.array(trajectory)
+
+
+@pytest.mark.parametrize('method', system_dynamics.TRAJECTORY_METHODS)
+@pytest.mark.parametrize('name', list(DYNAMICS))
+def test_trajectory_matches_loop(name, method):
+    if name == 'defective' and method == 'eigen':
+        pytest.skip("a defective F has no eigenbasis, 'auto' falls back to the scan")
+
+    F = DYNAMICS[name]
+    n = np.size(F, 0)
+    state_space = create_state_space(F)
+    x_0 = np.random.default_rng(1).standard_normal((3, n))
+    steps = 200
+
+    # the process noise is drawn in one batch, so the same generator state reproduces it
+    trajectory = generate_trajectory(state_space, x_0, steps, np.random.default_rng(2), method)
+    noise = np.random.default_rng(2).standard_normal((3, steps, n)) @ state_space.get_Q_sqrt().T
+    expected = np.stack([run_loop(F, x, w) for x, w in zip(x_0, noise)])
+
+    assert np.shape(trajectory) == (3, steps + 1, n)
+    assert np.allclose(trajectory, expected, rtol=1e-8, atol=1e-8 * max(1, np.max(np.abs(expected))))
+
+    noise_free = generate_trajectory(state_space, x_0, steps, method=method)
+    expected = np.stack([run_loop(F, x, np.zeros((steps, n))) for x in x_0])
+    assert np.allclose(noise_free, expected, rtol=1e-8, atol=1e-8 * max(1, np.max(np.abs(expected))))
+
+
+def test_streamed_ground_truth_matches_list(monkeypatch):
+    # small chunks so the stream crosses several of them
+    monkeypatch.setattr(system_dynamics, 'CHUNK_STEPS', 7)
+    state_space = create_state_space(DYNAMICS['rotation'])
+    state = GroundTruth.create_from_array(3, np.array([30.0, 0.0]))
+
+    ground_truth = get_ground_truth(state_space, state, 30)
+    streamed = list(generate_ground_truth(state_space, state, 30))
+    assert [gt.step for gt in streamed] == [gt.step for gt in ground_truth] == list(range(3, 34))
+    for gt, expected in zip(streamed, ground_truth):
+        assert np.allclose(gt.return_data_array(), expected.return_data_array())
+
+
+def test_rejects_unknown_method():
+    with pytest.raises(ValueError):
+        generate_trajectory(create_state_space(np.eye(2)), np.zeros(2), 5, method='loop')
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from topology import (CommunicationGraph, create_chain, create_grid, create_random_spanning_tree, create_star,
+                      create_tree)
+
+
+def test_generated_trees():
+    graphs = [create_chain(9), create_star(9, 4), create_tree(9, 3),
+              create_random_spanning_tree(9, np.random.default_rng(1))]
+    for graph in graphs:
+        assert graph.is_tree()
+        assert not graph.has_cycles()
+        assert graph.get_edge_count() == 16
+
+    grid = create_grid(3, 3)
+    assert grid.is_connected()
+    assert not grid.is_tree()
+    assert grid.has_cycles()
+
+
+def test_edges_in_csr_order_with_reverse():
+    graph = create_random_spanning_tree(30, np.random.default_rng(2))
+    for i in range(0, 30):
+        edges = np.arange(graph.indptr[i], graph.indptr[i + 1])
+        assert np.all(graph.sources[edges] == i)
+        assert set(graph.get_neighbors(i)) == {j for pair in graph.return_pairs() for j in pair if i in pair} - {i}
+
+    assert np.array_equal(graph.sources[graph.reverse], graph.targets)
+    assert np.array_equal(graph.targets[graph.reverse], graph.sources)
+
+
+def test_pairs_drop_repeated_links():
+    graph = CommunicationGraph.create_from_pairs([(0, 1), (1, 2), (1, 0), (0, 1), (2, 1)])
+    assert graph.return_pairs() == [(0, 1), (1, 2)]
+    assert graph.get_edge_count() == 4
+    assert graph.is_tree()
+
+
+def test_pairs_reject_self_links():
+    with pytest.raises(ValueError):
+        CommunicationGraph.create_from_pairs([(0, 1), (2, 2)])
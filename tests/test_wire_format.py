@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+import wire_format
+
+
+def create_novel_information(rng, shape: tuple, n: int):
+    A = rng.standard_normal(shape + (n, n))
+    return rng.standard_normal(shape + (n, 1)), A + np.swapaxes(A, -1, -2)
+
+
+@pytest.mark.parametrize('n', [1, 2, 6])
+def test_round_trip(n):
+    yi_novel, Yi_novel = create_novel_information(np.random.default_rng(n), (), n)
+    message = wire_format.encode(12, 3, yi_novel, Yi_novel)
+    assert len(message) == wire_format.get_message_size(n)
+    assert wire_format.read_header(message) == (12, 3)
+
+    decoded = wire_format.decode(bytes(message))
+    assert (decoded.step, decoded.sender) == (12, 3)
+    assert not decoded.is_skip()
+    assert np.array_equal(decoded.yi_novel, yi_novel)
+    assert np.array_equal(decoded.return_information_matrix(), Yi_novel)
+
+
+def test_single_precision_round_trip():
+    yi_novel, Yi_novel = create_novel_information(np.random.default_rng(0), (), 4)
+    message = wire_format.encode(0, 0, yi_novel, Yi_novel, np.float32)
+    assert len(message) == wire_format.get_message_size(4, np.float32) < wire_format.get_message_size(4)
+
+    decoded = wire_format.decode(message)
+    assert decoded.yi_novel.dtype == np.float32
+    assert np.allclose(decoded.yi_novel, yi_novel, rtol=1e-6)
+    assert np.allclose(decoded.return_information_matrix(), Yi_novel, rtol=1e-6)
+
+
+def test_skip():
+    decoded = wire_format.decode(wire_format.encode_skip(7, 2))
+    assert decoded.is_skip()
+    assert (decoded.step, decoded.sender) == (7, 2)
+
+
+@pytest.mark.parametrize('target_ids', [[], [4], [0, 2, 5, 9]])
+def test_multi_target_round_trip(target_ids):
+    yi_novel, Yi_novel = create_novel_information(np.random.default_rng(1), (len(target_ids),), 3)
+    message = wire_format.encode_targets(5, 1, np.array(target_ids), yi_novel, Yi_novel)
+    assert len(message) == wire_format.get_multi_target_message_size(3, len(target_ids))
+
+    decoded = wire_format.decode_targets(bytes(message))
+    assert (decoded.step, decoded.sender) == (5, 1)
+    assert np.array_equal(decoded.target_ids, target_ids)
+    assert np.array_equal(decoded.yi_novel, yi_novel)
+    assert np.array_equal(decoded.return_information_matrices(), Yi_novel)
+
+
+def test_rejects_other_messages():
+    yi_novel, Yi_novel = create_novel_information(np.random.default_rng(2), (1,), 2)
+    with pytest.raises(ValueError):
+        wire_format.decode(wire_format.encode_targets(0, 0, np.array([0]), yi_novel, Yi_novel))
+    with pytest.raises(ValueError):
+        wire_format.decode_targets(wire_format.encode(0, 0, yi_novel[0], Yi_novel[0]))
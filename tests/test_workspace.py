@@ -0,0 +1,49 @@
+import numpy as np
+
+from batch_information_filter import BatchInformationFilter
+import information_filter as IF
+import static_linear_program as slp
+from workspace import Workspace
+
+
+def create_walled_workspace():
+    # a wall in the middle of the map and a small block in its corner, so the obstacle grid covers only part of the map
+    wall = np.array([[0, -10], [0, 10], [2, 10], [2, -10]])
+    block = np.array([[40, 40], [44, 40], [44, 44], [40, 44]])
+    return Workspace('walled', [(-50, -50), (-50, 50), (50, 50), (50, -50)], [wall, block])
+
+
+def test_obstacle_blocks_line_of_sight():
+    workspace = create_walled_workspace()
+    observers = np.array([[-20, 0], [-20, 30], [-20, -5], [1, 0], [-45, 42]])
+    assert np.array_equal(workspace.get_line_of_sight(observers, [20, 0]), [False, True, False, False, True])
+
+
+def test_sight_lines_leaving_obstacle_grid():
+    workspace = create_walled_workspace()
+
+    # both ends outside the grid of obstacle cells, the sight lines pass through the block in the corner
+    observers = np.array([[30, 42], [42, 30], [49, 49], [30, 48]])
+    targets = np.array([[49, 42], [42, 49], [30, 30], [49, 48]])
+    assert np.array_equal(workspace.get_line_of_sight(observers, targets), [False, False, False, True])
+
+
+def test_occluded_seekers_only_predict():
+    workspace, state_space = slp.setup(1, np.random.default_rng(3))
+    seeker_list = workspace.robots[0:5]
+    hider = workspace.robots[6]
+    hider.truth_model = slp.build_truth_model(state_space, hider.return_ground_truth(), 10)
+
+    batch_filter = BatchInformationFilter.create_from_seekers(seeker_list, state_space)
+    expected = [seeker.information_history[-1] for seeker in seeker_list]
+    masks = np.random.default_rng(5).random((10, 5)) > 0.4
+    for visible in masks:
+        batch_filter.run_filters(seeker_list, hider, visible)
+        for i, seeker in enumerate(seeker_list):
+            expected[i] = IF.run(state_space, expected[i], seeker.measurement_history[-1], seeker.R)
+
+    for seeker, estimate, visible in zip(seeker_list, expected, masks.T):
+        assert np.isnan(seeker.measurement_history.get_measurements()[~visible]).all()
+        assert np.allclose(seeker.information_history[-1].return_information_matrix(),
+                           estimate.return_information_matrix())
+        assert np.allclose(seeker.information_history[-1].return_data_array(), estimate.return_data_array())
@@ -0,0 +1,159 @@
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+
+
+class CommunicationGraph:
+    """
+    two way communication links between seekers stored as compact arrays. Every link is split into two directed
+    edges, which are kept in CSR order so the edges leaving node i are edges indptr[i] to indptr[i + 1]
+    """
+    def __init__(self, node_count: int, links: np.ndarray):
+        """
+        :param node_count: number of seekers in the network
+        :param links: (L, 2) integer array of node index pairs, each pair is one two way link
+        """
+        self.node_count = node_count
+        self.links = np.asarray(links, dtype=np.int64).reshape((-1, 2))
+
+        sources = np.concatenate([self.links[:, 0], self.links[:, 1]])
+        targets = np.concatenate([self.links[:, 1], self.links[:, 0]])
+        order = np.lexsort((targets, sources))
+        self.sources = sources[order]
+        self.targets = targets[order]
+
+        degrees = np.bincount(self.sources, minlength=node_count)
+        self.indptr = np.concatenate([[0], np.cumsum(degrees)])
+        self.indices = self.targets
+
+        # reverse[e] is the directed edge pointing the other way along the same link
+        keys = self.sources * node_count + self.targets
+        self.reverse = np.searchsorted(keys, self.targets * node_count + self.sources)
+
+    @staticmethod
+    def create_from_pairs(pairs: list, node_count=None):
+        """
+        fast way to create a CommunicationGraph from a list of node index pairs
+        :param pairs: list of (i, j) tuples of node indices, repeats of a link in either direction are dropped
+        :param node_count: number of nodes, defaults to the largest index plus one
+        :return: CommunicationGraph object
+        """
+        links = np.array(pairs, dtype=np.int64).reshape((-1, 2))
+        loops = links[:, 0] == links[:, 1]
+        if np.any(loops):
+            raise ValueError("a seeker cannot link to itself, found the pair {}".format(tuple(links[loops][0])))
+
+        # keep the first occurrence of every link, so channel filters are not created twice for the same neighbor
+        _, first = np.unique(np.sort(links, axis=1), axis=0, return_index=True)
+        links = links[np.sort(first)]
+        if node_count is None:
+            node_count = int(links.max()) + 1 if links.size else 0
+        return CommunicationGraph(node_count, links)
+
+    @staticmethod
+    def create_from_robot_pairs(comm_lines: list, robot_list: list):
+        """
+        converts comm lines made of robot tuples, like the ones in static_linear_program, to a graph
+        :param comm_lines: list of (robot_i, robot_j) tuples
+        :param robot_list: list of robots, their position sets the node index
+        :return: CommunicationGraph object
+        """
+        index = {robot.name: i for i, robot in enumerate(robot_list)}
+        pairs = [(index[i.name], index[j.name]) for i, j in comm_lines]
+        return CommunicationGraph.create_from_pairs(pairs, len(robot_list))
+
+    def get_link_count(self):
+        return np.size(self.links, 0)
+
+    def get_edge_count(self):
+        return np.size(self.sources, 0)
+
+    def get_degrees(self):
+        return np.diff(self.indptr)
+
+    def get_neighbors(self, i: int):
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    def get_adjacency_matrix(self):
+        """
+        :return: scipy CSR adjacency matrix sharing the graph's index arrays
+        """
+        data = np.ones(self.get_edge_count(), dtype=bool)
+        return csr_matrix((data, self.indices, self.indptr), shape=(self.node_count, self.node_count))
+
+    def is_connected(self):
+        count, _ = connected_components(self.get_adjacency_matrix(), directed=False)
+        return count == 1
+
+    def is_tree(self):
+        """
+        the channel filter is only exact on trees, loopy graphs need covariance intersection instead
+        :return: True if the graph is connected and has no cycles
+        """
+        return self.get_link_count() == self.node_count - 1 and self.is_connected()
+
+    def has_cycles(self):
+        """
+        :return: True if any component of the graph contains a cycle
+        """
+        count, _ = connected_components(self.get_adjacency_matrix(), directed=False)
+        return self.get_link_count() > self.node_count - count
+
+    def return_pairs(self):
+        return [tuple(link) for link in self.links.tolist()]
+
+
+def create_chain(node_count: int):
+    """
+    :param node_count: number of nodes
+    :return: CommunicationGraph linking node i to node i + 1
+    """
+    nodes = np.arange(0, node_count - 1)
+    return CommunicationGraph(node_count, np.column_stack([nodes, nodes + 1]))
+
+
+def create_star(node_count: int, center=0):
+    """
+    :param node_count: number of nodes
+    :param center: index of the hub node
+    :return: CommunicationGraph linking every node to the center
+    """
+    leaves = np.delete(np.arange(0, node_count), center)
+    return CommunicationGraph(node_count, np.column_stack([np.full_like(leaves, center), leaves]))
+
+
+def create_tree(node_count: int, branching=2):
+    """
+    :param node_count: number of nodes
+    :param branching: number of children of every internal node
+    :return: CommunicationGraph of a complete tree in breadth first order
+    """
+    children = np.arange(1, node_count)
+    return CommunicationGraph(node_count, np.column_stack([(children - 1) // branching, children]))
+
+
+def create_random_spanning_tree(node_count: int, rng=None):
+    """
+    random recursive tree over a random node ordering, every node attaches to a uniformly chosen earlier node
+    :param node_count: number of nodes
+    :param rng: numpy random Generator, a fresh one is created if not provided
+    :return: CommunicationGraph that is a spanning tree
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    order = rng.permutation(node_count)
+    positions = np.arange(1, node_count)
+    parents = np.floor(rng.random(node_count - 1) * positions).astype(np.int64)
+    return CommunicationGraph(node_count, np.column_stack([order[parents], order[positions]]))
+
+
+def create_grid(rows: int, columns: int):
+    """
+    four connected grid, note that it contains cycles so it is not suitable for the channel filter
+    :param rows: number of rows
+    :param columns: number of columns
+    :return: CommunicationGraph with node index row * columns + column
+    """
+    nodes = np.arange(0, rows * columns).reshape((rows, columns))
+    horizontal = np.column_stack([nodes[:, :-1].ravel(), nodes[:, 1:].ravel()])
+    vertical = np.column_stack([nodes[:-1, :].ravel(), nodes[1:, :].ravel()])
+    return CommunicationGraph(rows * columns, np.concatenate([horizontal, vertical]))
@@ -0,0 +1,249 @@
+from functools import lru_cache
+import struct
+
+import numpy as np
+
+# magic, version, dtype code, state dimension, step, sender id
+HEADER = struct.Struct('<4sBBHiI')
+MAGIC = b'DDFN'
+VERSION = 1
+
+# multi target messages follow the header with the number of targets sent and their ids
+MULTI_TARGET_MAGIC = b'DDFM'
+TARGET_COUNT = struct.Struct('<I')
+
+DTYPE_CODES = {
+    np.dtype(np.float64): 0,
+    np.dtype(np.float32): 1,
+}
+CODE_DTYPES = {code: dtype for dtype, code in DTYPE_CODES.items()}
+
+
+class NovelInformation:
+    """
+    data object for a decoded channel filter message. The information vector and packed matrix are views of the
+    received buffer, the full matrix is only expanded when it is asked for
+    """
+    def __init__(self, step: int, sender: int, yi_novel: np.ndarray, packed_matrix: np.ndarray):
+        self.step = step
+        self.sender = sender
+        self.yi_novel = yi_novel
+        self.packed_matrix = packed_matrix
+
+    def get_dimension(self):
+        return np.size(self.yi_novel, 0)
+
+    def is_skip(self):
+        return self.get_dimension() == 0
+
+    def return_information_matrix(self):
+        return unpack_symmetric(self.packed_matrix, self.get_dimension())
+
+
+class MultiTargetNovelInformation:
+    """
+    data object for a decoded multi target channel filter message, with views of the received buffer like
+    NovelInformation. Only the targets that passed the event trigger are in the message
+    """
+    def __init__(self, step: int, sender: int, target_ids: np.ndarray, yi_novel: np.ndarray,
+                 packed_matrices: np.ndarray):
+        self.step = step
+        self.sender = sender
+        self.target_ids = target_ids
+        self.yi_novel = yi_novel
+        self.packed_matrices = packed_matrices
+
+    def get_dimension(self):
+        return np.size(self.yi_novel, -2)
+
+    def return_information_matrices(self):
+        return unpack_symmetric(self.packed_matrices, self.get_dimension())
+
+
+@lru_cache(maxsize=None)
+def get_upper_indices(n: int):
+    return np.triu_indices(n)
+
+
+def get_message_size(n: int, dtype=np.float64):
+    """
+    :param n: state dimension
+    :param dtype: floating point type of the payload
+    :return: number of bytes in an encoded message
+    """
+    return HEADER.size + (n + n * (n + 1) // 2) * np.dtype(dtype).itemsize
+
+
+def encode(step: int, sender: int, yi_novel: np.ndarray, Yi_novel: np.ndarray, dtype=np.float64):
+    """
+    packs novel information into bytes. Only the upper triangle of the symmetric information matrix is sent
+    :param step: time step of the information
+    :param sender: integer id of the sending seeker
+    :param yi_novel: n x 1 novel information vector
+    :param Yi_novel: n x n novel information matrix
+    :param dtype: numpy.float64 or numpy.float32 payload
+    :return: bytearray
+    """
+    dtype = np.dtype(dtype)
+    n = np.size(yi_novel, 0)
+
+    message = bytearray(get_message_size(n, dtype))
+    HEADER.pack_into(message, 0, MAGIC, VERSION, DTYPE_CODES[dtype], n, step, sender)
+
+    payload = np.frombuffer(message, dtype=dtype, offset=HEADER.size)
+    payload[:n] = np.ravel(yi_novel)
+    payload[n:] = Yi_novel[get_upper_indices(n)]
+
+    return message
+
+
+def get_multi_target_message_size(n: int, count: int, dtype=np.float64):
+    """
+    :param n: state dimension of every target
+    :param count: number of targets in the message
+    :param dtype: floating point type of the payload
+    :return: number of bytes in an encoded multi target message
+    """
+    return HEADER.size + TARGET_COUNT.size + 4 * count + count * (n + n * (n + 1) // 2) * np.dtype(dtype).itemsize
+
+
+def encode_targets(step: int, sender: int, target_ids: np.ndarray, yi_novel: np.ndarray, Yi_novel: np.ndarray,
+                   dtype=np.float64):
+    """
+    packs the novel information of several targets into one message, a message without targets is a skip
+    :param step: time step of the information
+    :param sender: integer id of the sending seeker
+    :param target_ids: (K,) array of the target indices being sent
+    :param yi_novel: (K, n, 1) array of novel information vectors
+    :param Yi_novel: (K, n, n) array of novel information matrices
+    :param dtype: numpy.float64 or numpy.float32 payload
+    :return: bytearray
+    """
+    dtype = np.dtype(dtype)
+    count = len(target_ids)
+    n = np.size(Yi_novel, -1)
+
+    message = bytearray(get_multi_target_message_size(n, count, dtype))
+    HEADER.pack_into(message, 0, MULTI_TARGET_MAGIC, VERSION, DTYPE_CODES[dtype], n, step, sender)
+    TARGET_COUNT.pack_into(message, HEADER.size, count)
+
+    offset = HEADER.size + TARGET_COUNT.size
+    np.frombuffer(message, dtype=np.uint32, count=count, offset=offset)[:] = target_ids
+
+    payload = np.frombuffer(message, dtype=dtype, offset=offset + 4 * count).reshape((count, n + n * (n + 1) // 2))
+    payload[:, :n] = np.reshape(yi_novel, (count, n))
+    payload[:, n:] = Yi_novel[..., get_upper_indices(n)[0], get_upper_indices(n)[1]]
+
+    return message
+
+
+def encode_skip(step: int, sender: int):
+    """
+    header only message telling the receiver that an event triggered channel filter had nothing worth sending
+    :param step: time step of the skipped send
+    :param sender: integer id of the sending seeker
+    :return: bytearray
+    """
+    message = bytearray(HEADER.size)
+    HEADER.pack_into(message, 0, MAGIC, VERSION, DTYPE_CODES[np.dtype(np.float64)], 0, step, sender)
+    return message
+
+
+def decode(buffer):
+    """
+    reads a message without copying its payload
+    :param buffer: bytes or any buffer holding an encoded message
+    :return: NovelInformation object
+    """
+    magic, version, dtype_code, n, step, sender = HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a version {} channel filter message".format(VERSION))
+
+    payload = np.frombuffer(buffer, dtype=CODE_DTYPES[dtype_code], offset=HEADER.size)
+    return NovelInformation(step, sender, payload[:n].reshape((n, 1)), payload[n:])
+
+
+def decode_targets(buffer):
+    """
+    reads a multi target message without copying its payload
+    :param buffer: bytes or any buffer holding an encoded multi target message
+    :return: MultiTargetNovelInformation object
+    """
+    magic, version, dtype_code, n, step, sender = HEADER.unpack_from(buffer, 0)
+    if magic != MULTI_TARGET_MAGIC or version != VERSION:
+        raise ValueError("not a version {} multi target channel filter message".format(VERSION))
+
+    count, = TARGET_COUNT.unpack_from(buffer, HEADER.size)
+    offset = HEADER.size + TARGET_COUNT.size
+    target_ids = np.frombuffer(buffer, dtype=np.uint32, count=count, offset=offset)
+
+    payload = np.frombuffer(buffer, dtype=CODE_DTYPES[dtype_code], offset=offset + 4 * count)
+    payload = payload.reshape((count, n + n * (n + 1) // 2))
+    return MultiTargetNovelInformation(step, sender, target_ids, payload[:, :n, np.newaxis], payload[:, n:])
+
+
+def read_header(buffer):
+    """
+    :param buffer: bytes or any buffer holding an encoded message
+    :return: tuple of the step and sender id
+    """
+    _, _, _, _, step, sender = HEADER.unpack_from(buffer, 0)
+    return step, sender
+
+
+def unpack_symmetric(packed_matrix: np.ndarray, n: int):
+    """
+    rebuilds symmetric matrices from their packed upper triangles
+    :param packed_matrix: (..., p) array of upper triangles in row order
+    :param n: matrix dimension
+    :return: (..., n, n) numpy array
+    """
+    rows, columns = get_upper_indices(n)
+    matrix = np.empty(np.shape(packed_matrix)[:-1] + (n, n), dtype=packed_matrix.dtype)
+    matrix[..., rows, columns] = packed_matrix
+    matrix[..., columns, rows] = packed_matrix
+    return matrix
+
+
+class LinkTraffic:
+    """
+    counts the messages and bytes sent and received over every directed link, and the bytes of each fusion round
+    """
+    def __init__(self):
+        self.links = {}
+        self.round_bytes = {}
+
+    def _get_counts(self, sender, receiver):
+        return self.links.setdefault((sender, receiver), {'messages_sent': 0, 'bytes_sent': 0,
+                                                          'messages_received': 0, 'bytes_received': 0})
+
+    def record_sent(self, sender, receiver, step: int, size: int):
+        counts = self._get_counts(sender, receiver)
+        counts['messages_sent'] += 1
+        counts['bytes_sent'] += size
+        self.round_bytes[step] = self.round_bytes.get(step, 0) + size
+
+    def record_received(self, sender, receiver, size: int):
+        counts = self._get_counts(sender, receiver)
+        counts['messages_received'] += 1
+        counts['bytes_received'] += size
+
+    def get_bytes_sent(self):
+        return sum(counts['bytes_sent'] for counts in self.links.values())
+
+    def get_bytes_received(self):
+        return sum(counts['bytes_received'] for counts in self.links.values())
+
+    def get_messages_sent(self):
+        return sum(counts['messages_sent'] for counts in self.links.values())
+
+    def get_mean_round_bytes(self):
+        return float(np.mean(list(self.round_bytes.values()))) if self.round_bytes else 0.0
+
+    def print_summary(self):
+        print("{:>24} {:>10} {:>10} {:>10} {:>10}".format("link", "msgs out", "bytes out", "msgs in", "bytes in"))
+        for (sender, receiver), counts in sorted(self.links.items()):
+            print("{:>24} {:>10} {:>10} {:>10} {:>10}".format(
+                "{} -> {}".format(sender, receiver), counts['messages_sent'], counts['bytes_sent'],
+                counts['messages_received'], counts['bytes_received']))
+        print("mean bytes per fusion round: {:.1f}".format(self.get_mean_round_bytes()))
@@ -1,10 +1,15 @@
 import matplotlib.pyplot as plt
 import numpy as np
 
-from channel_filter import ChannelFilter
-from data_objects import InformationEstimate, Measurement
-from estimation_tools import get_noisy_measurement
+from channel_filter import ChannelFilter, MultiTargetChannelFilter
+import covariance_intersection as CI
+from data_model import BlockInformationHistory, InformationHistory, MeasurementHistory
+from data_objects import GroundTruth, InformationEstimate, Measurement
+from estimation_tools import NoiseGenerator
 import information_filter as IF
+from instrumentation import DISABLED
+from spatial_index import ObstacleIndex
+import square_root_information_filter as SRIF
 
 
 class Workspace:
@@ -24,8 +29,38 @@ class Workspace:
         x_coordinates = [i[0] for i in self.boundary_coordinates]
         y_coordinates = [i[1] for i in self.boundary_coordinates]
 
-        self.x_bounds = (min(x_coordinates), max(x_coordinates))
-        self.y_bounds = (min(y_coordinates), max(y_coordinates))
+        self.x_bounds = (int(min(x_coordinates)), int(max(x_coordinates)))
+        self.y_bounds = (int(min(y_coordinates)), int(max(y_coordinates)))
+
+        self.obstacle_index = ObstacleIndex.create_from_obstacles(self.obstacles)
+
+    def is_in_obstacle(self, points: np.ndarray):
+        """
+        :param points: (K, 2) array of points
+        :return: (K,) boolean array, True where a point is inside an obstacle
+        """
+        return self.obstacle_index.contains_points(points)
+
+    def is_segment_blocked(self, segment_starts: np.ndarray, segment_ends: np.ndarray):
+        """
+        :param segment_starts: (K, 2) array of segment start points
+        :param segment_ends: (K, 2) array of segment end points
+        :return: (K,) boolean array, True where a segment touches an obstacle or lies inside one
+        """
+        return self.obstacle_index.intersects_segments(segment_starts, segment_ends) | \
+            self.obstacle_index.contains_points(segment_starts)
+
+    def get_line_of_sight(self, observer_positions: np.ndarray, target_position: np.ndarray):
+        """
+        tests every sight line against the obstacles in one batched query
+        :param observer_positions: (N, 2) array of observer positions
+        :param target_position: (2,) position seen by every observer or (N, 2) array of positions, one per observer
+        :return: (N,) boolean array, True where the observer can see the target
+        """
+        observer_positions = np.asarray(observer_positions, dtype=float).reshape((-1, 2))
+        target_positions = np.broadcast_to(np.asarray(target_position, dtype=float).reshape((-1, 2)),
+                                           np.shape(observer_positions))
+        return ~self.is_segment_blocked(observer_positions, target_positions)
 
     def plot(self):
         """
@@ -84,9 +119,6 @@ class TwoDimensionalRobot:
 
         self.state_names = list(state.keys())
 
-        self.current_measurement_step = 0
-        self.measurement_list = []
-
     def plot_initial(self):
         """
         Plots the position of the robot as an x
@@ -113,9 +145,19 @@ class TwoDimensionalRobot:
 
 
 class Seeker(TwoDimensionalRobot):
-    def __init__(self, name: str, state: dict, color: str, R: np.ndarray):
+    def __init__(self, name: str, state: dict, color: str, R: np.ndarray, rng=None, history_capacity=None,
+                 square_root=False):
+        """
+        :param history_capacity: keep only this many steps of history in a ring buffer, or everything if None
+        :param square_root: run the square root information filter instead of the information filter
+        """
         super().__init__(name, state, color)
         self.R = R
+        self.noise_generator = NoiseGenerator(R, rng) if R is not None else None
+
+        self.square_root = square_root
+        self.R_inv_sqrt = SRIF.get_inverse_square_root(R) if square_root else None
+        self.square_root_estimate = None
 
         # TODO: this is a bit static
         self.i_init = np.array([
@@ -126,49 +168,122 @@ class Seeker(TwoDimensionalRobot):
             [0, 0],
             [0, 0]
         ])
-        self.information_list = [InformationEstimate.create_from_array(0, self.i_init, self.I_init)]
+
+        n = np.size(self.i_init, 0)
+        m = n if R is None else np.size(R, 0)
+        ring_buffer = history_capacity is not None
+        capacity = history_capacity if ring_buffer else 64
+
+        self.information_history = InformationHistory(n, capacity, ring_buffer)
+        self.information_history.append(InformationEstimate.create_from_array(0, self.i_init, self.I_init))
+        self.measurement_history = MeasurementHistory(m, capacity, ring_buffer)
+        self.current_measurement_step = 0
         self.channel_filter_dict = {}
 
-    def plot_measurements(self):
-        x_coordinates = [x.y_1 for x in self.measurement_list]
-        y_coordinates = [y.y_2 for y in self.measurement_list]
+        # multi target tracking, set up by track_targets
+        self.targets = list()
+        self.target_history = None
+        self._history_capacity = history_capacity
 
-        plt.plot(x_coordinates, y_coordinates, 'o', mfc=self.color, markersize=2, mec='None', alpha=0.5)
+    def plot_measurements(self):
+        measurements = self.measurement_history.get_measurements()
+        plt.plot(measurements[:, 0], measurements[:, 1], 'o', mfc=self.color, markersize=2, mec='None', alpha=0.5)
 
-    def get_measurement(self, true_measurement: Measurement):
-        noisy_measurement = get_noisy_measurement(self.R, true_measurement)
-        self.measurement_list.append(noisy_measurement)
+    def get_measurement(self, true_measurement: Measurement, visible=True):
+        """
+        :param true_measurement: Measurement object without noise
+        :param visible: False when the line of sight is blocked, the noise is still drawn so the sensor noise sequence
+            does not depend on the occlusions, but a NaN measurement is recorded
+        :return: Measurement object
+        """
+        noisy_measurement = self.noise_generator.sample(true_measurement)
+        if not visible:
+            noisy_measurement = Measurement.create_from_array(
+                noisy_measurement.step, np.full_like(noisy_measurement.return_data_array(), np.nan, dtype=float))
+        self.measurement_history.append(noisy_measurement)
         self.current_measurement_step += 1
         return noisy_measurement
 
-    def run_filter(self, target):
-        current_step = self.information_list[-1].step
-        true_measurement = next((x for x in target.truth_model.true_measurements if x.step == current_step + 1), None)
-        y = self.get_measurement(true_measurement)
-        self.information_list.append(IF.run(target.state_space, self.information_list[-1], y, self.R))
+    def run_filter(self, target, visible=True):
+        """
+        :param target: robot being estimated, must have a truth model
+        :param visible: False skips the measurement update
+        :return: none
+        """
+        current_step = self.information_history[-1].step
+        true_measurement = target.truth_model.get_true_measurement(current_step + 1)
+        y = self.get_measurement(true_measurement, visible)
+
+        if self.square_root:
+            state = self.return_square_root_estimate()
+            self.square_root_estimate = SRIF.run(target.state_space, state, y, self.R_inv_sqrt)
+            self.information_history.append(self.square_root_estimate.return_information_estimate())
+            return
+
+        self.information_history.append(IF.run(target.state_space, self.information_history[-1], y, self.R))
+
+    def return_square_root_estimate(self):
+        """
+        square root form of the latest information estimate, factored again only when fusion or another filter changed
+        the history since the last square root update
+        :return: SquareRootInformationEstimate object
+        """
+        latest = self.information_history[-1]
+        if self.square_root_estimate is None or self.square_root_estimate.step != latest.step:
+            self.square_root_estimate = SRIF.SquareRootInformationEstimate.create_from_information_estimate(latest)
+        return self.square_root_estimate
 
-    def create_channel_filter(self, robot_j, target):
+    def create_channel_filter(self, robot_j, target, threshold=None, metric='trace'):
         """
         adds a new channel filter for a single target to the
         :param robot_j:
         :param target:
+        :param threshold: event trigger threshold of the channel filter, None sends every step
+        :param metric: novelty metric used with the threshold
         :return:
         """
-        channel_filter = ChannelFilter(self, robot_j, target)
+        channel_filter = ChannelFilter(self, robot_j, target, threshold, metric)
         self.channel_filter_dict[robot_j.name] = channel_filter
 
-    def send_update(self):
-        for cf in self.channel_filter_dict.values():
-            cf.update_and_send()
+    def track_targets(self, targets: list):
+        """
+        starts tracking several independent targets, each with its own block of uninformed information
+        :param targets: list of targets sharing one state space, their order sets the order of the blocks
+        :return: none
+        """
+        n, _ = targets[0].state_space.get_dimensions()
+        ring_buffer = self._history_capacity is not None
+        capacity = self._history_capacity if ring_buffer else 64
 
-    def receive_update(self):
-        for cf in self.channel_filter_dict.values():
-            cf.receive_and_update()
+        self.targets = targets
+        self.target_history = BlockInformationHistory(len(targets), n, capacity, ring_buffer)
+        self.target_history.append_blocks(0, np.zeros((len(targets), n, 1)), np.zeros((len(targets), n, n)))
+
+    def create_multi_target_channel_filter(self, robot_j, threshold=None, metric='trace'):
+        """
+        adds one channel filter to robot j that carries every tracked target
+        :param robot_j: seeker at the other end of the link, tracking the same targets
+        :param threshold: event trigger threshold applied to every target, None sends every step
+        :param metric: novelty metric used with the threshold
+        :return: none
+        """
+        channel_filter = MultiTargetChannelFilter(self, robot_j, self.targets, threshold, metric)
+        self.channel_filter_dict[robot_j.name] = channel_filter
+
+    def send_update(self, instrumentation=DISABLED):
+        for name, cf in self.channel_filter_dict.items():
+            with instrumentation.phase('update_and_send', self.name, name):
+                cf.update_and_send()
+
+    def receive_update(self, instrumentation=DISABLED):
+        for name, cf in self.channel_filter_dict.items():
+            with instrumentation.phase('receive_and_update', self.name, name):
+                cf.receive_and_update()
 
     def fuse_data(self):
         # TODO: should be a summation in here for more sensors, but works as is
-        y_k1_p = self.information_list[-1].return_data_array()
-        Y_k1_p = self.information_list[-1].return_information_matrix()
+        y_k1_p = self.information_history[-1].return_data_array()
+        Y_k1_p = self.information_history[-1].return_information_matrix()
 
         yj_novel_sum = 0
         Yj_novel_sum = 0
@@ -179,10 +294,52 @@ class Seeker(TwoDimensionalRobot):
 
         y_k1_fused = y_k1_p + yj_novel_sum
         Y_k1_fused = Y_k1_p + Yj_novel_sum
-        self.information_list[-1].update(y_k1_fused, Y_k1_fused)
+        self.information_history.update_last(y_k1_fused, Y_k1_fused)
+        self.square_root_estimate = None
+
+    def fuse_target_data(self):
+        """
+        adds the novel information about every target received over every link, one block operation per link
+        :return: none
+        """
+        _, y_k1_p, Y_k1_p = self.target_history.get_blocks(-1)
+
+        yj_novel_sum = 0
+        Yj_novel_sum = 0
+
+        for cf in self.channel_filter_dict.values():
+            yj_novel_sum += cf.yj_novel
+            Yj_novel_sum += cf.Yj_novel
+
+        self.target_history.update_last(y_k1_p + yj_novel_sum, Y_k1_p + Yj_novel_sum)
+
+    def fuse_data_ci(self, neighbor_information: list, method='fast'):
+        """
+        covariance intersection in place of the channel filters, safe on communication graphs with cycles
+        :param neighbor_information: list of (information vector, information matrix) tuples from the neighbors
+        :param method: 'fast' or 'optimal' covariance intersection weight
+        :return: none
+        """
+        y_k1_fused = self.information_history[-1].return_data_array()
+        Y_k1_fused = self.information_history[-1].return_information_matrix()
+
+        for yj, Yj in neighbor_information:
+            y_k1_fused, Y_k1_fused = CI.fuse(y_k1_fused, Y_k1_fused, yj, Yj, method)
+
+        self.information_history.update_last(y_k1_fused, Y_k1_fused)
+        self.square_root_estimate = None
 
 
 class Hider(TwoDimensionalRobot):
     def __init__(self, name: str, state: dict, color: str, state_space):
         super().__init__(name, state, color)
         self.state_space = state_space
+
+    def return_ground_truth(self, step=0):
+        """
+        creates a ground truth object from the states covered by the hider's state space, extra pose values are dropped
+        :param step: time step associated with the ground truth
+        :return: GroundTruth object
+        """
+        n, _ = self.state_space.get_dimensions()
+        return GroundTruth.create_from_array(step, self.return_state_array()[0:n])